@@ -0,0 +1,505 @@
+# api.py — API HTTP (ASGI) para integrações: cardápio, pedidos, rastreio e status
+#
+# Roda ao lado do Streamlit e usa o mesmo armazenamento de pedidos:
+#     uvicorn api:app --host 0.0.0.0 --port 8502
+#
+# Alterações de status exigem o cabeçalho "Authorization: Bearer <THE_RUA_API_TOKEN>".
+import asyncio
+import hmac
+import html
+import json
+import os
+import re
+import time
+import traceback
+from collections import deque
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import parse_qs
+
+import catalogo
+import eta
+import eventos
+import instrumentacao
+from cardapio_estatico import SAIDA_DIR, gerar_cardapio_estatico
+from checkout import PedidoInvalido, criar_pedido
+from pedidos_db import atualizar_status, buscar_pedido, buscar_por_codigo, transicao_valida
+
+API_TOKEN = os.environ.get("THE_RUA_API_TOKEN", "")
+CORPO_MAX = 64 * 1024
+
+# Limite de consultas de rastreio por IP (balde de fichas)
+RASTREIO_RAJADA = int(os.environ.get("THE_RUA_RASTREIO_RAJADA", "20"))
+RASTREIO_POR_SEGUNDO = float(os.environ.get("THE_RUA_RASTREIO_POR_SEGUNDO", "1"))
+_baldes = {}
+
+# Transmissão de eventos: uma leitura do log por mudança, repassada a todos os assinantes
+HUB_INTERVALO = 0.5
+HUB_BUFFER = 1000
+HUB_FILA_MAX = 200
+HUB_BATIMENTO = 15
+_hub = {"assinantes": {}, "buffer": deque(maxlen=HUB_BUFFER), "posicao": None, "seq": 0, "tarefa": None}
+
+
+class ErroHTTP(Exception):
+    def __init__(self, status, mensagem, detalhes=None, headers=None):
+        super().__init__(mensagem)
+        self.status = status
+        self.mensagem = mensagem
+        self.detalhes = detalhes
+        self.headers = headers
+
+
+# ----------------------------
+# Respostas
+# ----------------------------
+def resposta_json(dados, status=200, headers=None):
+    corpo = json.dumps(dados, ensure_ascii=False).encode("utf-8")
+    cabecalhos = {"content-type": "application/json; charset=utf-8"}
+    cabecalhos.update(headers or {})
+    return status, cabecalhos, corpo
+
+
+def resposta_erro(erro):
+    dados = {"erro": erro.mensagem}
+    if erro.detalhes:
+        dados["detalhes"] = erro.detalhes
+    return resposta_json(dados, erro.status, erro.headers)
+
+
+async def _enviar(send, status, headers, corpo):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(k.encode(), str(v).encode()) for k, v in headers.items()]
+        + [(b"content-length", str(len(corpo)).encode())],
+    })
+    await send({"type": "http.response.body", "body": corpo})
+
+
+# ----------------------------
+# Requisição
+# ----------------------------
+async def _ler_corpo(receive):
+    corpo = b""
+    while True:
+        msg = await receive()
+        corpo += msg.get("body", b"")
+        if len(corpo) > CORPO_MAX:
+            raise ErroHTTP(413, "Corpo da requisição muito grande.")
+        if not msg.get("more_body"):
+            return corpo
+
+
+def corpo_json(req):
+    try:
+        dados = json.loads(req["corpo"] or b"{}")
+    except ValueError:
+        raise ErroHTTP(400, "JSON inválido.")
+    if not isinstance(dados, dict):
+        raise ErroHTTP(400, "O corpo deve ser um objeto JSON.")
+    return dados
+
+
+def exigir_token(req):
+    enviado = req["headers"].get("authorization", "")
+    if not API_TOKEN or not hmac.compare_digest(enviado, f"Bearer {API_TOKEN}"):
+        raise ErroHTTP(401, "Token de API inválido ou ausente.")
+
+
+# ----------------------------
+# Endpoints
+# ----------------------------
+async def saude(req):
+    return resposta_json({"ok": True})
+
+
+async def cardapio(req):
+    """Cardápio completo; ?q= busca no índice e ?categoria= filtra."""
+    query = parse_qs(req["query"])
+    busca = (query.get("q") or [""])[0]
+    filtro = (query.get("categoria") or [""])[0]
+    produtos = await asyncio.to_thread(catalogo.buscar, busca)
+    return resposta_json([
+        {
+            "id": str(p["id"]),
+            "nome": p["nome"],
+            "descricao": p.get("descricao", ""),
+            "preco": float(p["preco"]),
+            "imagem": p.get("imagem", ""),
+            "categoria": catalogo.categoria(p),
+            "esgotado": not catalogo.disponivel(p),
+        }
+        for p in produtos
+        if not filtro or catalogo.categoria(p) == filtro
+    ])
+
+
+async def metricas_prometheus(req):
+    """Histogramas de desempenho no formato do Prometheus (só local ou com token)."""
+    if req["cliente"] not in ("127.0.0.1", "::1", "localhost"):
+        exigir_token(req)
+    texto = await asyncio.to_thread(instrumentacao.prometheus)
+    return 200, {"content-type": "text/plain; version=0.0.4; charset=utf-8"}, texto.encode("utf-8")
+
+
+def _item_valido(item):
+    quantidade = item.get("quantidade") if isinstance(item, dict) else None
+    return (isinstance(item, dict) and item.get("id") not in (None, "")
+            and isinstance(quantidade, int) and not isinstance(quantidade, bool) and quantidade > 0)
+
+
+async def novo_pedido(req):
+    dados = corpo_json(req)
+    itens = dados.get("itens")
+    if not isinstance(itens, list) or not all(_item_valido(i) for i in itens):
+        raise ErroHTTP(422, "Campo 'itens' deve ser uma lista de {id, quantidade}, com quantidade inteira positiva.")
+    dados["origem"] = str(dados.get("origem") or "api")
+    dados.pop("comprovante", None)
+    chave = req["headers"].get("idempotency-key") or dados.get("chave_idempotencia")
+    if chave is not None and not (8 <= len(str(chave)) <= 128):
+        raise ErroHTTP(422, "Idempotency-Key deve ter entre 8 e 128 caracteres.")
+    try:
+        pedido, criado = await asyncio.to_thread(criar_pedido, dados, itens, chave)
+    except PedidoInvalido as e:
+        raise ErroHTTP(422, "Pedido inválido.", e.erros)
+    return resposta_json({
+        "id": pedido["id"],
+        "codigo_rastreio": pedido["codigo_rastreio"],
+        "status": pedido["status"],
+        "total": pedido["total"],
+    }, status=201 if criado else 200, headers=None if criado else {"idempotent-replayed": "true"})
+
+
+def limitar_taxa(ip, agora=None):
+    """Consome uma ficha do IP; levanta 429 quando o balde está vazio."""
+    agora = agora or time.monotonic()
+    fichas, ultimo = _baldes.get(ip, (RASTREIO_RAJADA, agora))
+    fichas = min(RASTREIO_RAJADA, fichas + (agora - ultimo) * RASTREIO_POR_SEGUNDO)
+    if fichas < 1:
+        _baldes[ip] = (fichas, agora)
+        espera = max(1, int((1 - fichas) / RASTREIO_POR_SEGUNDO) + 1)
+        raise ErroHTTP(429, "Muitas consultas. Aguarde alguns segundos.", headers={"retry-after": str(espera)})
+    _baldes[ip] = (fichas - 1, agora)
+    if len(_baldes) > 10000:
+        # Descarta IPs que já recuperaram o balde cheio
+        for chave in [k for k, (_, t) in _baldes.items() if agora - t > RASTREIO_RAJADA / RASTREIO_POR_SEGUNDO]:
+            del _baldes[chave]
+
+
+def _validadores(pedido, previsao):
+    """ETag pela versão do pedido (e minuto da previsão) e Last-Modified pelo último evento."""
+    minutos = previsao["minutos"] if previsao else 0
+    etag = f'W/"{pedido["id"]}-{pedido.get("versao", 0)}-{minutos}"'
+    historico = pedido.get("historico") or []
+    modificado = historico[-1]["ts"] if historico else time.time()
+    return etag, int(modificado)
+
+
+def _nao_modificado(req, etag, modificado):
+    """304? `modificado` None ignora If-Modified-Since (só a ETag vale)."""
+    enviado = req["headers"].get("if-none-match")
+    if enviado is not None:
+        return etag in [e.strip() for e in enviado.split(",")] or enviado.strip() == "*"
+    desde = req["headers"].get("if-modified-since")
+    if desde and modificado is not None:
+        try:
+            return int(parsedate_to_datetime(desde).timestamp()) >= modificado
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def resumo_rastreio(p):
+    dados = {
+        "codigo_rastreio": p["codigo_rastreio"],
+        "status": p.get("status"),
+        "tipo_pedido": p.get("tipo_pedido"),
+        "data": p.get("data"),
+        "itens": [{"nome": i["nome"], "quantidade": i["quantidade"]} for i in p.get("produtos", [])],
+        "total": p.get("total", 0),
+    }
+    if p.get("status") != "Entregue":
+        dados["previsao"] = eta.estimar(p)
+    return dados
+
+
+_HTML_RASTREIO = """<!DOCTYPE html>
+<html lang="pt-BR"><head><meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<meta http-equiv="refresh" content="120">
+<title>Pedido #{codigo} - THE RUA</title>
+<style>body{{font-family:sans-serif;padding:16px}} progress{{width:100%;height:20px}}</style>
+</head><body>
+<h1>Pedido #{codigo}</h1>
+<p><strong>{status}</strong></p>
+<progress value="{etapa}" max="{etapas}"></progress>
+<p>{previsao}</p>
+<ul>{itens}</ul>
+<p>Total: R$ {total:.2f}</p>
+<script>
+  // Recarrega só quando o status muda (SSE); o refresh acima é só reserva
+  new EventSource("/eventos?codigo={codigo}").addEventListener("status_alterado", () => location.reload());
+</script>
+</body></html>
+"""
+
+
+def _html_rastreio(dados):
+    previsao = dados.get("previsao")
+    etapas = ["Aguardando aceite", "Em preparo", "Pronto", "Em rota de entrega", "Entregue"]
+    return _HTML_RASTREIO.format(
+        codigo=html.escape(dados["codigo_rastreio"]),
+        status=html.escape(dados["status"] or ""),
+        etapa=etapas.index(dados["status"]) if dados["status"] in etapas else 0,
+        etapas=len(etapas) - 1,
+        previsao=f"Previsão: ~{previsao['minutos']} min (por volta das {previsao['previsao']})" if previsao and previsao["minutos"] else "",
+        itens="".join(f"<li>{i['quantidade']}x {html.escape(i['nome'])}</li>" for i in dados["itens"]),
+        total=float(dados["total"]),
+    ).encode("utf-8")
+
+
+async def rastreio(req):
+    limitar_taxa(req["cliente"])
+    pedido = await asyncio.to_thread(buscar_por_codigo, req["params"]["codigo"])
+    if pedido is None:
+        raise ErroHTTP(404, "Código não encontrado.")
+    # A previsão lê o modelo do disco (se mudou): fora do laço de eventos
+    dados = await asyncio.to_thread(resumo_rastreio, pedido)
+    html_view = req["params"].get("formato") == ".html"
+    etag, modificado = _validadores(pedido, dados.get("previsao"))
+    if html_view:
+        etag = etag[:-1] + '-html"'
+    cabecalhos = {"etag": etag, "cache-control": "no-cache"}
+    if "previsao" in dados:
+        # Os minutos da previsão mudam sem novo evento: a data não os acompanha
+        modificado = None
+    else:
+        cabecalhos["last-modified"] = formatdate(modificado, usegmt=True)
+    if _nao_modificado(req, etag, modificado):
+        return 304, cabecalhos, b""
+    if html_view:
+        cabecalhos["content-type"] = "text/html; charset=utf-8"
+        return 200, cabecalhos, _html_rastreio(dados)
+    return resposta_json(dados, headers=cabecalhos)
+
+
+async def mudar_status(req):
+    exigir_token(req)
+    dados = corpo_json(req)
+    pedido = await asyncio.to_thread(buscar_pedido, req["params"]["pedido_id"])
+    if pedido is None:
+        raise ErroHTTP(404, "Pedido não encontrado.")
+    novo = dados.get("status")
+    if not transicao_valida(pedido.get("status"), novo):
+        raise ErroHTTP(409, f"Transição inválida: '{pedido.get('status')}' → '{novo}'.")
+    # A checagem acima usa o cache; a que vale é a refeita sob a trava
+    if not await asyncio.to_thread(atualizar_status, pedido["id"], novo):
+        atual = buscar_pedido(pedido["id"])
+        status = atual.get("status") if atual else None
+        raise ErroHTTP(409, f"Transição inválida: '{status}' → '{novo}' (o pedido mudou).")
+    return resposta_json({"id": pedido["id"], "status": novo})
+
+
+def _arquivo_estatico(caminho, cache_control, tipo):
+    if not os.path.exists(caminho):
+        raise ErroHTTP(404, "Arquivo não encontrado.")
+    with open(caminho, "rb") as f:
+        corpo = f.read()
+    return 200, {"content-type": tipo, "cache-control": cache_control}, corpo
+
+
+async def menu_estatico(req):
+    """Cardápio pré-renderizado; o navegador revalida a cada acesso."""
+    if not req["caminho"].endswith("/"):
+        # As imagens usam caminho relativo (img/...)
+        return 301, {"location": "/menu/"}, b""
+    caminho = os.path.join(SAIDA_DIR, "index.html")
+    if not os.path.exists(caminho):
+        await asyncio.to_thread(gerar_cardapio_estatico)
+    return await asyncio.to_thread(
+        _arquivo_estatico, caminho, "public, max-age=60", "text/html; charset=utf-8"
+    )
+
+
+async def menu_imagem(req):
+    """Imagens têm o hash no nome: podem ficar em cache para sempre."""
+    nome = req["params"]["nome"]
+    tipo = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg"}.get(os.path.splitext(nome)[1], "application/octet-stream")
+    return await asyncio.to_thread(
+        _arquivo_estatico, os.path.join(SAIDA_DIR, "img", nome), "public, max-age=31536000, immutable", tipo
+    )
+
+
+# ----------------------------
+# Eventos em tempo real (Server-Sent Events)
+# ----------------------------
+def _combina(evento, filtro):
+    # Uma fila acompanha quem entra e quem sai dela (o status anterior também conta)
+    if filtro["status"] and not {evento.get("status"), evento.get("anterior")} & filtro["status"]:
+        return False
+    if filtro["codigo"] and evento.get("codigo_rastreio") != filtro["codigo"]:
+        return False
+    return True
+
+
+async def _acompanhar_log():
+    """Única tarefa que lê o log de eventos e distribui para as filas dos assinantes."""
+    while True:
+        try:
+            novos, _hub["posicao"] = await asyncio.to_thread(eventos.ler_novos, _hub["posicao"] or 0)
+        except OSError:
+            novos = []
+        for evento in novos:
+            # Depois de uma rotação o log é relido do início: o que já saiu fica de fora
+            if evento.get("seq", 0) <= _hub["seq"]:
+                continue
+            _hub["seq"] = evento["seq"]
+            _hub["buffer"].append(evento)
+            for fila, filtro in list(_hub["assinantes"].values()):
+                if _combina(evento, filtro):
+                    try:
+                        fila.put_nowait(evento)
+                    except asyncio.QueueFull:
+                        pass  # cliente lento: recupera pelo cursor ao reconectar
+        await asyncio.sleep(HUB_INTERVALO)
+
+
+async def _garantir_hub():
+    if _hub["tarefa"] is None or _hub["tarefa"].done():
+        if _hub["posicao"] is None:
+            # Primeira leitura preenche o buffer de reenvio
+            iniciais, _hub["posicao"] = await asyncio.to_thread(eventos.ler_novos, 0)
+            _hub["buffer"].extend(iniciais)
+            _hub["seq"] = max((e.get("seq", 0) for e in iniciais), default=0)
+        _hub["tarefa"] = asyncio.create_task(_acompanhar_log())
+
+
+def _formatar_sse(evento):
+    dados = json.dumps(evento, ensure_ascii=False)
+    return f"id: {evento['seq']}\nevent: {evento['tipo']}\ndata: {dados}\n\n".encode("utf-8")
+
+
+async def transmitir_eventos(req):
+    """GET /eventos?status=Em preparo,Pronto&codigo=1234 — reenvia a partir de Last-Event-ID."""
+    query = parse_qs(req["query"])
+    filtro = {
+        "status": {s for v in query.get("status", []) for s in v.split(",") if s},
+        "codigo": (query.get("codigo") or [""])[0],
+    }
+    try:
+        cursor = int(req["headers"].get("last-event-id") or (query.get("desde") or ["-1"])[0])
+    except ValueError:
+        raise ErroHTTP(400, "Cursor de eventos inválido.")
+
+    await _garantir_hub()
+    fila = asyncio.Queue(maxsize=HUB_FILA_MAX)
+    chave = object()
+    _hub["assinantes"][chave] = (fila, filtro)
+    send, receive = req["send"], req["receive"]
+    try:
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream; charset=utf-8"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no"),
+            ],
+        })
+        ultimo = cursor
+        if cursor >= 0:
+            buffer = list(_hub["buffer"])
+            if buffer and cursor < buffer[0]["seq"] - 1:
+                # Cursor mais antigo que o buffer: o cliente deve recarregar o estado
+                await send({"type": "http.response.body", "body": b"event: reinicio\ndata: {}\n\n", "more_body": True})
+            for evento in buffer:
+                if evento["seq"] > cursor and _combina(evento, filtro):
+                    await send({"type": "http.response.body", "body": _formatar_sse(evento), "more_body": True})
+                    ultimo = evento["seq"]
+
+        desconectou = asyncio.ensure_future(receive())
+        while True:
+            proximo = asyncio.ensure_future(fila.get())
+            feitos, _ = await asyncio.wait({proximo, desconectou}, timeout=HUB_BATIMENTO, return_when=asyncio.FIRST_COMPLETED)
+            if desconectou in feitos:
+                proximo.cancel()
+                return None
+            if proximo in feitos:
+                evento = proximo.result()
+                if evento["seq"] > ultimo:
+                    await send({"type": "http.response.body", "body": _formatar_sse(evento), "more_body": True})
+                    ultimo = evento["seq"]
+            else:
+                proximo.cancel()
+                await send({"type": "http.response.body", "body": b": batimento\n\n", "more_body": True})
+    finally:
+        _hub["assinantes"].pop(chave, None)
+
+
+ROTAS = [
+    ("GET", re.compile(r"^/saude$"), saude),
+    ("GET", re.compile(r"^/metrics$"), metricas_prometheus),
+    ("GET", re.compile(r"^/cardapio$"), cardapio),
+    ("GET", re.compile(r"^/menu/?$"), menu_estatico),
+    ("GET", re.compile(r"^/menu/img/(?P<nome>[0-9a-f]{16}\.[a-z]+)$"), menu_imagem),
+    ("POST", re.compile(r"^/pedidos$"), novo_pedido),
+    ("GET", re.compile(r"^/rastreio/(?P<codigo>\d{4,5})(?P<formato>\.html)?$"), rastreio),
+    ("POST", re.compile(r"^/pedidos/(?P<pedido_id>\d+)/status$"), mudar_status),
+    ("GET", re.compile(r"^/eventos$"), transmitir_eventos),
+]
+
+
+def _rotear(metodo, caminho):
+    permitidos = False
+    for rota_metodo, padrao, handler in ROTAS:
+        m = padrao.match(caminho)
+        if m:
+            if rota_metodo == metodo:
+                return handler, m.groupdict()
+            permitidos = True
+    if permitidos:
+        raise ErroHTTP(405, "Método não permitido.")
+    raise ErroHTTP(404, "Rota não encontrada.")
+
+
+# ----------------------------
+# Aplicação ASGI
+# ----------------------------
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            msg = await receive()
+            if msg["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif msg["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+
+    try:
+        handler, params = _rotear(scope["method"], scope["path"])
+        req = {
+            "metodo": scope["method"],
+            "caminho": scope["path"],
+            "params": params,
+            "query": scope.get("query_string", b"").decode(),
+            "headers": {k.decode().lower(): v.decode() for k, v in scope.get("headers", [])},
+            "cliente": (scope.get("client") or ("", 0))[0],
+            "corpo": b"" if scope["method"] == "GET" else await _ler_corpo(receive),
+            "send": send,
+            "receive": receive,
+        }
+        inicio = time.perf_counter()
+        resultado = await handler(req)
+        if resultado is not None:
+            instrumentacao.registrar(f"api.{handler.__name__}", time.perf_counter() - inicio)
+        if resultado is None:
+            return  # resposta em fluxo já enviada pelo handler
+        status, headers, corpo = resultado
+    except ErroHTTP as e:
+        status, headers, corpo = resposta_erro(e)
+    except Exception:
+        traceback.print_exc()  # o detalhe fica no log do servidor, não na resposta
+        status, headers, corpo = resposta_json({"erro": "Erro interno."}, 500)
+    await _enviar(send, status, headers, corpo)
@@ -1,10 +1,19 @@
 # app.py — Sistema centralizado (Cardápio público + Rastreio + Login/Menu)
 import streamlit as st
-import json
 import os
-import random
 import time
-from datetime import datetime
+
+import autenticacao
+import carrinho
+import catalogo
+import clientes
+import eta
+import instrumentacao
+import tarefas
+import zonas
+from catalogo import buscar_produto, carregar_produtos
+from checkout import PedidoInvalido, criar_pedido
+from pedidos_db import buscar_por_codigo
 
 # ----------------------------
 # Config + esconder menu padrão
@@ -24,118 +33,121 @@ st.markdown("""
 # ----------------------------
 PEDIDOS_FILE = "pedidos.json"
 PRODUTOS_FILE = "produtos.json"
-USERS_FILE = "usuarios.json"
 UPLOADS_DIR = "uploads"
 os.makedirs(UPLOADS_DIR, exist_ok=True)
 
-# ----------------------------
-# Utilitários
-# ----------------------------
-def garantir_json(path, default):
-    if not os.path.exists(path):
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(default, f, indent=4, ensure_ascii=False)
-
-def carregar_json(path):
-    garantir_json(path, [])
-    with open(path, "r", encoding="utf-8") as f:
-        try:
-            return json.load(f)
-        except:
-            return []
-
-def salvar_json(path, data):
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
-
-def gerar_codigo_rastreio():
-    return f"{random.randint(1000,9999)}"
-
-# ----------------------------
-# Carregar/validar usuários (simples)
-# ----------------------------
-def carregar_usuarios():
-    if not os.path.exists(USERS_FILE):
-        usuarios_padrao = [
-            {"usuario": "admin", "senha": "1234", "nome": "Administrador"},
-            {"usuario": "caixa", "senha": "1234", "nome": "Caixa"},
-            {"usuario": "cozinha", "senha": "1234", "nome": "Cozinha"},
-            {"usuario": "entregador", "senha": "1234", "nome": "Entregador"}
-        ]
-        salvar_json(USERS_FILE, usuarios_padrao)
-    return carregar_json(USERS_FILE)
-
-def validar_login(usuario, senha):
-    usuarios = carregar_usuarios()
-    for u in usuarios:
-        if u["usuario"] == usuario and u["senha"] == senha:
-            return u
-    return None
-
 # ----------------------------
 # Renderizadores de páginas
 # ----------------------------
+def render_cliente_recorrente(cart):
+    """Cliente que volta: acha o cadastro pelo telefone (índice em clientes.py) e repete o último pedido."""
+    for aviso in st.session_state.pop("avisos_repetir", []):
+        st.warning(aviso)
+    with st.expander("🔁 Já pediu aqui? Repita seu último pedido"):
+        telefone = st.text_input("Seu telefone", key="telefone_cliente")
+        if not telefone.strip():
+            return
+        cliente = clientes.buscar_por_telefone(telefone)
+        if cliente is None or not cliente["historico"]:
+            st.caption("Nenhum pedido anterior com esse telefone.")
+            return
+        st.write(f"👋 Olá de novo, **{cliente['nome']}**! Você já fez {cliente['pedidos']} pedido(s).")
+        for resumo in cliente["historico"][:5]:
+            itens = ", ".join(f"{i['quantidade']}x {i['nome']}" for i in resumo["itens"])
+            st.caption(f"{resumo['data'][:10]} · #{resumo['codigo_rastreio']} · {itens} · R$ {resumo['total']:.2f}")
+        if st.button("🔁 Repetir pedido", key="repetir_pedido"):
+            st.session_state["avisos_repetir"] = carrinho.repetir(cart, cliente["historico"][0]["itens"])
+            st.rerun()
+
 def render_cardapio_publico():
     st.title("🍔 Cardápio Público - THE RUA")
     st.caption("Escolha seus produtos, monte seu pedido e acompanhe com um código de rastreio.")
 
-    produtos = carregar_json(PRODUTOS_FILE)
+    produtos = carregar_produtos()
     if not produtos:
         st.warning("⚠️ Nenhum produto cadastrado ainda. Aguarde o administrador ou acesse Administração.")
         return
 
     # Estado do carrinho
-    if "carrinho" not in st.session_state:
-        st.session_state.carrinho = []
+    if not isinstance(st.session_state.get("carrinho"), dict):
+        st.session_state.carrinho = carrinho.novo_carrinho()
+    cart = st.session_state.carrinho
 
-    cols = st.columns(2)
-    for i, produto in enumerate(produtos):
-        with cols[i % 2]:
-            img = produto.get("imagem", "")
-            if img and os.path.exists(img):
-                st.image(img, width=250)
-            elif produto.get("imagem", "").startswith("http"):
-                st.image(produto["imagem"], width=250)
-            else:
-                st.image("https://via.placeholder.com/250x250.png?text=Sem+Imagem", width=250)
-            st.subheader(produto["nome"])
-            st.caption(produto.get("descricao", ""))
-            st.markdown(f"💰 **R$ {float(produto['preco']):.2f}**")
-            qtd = st.number_input(f"Qtd {produto['nome']}", min_value=0, step=1, key=f"q_{produto['id']}")
-            if qtd > 0:
-                if st.button(f"Adicionar {produto['nome']}", key=f"add_{produto['id']}"):
-                    st.session_state.carrinho.append({
-                        "id": produto["id"],
-                        "nome": produto["nome"],
-                        "quantidade": qtd,
-                        "preco": float(produto["preco"])
-                    })
-                    st.success(f"{produto['nome']} adicionado ao carrinho!")
+    if st.session_state.get("somente_checkout"):
+        # Veio do cardápio estático: vai direto ao carrinho/checkout
+        if st.button("📖 Ver cardápio completo"):
+            st.session_state["somente_checkout"] = False
+            st.rerun()
+    else:
+        # Busca no índice do catálogo ou uma categoria por vez (só ela é renderizada)
+        busca = st.text_input("🔎 Buscar no cardápio", placeholder="Ex: bacon, batata, refri")
+        if busca.strip():
+            vitrine = catalogo.buscar(busca)
+            if not vitrine:
+                st.info("Nenhum produto encontrado.")
+        else:
+            categoria_escolhida = st.radio("Categoria", catalogo.categorias(), horizontal=True)
+            vitrine = catalogo.produtos_da_categoria(categoria_escolhida)
+        cols = st.columns(2)
+        for i, produto in enumerate(vitrine):
+            with cols[i % 2]:
+                img = produto.get("imagem", "")
+                if img and os.path.exists(img):
+                    st.image(img, width=250)
+                elif produto.get("imagem", "").startswith("http"):
+                    st.image(produto["imagem"], width=250)
+                else:
+                    st.image("https://via.placeholder.com/250x250.png?text=Sem+Imagem", width=250)
+                st.subheader(produto["nome"])
+                st.caption(produto.get("descricao", ""))
+                st.markdown(f"💰 **R$ {float(produto['preco']):.2f}**")
+                if not catalogo.disponivel(produto):
+                    st.caption("🚫 Esgotado no momento")
+                    continue
+                qtd = st.number_input(f"Qtd {produto['nome']}", min_value=0, step=1, key=f"q_{produto['id']}")
+                if qtd > 0:
+                    if st.button(f"Adicionar {produto['nome']}", key=f"add_{produto['id']}"):
+                        carrinho.adicionar(cart, produto, qtd)
+                        st.success(f"{produto['nome']} adicionado ao carrinho!")
 
     st.divider()
+    render_cliente_recorrente(cart)
     st.header("🛒 Seu Carrinho")
-    if not st.session_state.carrinho:
+    for aviso in carrinho.reprecificar(cart):
+        st.warning(aviso)
+    if carrinho.vazio(cart):
         st.info("Seu carrinho está vazio.")
     else:
-        total = 0
-        for i, item in enumerate(st.session_state.carrinho):
-            sub = item["quantidade"] * item["preco"]
-            total += sub
-            st.write(f"**{item['quantidade']}x {item['nome']}** — R$ {sub:.2f}")
-            if st.button(f"❌ Remover {item['nome']}", key=f"rm_{i}"):
-                st.session_state.carrinho.pop(i)
+        for item in carrinho.itens(cart):
+            st.write(f"**{item['quantidade']}x {item['nome']}** — R$ {item['quantidade'] * item['preco']:.2f}")
+            if st.button(f"❌ Remover {item['nome']}", key=f"rm_{item['id']}"):
+                carrinho.remover(cart, item["id"])
                 st.rerun()
-        st.markdown(f"### 💵 Total: R$ {total:.2f}")
+        st.markdown(f"### 💵 Total: R$ {cart['total']:.2f}")
 
         st.divider()
         st.header("📦 Finalizar Pedido")
-        nome = st.text_input("Nome completo")
-        telefone = st.text_input("Telefone / WhatsApp")
-        tipo_pedido = st.radio("Tipo de pedido", ["Consumir no local", "Retirada", "Entrega"])
+        # Cliente conhecido: preenche com os dados do último pedido
+        telefone = st.text_input("Telefone / WhatsApp", st.session_state.get("telefone_cliente", ""))
+        cliente = clientes.buscar_por_telefone(telefone) or {}
+        nome = st.text_input("Nome completo", cliente.get("nome", ""))
+        tipos = ["Consumir no local", "Retirada", "Entrega"]
+        tipo_pedido = st.radio("Tipo de pedido", tipos,
+                               index=tipos.index(cliente["tipo_pedido"]) if cliente.get("tipo_pedido") in tipos else 0)
         endereco = ""
         if tipo_pedido == "Entrega":
-            endereco = st.text_area("Endereço completo")
-        pagamento = st.selectbox("Forma de pagamento", ["Dinheiro", "Cartão", "Pix", "Transferência"])
+            endereco = st.text_area("Endereço completo", cliente.get("endereco", ""))
+            if endereco.strip():
+                cotacao = zonas.cotar_endereco(endereco)
+                if not cotacao["atende"]:
+                    st.error(cotacao["motivo"])
+                elif cotacao["taxa"]:
+                    zona = f" ({cotacao['zona']})" if cotacao["zona"] else ""
+                    st.markdown(f"🛵 Taxa de entrega{zona}: R$ {cotacao['taxa']:.2f} — "
+                                f"**Total com entrega: R$ {cart['total'] + cotacao['taxa']:.2f}**")
+        formas = ["Dinheiro", "Cartão", "Pix", "Transferência"]
+        pagamento = st.selectbox("Forma de pagamento", formas,
+                                 index=formas.index(cliente["pagamento"]) if cliente.get("pagamento") in formas else 0)
         troco_para = ""
         comprovante_path = ""
         if pagamento == "Dinheiro":
@@ -143,45 +155,37 @@ def render_cardapio_publico():
         elif pagamento == "Pix":
             comprovante = st.file_uploader("Anexar comprovante (opcional)", type=["png","jpg","jpeg","pdf"])
             if comprovante:
-                fname = f"{int(time.time())}_{comprovante.name}"
-                path = os.path.join(UPLOADS_DIR, fname)
-                with open(path, "wb") as f:
-                    f.write(comprovante.getbuffer())
-                comprovante_path = path
+                # O arquivo só é gravado ao confirmar, em segundo plano
+                comprovante_path = os.path.join(UPLOADS_DIR, f"{int(time.time())}_{comprovante.name}")
         observacoes = st.text_area("Observações (ex: sem alface)")
 
         if st.button("✅ Confirmar Pedido"):
-            if not nome or not telefone:
-                st.error("Preencha nome e telefone.")
-            elif not st.session_state.carrinho:
-                st.error("Carrinho vazio.")
+            dados = {
+                "nome": nome,
+                "telefone": telefone,
+                "tipo_pedido": tipo_pedido,
+                "endereco": endereco,
+                "pagamento": pagamento,
+                "troco_para": troco_para,
+                "comprovante": comprovante_path,
+                "observacoes": observacoes,
+            }
+            try:
+                pedido, criado = criar_pedido(dados, carrinho.itens(cart), cart.get("token"))
+            except PedidoInvalido as e:
+                for erro in e.erros:
+                    st.error(erro)
             else:
-                codigo = gerar_codigo_rastreio()
-                pedido = {
-                    "id": str(int(time.time())),
-                    "codigo_rastreio": codigo,
-                    "nome": nome,
-                    "telefone": telefone,
-                    "tipo_pedido": tipo_pedido,
-                    "endereco": endereco,
-                    "pagamento": pagamento,
-                    "troco_para": troco_para,
-                    "comprovante": comprovante_path,
-                    "observacoes": observacoes,
-                    "produtos": st.session_state.carrinho,
-                    "status": "Aguardando aceite",
-                    "data": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "total": total
-                }
-                pedidos = carregar_json(PEDIDOS_FILE)
-                pedidos.append(pedido)
-                salvar_json(PEDIDOS_FILE, pedidos)
-                st.session_state.carrinho = []
-                st.session_state["ultimo_codigo"] = codigo
-                st.success(f"🎉 Pedido realizado! Código: {codigo}")
-                st.balloons()
+                if criado and comprovante_path:
+                    tarefas.enfileirar("gravar_comprovante", {"caminho": comprovante_path},
+                                       anexo=comprovante.getvalue(), descricao=f"Comprovante #{pedido['codigo_rastreio']}")
+                st.session_state.carrinho = carrinho.novo_carrinho()
+                st.session_state["ultimo_codigo"] = pedido["codigo_rastreio"]
+                st.session_state["comemorar"] = True
                 st.rerun()
 
+    if st.session_state.pop("comemorar", False):
+        st.balloons()
     if "ultimo_codigo" in st.session_state:
         st.info(f"✅ Pedido registrado. Seu código de rastreio: **{st.session_state['ultimo_codigo']}**")
         if st.button("Fechar aviso"):
@@ -196,13 +200,15 @@ def render_rastreamento():
         if not codigo:
             st.error("Digite o código.")
             return
-        pedidos = carregar_json(PEDIDOS_FILE)
-        encontrados = [p for p in pedidos if str(p.get("codigo_rastreio","")) == str(codigo)]
-        if not encontrados:
+        p = buscar_por_codigo(codigo)
+        if p is None:
             st.warning("Código não encontrado. Verifique e tente novamente.")
             return
-        p = encontrados[0]
         st.success(f"Pedido #{p.get('codigo_rastreio')} — Status: {p.get('status')}")
+        if p.get("status") != "Entregue":
+            previsao = eta.estimar(p)
+            if previsao["minutos"] > 0:
+                st.info(f"⏳ Previsão: ~{previsao['minutos']} min (por volta das {previsao['previsao']}) — {previsao['fila']} pedido(s) em preparo.")
         st.write(f"👤 Cliente: {p.get('nome')} — {p.get('telefone')}")
         st.write(f"🕒 Data: {p.get('data')}")
         st.write(f"📦 Tipo: {p.get('tipo_pedido')}")
@@ -224,22 +230,52 @@ if "logado" not in st.session_state:
 if "pagina" not in st.session_state:
     st.session_state["pagina"] = "Cardápio Público"
 
+# Checkout vindo do cardápio estático (?itens=1:2,3:1): a sessão só começa aqui
+if "itens" in st.query_params:
+    st.session_state.carrinho = carrinho.novo_carrinho()
+    for par in st.query_params["itens"].split(","):
+        pid, _, qtd = par.partition(":")
+        produto = buscar_produto(pid)
+        if produto and qtd.isdigit():
+            carrinho.adicionar(st.session_state.carrinho, produto, int(qtd))
+    st.session_state["somente_checkout"] = True
+    del st.query_params["itens"]
+
+# Páginas internas: o menu mostra só as que o papel do usuário acessa
+PAGINAS = {
+    "Caixa": "pages/caixa.py",
+    "Cozinha": "pages/cozinha.py",
+    "Entregador": "pages/painel_entregador.py",
+    "Relatórios": "pages/relatorios.py",
+    "Estoque": "pages/estoque.py",
+    "Desempenho": "pages/desempenho.py",
+    "Administração": "pages/cadastro_produto.py",
+    "Usuários": "pages/gerenciar_usuarios.py",
+}
+
+# Sessão conferida pelo token assinado (sem reler usuarios.json)
+sessao = autenticacao.sessao_valida(st.session_state)
+
 st.sidebar.title("🍔 THE RUA")
-if not st.session_state["logado"]:
+if sessao is None:
     escolha = st.sidebar.radio("Menu", ["Cardápio Público", "Rastreio", "Login"])
 else:
-    escolha = st.sidebar.radio("Menu", ["Cardápio Público", "Rastreio", "Caixa", "Cozinha", "Entregador", "Relatórios", "Administração"])
+    permitidas = [nome for nome, arquivo in PAGINAS.items()
+                  if autenticacao.pode_acessar(sessao["papel"], os.path.basename(arquivo)[:-3])]
+    escolha = st.sidebar.radio("Menu", ["Cardápio Público", "Rastreio"] + permitidas)
+    st.sidebar.caption(f"👤 {sessao['nome']} ({sessao['papel']})")
+    if st.sidebar.button("🚪 Sair"):
+        autenticacao.encerrar_sessao(st.session_state)
+        st.rerun()
 
 if escolha == "Login":
     st.title("🔐 Login")
     usuario = st.text_input("Usuário")
     senha = st.text_input("Senha", type="password")
     if st.button("Entrar"):
-        user = validar_login(usuario, senha)
+        user = autenticacao.autenticar(usuario, senha)
         if user:
-            st.session_state["logado"] = True
-            st.session_state["usuario"] = user["usuario"]
-            st.session_state["nome"] = user["nome"]
+            autenticacao.iniciar_sessao(st.session_state, user)
             st.success(f"Bem-vindo(a), {user['nome']}!")
             st.rerun()
         else:
@@ -248,23 +284,17 @@ if escolha == "Login":
 
 else:
     if escolha == "Cardápio Público":
-        render_cardapio_publico()
+        with instrumentacao.cronometro("pagina.cardapio"):
+            render_cardapio_publico()
     elif escolha == "Rastreio":
-        render_rastreamento()
+        with instrumentacao.cronometro("pagina.rastreio"):
+            render_rastreamento()
     else:
-        if not st.session_state["logado"]:
+        if sessao is None:
             st.warning("⚠️ Acesso restrito — faça login para ver essa página.")
             st.stop()
 
-        mapping = {
-            "Caixa": "pages/caixa.py",
-            "Cozinha": "pages/cozinha.py",
-            "Entregador": "pages/entregador.py",
-            "Relatórios": "pages/relatorios.py",
-            "Administração": "pages/cadastro_produtos.py"
-        }
-
-        target = mapping.get(escolha, None)
+        target = PAGINAS.get(escolha, None)
         if target and os.path.exists(target):
             st.switch_page(target)
         else:
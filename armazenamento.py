@@ -0,0 +1,94 @@
+# armazenamento.py — Utilitários de persistência em JSON compartilhados pelas páginas
+import json
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+from instrumentacao import medir
+
+# Travas por arquivo dentro do mesmo processo (Streamlit roda cada sessão numa thread)
+_travas_locais = {}
+_travas_guard = threading.Lock()
+_posse = threading.local()
+
+
+@medir("json.carregar")
+def ler_json(path, default):
+    """Lê um JSON do disco; devolve `default` se não existir ou estiver corrompido."""
+    if not os.path.exists(path):
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            return json.load(f)
+        except Exception:
+            return default
+
+
+@medir("json.salvar")
+def gravar_json(path, data):
+    """Grava o JSON num arquivo temporário e troca de forma atômica."""
+    pasta = os.path.dirname(path)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def mtime(path):
+    """Assinatura de modificação do arquivo (0 se não existir)."""
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        return 0
+
+
+def _trava_local(path):
+    with _travas_guard:
+        if path not in _travas_locais:
+            _travas_locais[path] = threading.RLock()
+        return _travas_locais[path]
+
+
+@contextmanager
+def trava(path, timeout=10.0):
+    """Exclusão mútua entre threads e processos usando um arquivo `.lock`."""
+    local = _trava_local(path)
+    with local:
+        mantidas = getattr(_posse, "travas", None)
+        if mantidas is None:
+            mantidas = _posse.travas = set()
+        if path in mantidas:
+            # Reentrada na mesma thread: o arquivo .lock já é nosso
+            yield
+            return
+        lock_path = f"{path}.lock"
+        inicio = time.monotonic()
+        fd = None
+        while fd is None:
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                # Trava abandonada por um processo que morreu
+                try:
+                    if time.time() - os.path.getmtime(lock_path) > timeout:
+                        os.remove(lock_path)
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.monotonic() - inicio > timeout:
+                    raise TimeoutError(f"Não foi possível travar {path}")
+                time.sleep(0.005)
+        mantidas.add(path)
+        try:
+            yield
+        finally:
+            mantidas.discard(path)
+            os.close(fd)
+            try:
+                os.remove(lock_path)
+            except FileNotFoundError:
+                pass
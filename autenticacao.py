@@ -0,0 +1,333 @@
+# autenticacao.py — Usuários, senhas com hash (scrypt) e sessões assinadas
+#
+# usuarios.json guarda só o hash de cada senha (scrypt com sal; os
+# parâmetros vão junto no hash). O hash lento roda apenas no login: a sessão
+# recebe um token assinado (HMAC) com o papel do usuário, e cada página
+# confere a assinatura contra o índice de usuários em memória, relido só
+# quando usuarios.json muda. Trocar a senha ou o papel invalida os tokens
+# antigos daquele usuário.
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import time
+
+from armazenamento import gravar_json, ler_json, mtime, trava
+
+USUARIOS_FILE = "usuarios.json"
+AUTH_CONFIG_FILE = "autenticacao_config.json"
+SEGREDO_FILE = "segredo_sessao.key"  # chave HMAC dos tokens (ou THE_RUA_SEGREDO no ambiente)
+PAPEIS = ["admin", "caixa", "cozinha", "entregador"]
+AUTH_PADRAO = {
+    "scrypt_n": 2 ** 14,   # custo do hash; ajuste com calibrar() (python autenticacao.py)
+    "sessao_horas": 12,
+}
+ALVO_LOGIN_MS = 100  # latência alvo do login, medida em bench/cenarios.py
+SCRYPT_R, SCRYPT_P = 8, 1
+
+# Páginas restritas -> papéis com acesso (admin acessa todas)
+ACESSO = {
+    "caixa": ["caixa"],
+    "cozinha": ["cozinha", "caixa"],
+    "painel_entregador": ["entregador"],
+    "novo_pedido": ["caixa"],
+    "relatorios": ["caixa"],
+    "estoque": ["cozinha"],
+    "desempenho": [],
+    "cadastro_produto": [],
+    "gerenciar_usuarios": [],
+}
+# Criados (com senha 1234) quando não existe usuarios.json
+USUARIOS_PADRAO = [
+    ("admin", "Administrador", "admin"),
+    ("caixa", "Caixa", "caixa"),
+    ("cozinha", "Cozinha", "cozinha"),
+    ("entregador", "Entregador", "entregador"),
+]
+
+
+class UsuarioInvalido(ValueError):
+    """Cadastro de usuário recusado (papel desconhecido, sem senha, último administrador...)."""
+
+
+_cache = {"assinatura": None, "usuarios": {}, "hash_falso": None}
+_segredo = {}
+
+
+def carregar_config():
+    return {**AUTH_PADRAO, **ler_json(AUTH_CONFIG_FILE, {})}
+
+
+def salvar_config(config):
+    gravar_json(AUTH_CONFIG_FILE, {**AUTH_PADRAO, **config})
+
+
+# ----------------------------
+# Hash das senhas
+# ----------------------------
+def _b64(dados):
+    return base64.urlsafe_b64encode(dados).rstrip(b"=").decode("ascii")
+
+
+def _d64(texto):
+    return base64.urlsafe_b64decode(texto + "=" * (-len(texto) % 4))
+
+
+def _scrypt(senha, sal, n, r, p):
+    return hashlib.scrypt(str(senha).encode("utf-8"), salt=sal, n=n, r=r, p=p, maxmem=256 * 1024 * 1024)
+
+
+def gerar_hash(senha, n=None):
+    """'scrypt$n$r$p$sal$hash' de uma senha, com sal aleatório."""
+    n = n or carregar_config()["scrypt_n"]
+    sal = secrets.token_bytes(16)
+    return f"scrypt${n}${SCRYPT_R}${SCRYPT_P}${_b64(sal)}${_b64(_scrypt(senha, sal, n, SCRYPT_R, SCRYPT_P))}"
+
+
+def conferir_senha(senha, senha_hash):
+    try:
+        algoritmo, n, r, p, sal, esperado = senha_hash.split("$")
+        calculado = _scrypt(senha, _d64(sal), int(n), int(r), int(p))
+    except (AttributeError, ValueError):
+        return False
+    return algoritmo == "scrypt" and hmac.compare_digest(calculado, _d64(esperado))
+
+
+def _custo(senha_hash):
+    return int(senha_hash.split("$")[1])
+
+
+def _hash_falso():
+    """Hash de referência para usuários inexistentes: o login leva o mesmo tempo."""
+    if _cache["hash_falso"] is None:
+        _cache["hash_falso"] = gerar_hash(secrets.token_hex(8))
+    return _cache["hash_falso"]
+
+
+# ----------------------------
+# Índice de usuários
+# ----------------------------
+def _migrar(usuarios):
+    """Converte a lista antiga (senha em texto) ou cria os usuários padrão."""
+    if not usuarios:
+        return {u: {"usuario": u, "nome": nome, "papel": papel, "senha_hash": gerar_hash("1234")}
+                for u, nome, papel in USUARIOS_PADRAO}
+    migrados = {}
+    for u in usuarios:
+        papel = u.get("papel") or (u["usuario"] if u["usuario"] in PAPEIS else "caixa")
+        migrados[u["usuario"]] = {
+            "usuario": u["usuario"], "nome": u.get("nome", u["usuario"]), "papel": papel,
+            "senha_hash": u.get("senha_hash") or gerar_hash(u.get("senha", "")),
+        }
+    return migrados
+
+
+def _carregar():
+    assinatura = mtime(USUARIOS_FILE)
+    if assinatura == _cache["assinatura"]:
+        return _cache["usuarios"]
+    usuarios = ler_json(USUARIOS_FILE, [])
+    if not usuarios or any("senha_hash" not in u for u in usuarios):
+        with trava(USUARIOS_FILE):
+            usuarios = ler_json(USUARIOS_FILE, [])
+            if not usuarios or any("senha_hash" not in u for u in usuarios):
+                gravar_json(USUARIOS_FILE, list(_migrar(usuarios).values()))
+                usuarios = ler_json(USUARIOS_FILE, [])
+            assinatura = mtime(USUARIOS_FILE)
+    _cache["usuarios"] = {u["usuario"]: u for u in usuarios}
+    _cache["assinatura"] = assinatura
+    return _cache["usuarios"]
+
+
+def _publico(registro):
+    return {"usuario": registro["usuario"], "nome": registro["nome"], "papel": registro["papel"]}
+
+
+def listar_usuarios():
+    return [_publico(u) for u in _carregar().values()]
+
+
+def buscar_usuario(usuario):
+    registro = _carregar().get(str(usuario or "").strip())
+    return _publico(registro) if registro else None
+
+
+def _alterar(funcao):
+    """Aplica `funcao(usuarios)` no arquivo sob a trava (releitura do disco)."""
+    with trava(USUARIOS_FILE):
+        _carregar()
+        usuarios = {u["usuario"]: u for u in ler_json(USUARIOS_FILE, [])}
+        resultado = funcao(usuarios)
+        gravar_json(USUARIOS_FILE, list(usuarios.values()))
+    return resultado
+
+
+def salvar_usuario(usuario, nome, papel, senha=None):
+    """Cria o usuário ou altera nome/papel (e a senha, se informada)."""
+    usuario = str(usuario or "").strip()
+    if not usuario:
+        raise UsuarioInvalido("Informe o usuário.")
+    if papel not in PAPEIS:
+        raise UsuarioInvalido(f"Papel deve ser um de: {', '.join(PAPEIS)}.")
+    novo_hash = gerar_hash(senha) if senha else None  # fora da trava: é o passo lento
+
+    def aplicar(usuarios):
+        atual = usuarios.get(usuario)
+        if atual is None and not novo_hash:
+            raise UsuarioInvalido("Informe a senha do novo usuário.")
+        if atual is not None and atual["papel"] == "admin" and papel != "admin" and _admins(usuarios) == 1:
+            raise UsuarioInvalido("O sistema precisa de pelo menos um administrador.")
+        usuarios[usuario] = {"usuario": usuario, "nome": str(nome or usuario).strip(), "papel": papel,
+                             "senha_hash": novo_hash or atual["senha_hash"]}
+        return _publico(usuarios[usuario])
+    return _alterar(aplicar)
+
+
+def remover_usuario(usuario):
+    def aplicar(usuarios):
+        atual = usuarios.get(usuario)
+        if atual is None:
+            return False
+        if atual["papel"] == "admin" and _admins(usuarios) == 1:
+            raise UsuarioInvalido("O sistema precisa de pelo menos um administrador.")
+        del usuarios[usuario]
+        return True
+    return _alterar(aplicar)
+
+
+def _admins(usuarios):
+    return sum(1 for u in usuarios.values() if u["papel"] == "admin")
+
+
+# ----------------------------
+# Login
+# ----------------------------
+def autenticar(usuario, senha):
+    """Confere usuário e senha (o único passo lento); devolve {usuario, nome, papel} ou None.
+
+    Hashes com custo diferente do configurado são refeitos no login certo.
+    """
+    registro = _carregar().get(str(usuario or "").strip())
+    if registro is None:
+        conferir_senha(senha, _hash_falso())
+        return None
+    if not conferir_senha(senha, registro["senha_hash"]):
+        return None
+    n = carregar_config()["scrypt_n"]
+    if _custo(registro["senha_hash"]) != n:
+        novo_hash = gerar_hash(senha, n)
+
+        def aplicar(usuarios):
+            if registro["usuario"] in usuarios:
+                usuarios[registro["usuario"]]["senha_hash"] = novo_hash
+        _alterar(aplicar)
+    return _publico(registro)
+
+
+def calibrar(alvo_ms=ALVO_LOGIN_MS, salvar=True):
+    """Maior custo do scrypt cujo hash fica dentro do alvo nesta máquina; devolve (n, ms)."""
+    n, medido = 2 ** 12, None
+    while True:
+        inicio = time.perf_counter()
+        _scrypt("calibragem", b"0" * 16, n * 2, SCRYPT_R, SCRYPT_P)
+        ms = (time.perf_counter() - inicio) * 1000
+        if ms > alvo_ms or n >= 2 ** 20:
+            break
+        n, medido = n * 2, ms
+    if salvar:
+        salvar_config({**carregar_config(), "scrypt_n": n})
+    return n, medido
+
+
+# ----------------------------
+# Tokens de sessão
+# ----------------------------
+def _chave():
+    if "chave" not in _segredo:
+        segredo = os.environ.get("THE_RUA_SEGREDO", "")
+        if not segredo:
+            with trava(SEGREDO_FILE):
+                if not os.path.exists(SEGREDO_FILE):
+                    fd = os.open(SEGREDO_FILE, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+                    with os.fdopen(fd, "w") as f:
+                        f.write(secrets.token_hex(32))
+                with open(SEGREDO_FILE, "r") as f:
+                    segredo = f.read().strip()
+        _segredo["chave"] = segredo.encode("utf-8")
+    return _segredo["chave"]
+
+
+def _geracao(registro):
+    """Muda quando a senha ou o papel mudam (derruba tokens antigos)."""
+    return hashlib.sha1(f"{registro['senha_hash']}|{registro['papel']}".encode("utf-8")).hexdigest()[:10]
+
+
+def _assinar(corpo):
+    return _b64(hmac.new(_chave(), corpo.encode("ascii"), hashlib.sha256).digest())
+
+
+def emitir_token(usuario):
+    registro = _carregar()[usuario]
+    validade = int(time.time() + carregar_config()["sessao_horas"] * 3600)
+    corpo = _b64(f"{usuario}|{registro['papel']}|{validade}|{_geracao(registro)}".encode("utf-8"))
+    return f"{corpo}.{_assinar(corpo)}"
+
+
+def verificar_token(token):
+    """{usuario, nome, papel} do token, ou None se a assinatura, a validade ou o usuário não baterem."""
+    corpo, _, assinatura = str(token or "").partition(".")
+    if not assinatura or not hmac.compare_digest(assinatura, _assinar(corpo)):
+        return None
+    try:
+        usuario, papel, validade, geracao = _d64(corpo).decode("utf-8").rsplit("|", 3)
+        validade = int(validade)
+    except ValueError:
+        return None
+    registro = _carregar().get(usuario)
+    if validade < time.time() or registro is None or registro["papel"] != papel or _geracao(registro) != geracao:
+        return None
+    return _publico(registro)
+
+
+# ----------------------------
+# Sessão do Streamlit (st.session_state)
+# ----------------------------
+def iniciar_sessao(estado, dados):
+    """Grava no session_state o usuário autenticado e o token da sessão."""
+    estado["token"] = emitir_token(dados["usuario"])
+    estado["logado"] = True
+    estado["usuario"] = dados["usuario"]
+    estado["nome"] = dados["nome"]
+    estado["papel"] = dados["papel"]
+
+
+def encerrar_sessao(estado):
+    for chave in ("token", "usuario", "nome", "papel"):
+        estado.pop(chave, None)
+    estado["logado"] = False
+
+
+def pode_acessar(papel, pagina):
+    return papel == "admin" or papel in ACESSO.get(pagina, [])
+
+
+def sessao_valida(estado, pagina=None):
+    """Dados do usuário da sessão (checagem barata: HMAC + índice em memória), ou None.
+
+    Com `pagina`, também exige um papel com acesso a ela. Token vencido ou
+    revogado encerra a sessão.
+    """
+    dados = verificar_token(estado.get("token"))
+    if dados is None:
+        if estado.get("logado"):
+            encerrar_sessao(estado)
+        return None
+    if pagina is not None and not pode_acessar(dados["papel"], pagina):
+        return None
+    return dados
+
+
+if __name__ == "__main__":
+    n, ms = calibrar()
+    print(f"scrypt n={n} (~{ms:.0f} ms por login; alvo {ALVO_LOGIN_MS} ms)" if ms else f"scrypt n={n}")
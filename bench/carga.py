@@ -0,0 +1,372 @@
+# bench/carga.py — Teste de carga: clientes e tablets da equipe ao mesmo tempo
+#
+# Uso (na raiz do projeto):
+#   python -m bench.carga                              # 30 trabalhadores em 2 processos, 30 s
+#   python -m bench.carga --trabalhadores 60 --processos 4 --mix checkout=4,rastreio=8,status=3
+#   python -m bench.carga --url http://127.0.0.1:8502 --token $THE_RUA_API_TOKEN --dados /caminho/do/app
+#
+# Sem --url, cada processo carrega a API (api.app) em memória sobre uma cópia
+# de dados sintéticos — vários processos disputando os mesmos arquivos, como o
+# Streamlit e a API em produção. Com --url, bate num servidor já no ar.
+#
+# Ao final confere a integridade: pedidos confirmados que não estão no disco
+# (perdidos), pedidos gravados duas vezes (duplicados) e mudanças de status
+# confirmadas que sumiram.
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import secrets
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+from bench.executar import RESULTADOS_DIR, _versao, resumir  # noqa: E402
+from bench.gerador import gerar_dados  # noqa: E402
+
+MIX_PADRAO = "checkout=3,rastreio=6,status=3"
+OPERACOES = ("checkout", "rastreio", "status")
+MARCA = "carga:"  # vai nas observações do pedido para achar duplicados depois
+CAMINHO_STATUS = {
+    "Aguardando aceite": "Em preparo",
+    "Em preparo": "Pronto",
+    "Pronto": "Entregue",
+}
+ORDEM_STATUS = ["Aguardando aceite", "Em preparo", "Pronto", "Em rota de entrega", "Entregue"]
+
+_local = threading.local()  # IP do trabalhador (limite de rastreio é por cliente)
+
+
+def ler_mix(texto):
+    """'checkout=3,rastreio=6' -> {'checkout': 3.0, 'rastreio': 6.0}"""
+    mix = {}
+    for parte in filter(None, (p.strip() for p in texto.split(","))):
+        nome, _, peso = parte.partition("=")
+        if nome not in OPERACOES:
+            raise argparse.ArgumentTypeError(f"Operação desconhecida: {nome} (use {', '.join(OPERACOES)})")
+        mix[nome] = float(peso or 1)
+    if not mix or not any(mix.values()):
+        raise argparse.ArgumentTypeError("O mix precisa de pelo menos uma operação com peso.")
+    return mix
+
+
+# ----------------------------
+# Requisições (API em memória ou servidor HTTP)
+# ----------------------------
+def _requisitar_local(metodo, caminho, corpo, headers, ip):
+    import api
+    corpo_bytes = json.dumps(corpo).encode() if corpo is not None else b""
+    caminho, _, query = caminho.partition("?")
+    resposta = {}
+
+    async def receive():
+        return {"type": "http.request", "body": corpo_bytes, "more_body": False}
+
+    async def send(msg):
+        if msg["type"] == "http.response.start":
+            resposta["status"] = msg["status"]
+        else:
+            resposta["corpo"] = resposta.get("corpo", b"") + msg.get("body", b"")
+
+    scope = {
+        "type": "http", "method": metodo, "path": caminho, "query_string": query.encode(),
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()], "client": (ip, 0),
+    }
+    asyncio.run(api.app(scope, receive, send))
+    return resposta["status"], resposta.get("corpo", b"")
+
+
+def _requisitar_http(url, metodo, caminho, corpo, headers):
+    dados = json.dumps(corpo).encode() if corpo is not None else None
+    req = urllib.request.Request(url + caminho, data=dados, method=metodo,
+                                 headers={"content-type": "application/json", **headers})
+    try:
+        with urllib.request.urlopen(req, timeout=30) as r:
+            return r.status, r.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+# ----------------------------
+# Trabalhadores
+# ----------------------------
+def _operacao(estado, nome, metodo, caminho, corpo=None, headers=None):
+    """Faz a chamada, mede e contabiliza; devolve (status, json) ou (None, None) em exceção."""
+    headers = headers or {}
+    inicio = time.perf_counter()
+    try:
+        if estado["url"]:
+            status, corpo_resp = _requisitar_http(estado["url"], metodo, caminho, corpo, headers)
+        else:
+            status, corpo_resp = _requisitar_local(metodo, caminho, corpo, headers, _local.ip)
+    except Exception as e:
+        with estado["trava"]:
+            estado["contagens"][f"{nome}.excecao"] += 1
+            estado["exemplos_erro"].setdefault(type(e).__name__, str(e)[:200])
+        return None, None
+    duracao = time.perf_counter() - inicio
+    with estado["trava"]:
+        estado["tempos"][nome].append(duracao)
+        estado["contagens"][f"{nome}.{status}"] += 1
+    try:
+        return status, json.loads(corpo_resp or b"null")
+    except ValueError:
+        return status, None
+
+
+def _checkout(estado, rnd):
+    itens = [{"id": p, "quantidade": rnd.randint(1, 3)} for p in rnd.sample(estado["produtos"], k=min(3, len(estado["produtos"])))]
+    chave = secrets.token_hex(8)
+    tipo = rnd.choice(["Consumir no local", "Retirada", "Entrega"])
+    corpo = {
+        "nome": f"Carga {chave[:4]}", "telefone": f"(11) 9{rnd.randint(1000, 9999)}-{rnd.randint(1000, 9999)}",
+        "tipo_pedido": tipo, "endereco": "Rua da Carga, 1" if tipo == "Entrega" else "",
+        "pagamento": rnd.choice(["Dinheiro", "Cartão", "Pix"]), "observacoes": MARCA + chave, "itens": itens,
+    }
+    cabecalhos = {"Idempotency-Key": chave}
+    status, resp = _operacao(estado, "checkout", "POST", "/pedidos", corpo, cabecalhos)
+    if status is None or status >= 500:
+        # Cliente real: tenta de novo com a mesma chave (não pode duplicar)
+        status, resp = _operacao(estado, "checkout", "POST", "/pedidos", corpo, cabecalhos)
+    if status not in (200, 201):
+        return
+    with estado["trava"]:
+        estado["confirmados"][chave] = resp["id"]
+        estado["codigos"].append(resp["codigo_rastreio"])
+        estado["livres"].append(resp["id"])
+        estado["status"][resp["id"]] = resp["status"]
+    if rnd.random() < estado["reenvio"]:
+        # Duplo clique / rede instável: o mesmo pedido de novo deve devolver o original
+        status, repetido = _operacao(estado, "checkout", "POST", "/pedidos", corpo, cabecalhos)
+        if status in (200, 201) and (status == 201 or repetido["id"] != resp["id"]):
+            with estado["trava"]:
+                estado["contagens"]["checkout.duplicado_na_resposta"] += 1
+
+
+def _rastreio(estado, rnd):
+    with estado["trava"]:
+        codigo = rnd.choice(estado["codigos"]) if estado["codigos"] else None
+    if codigo:
+        _operacao(estado, "rastreio", "GET", f"/rastreio/{codigo}")
+
+
+def _status(estado, rnd):
+    # Cada pedido é "pego" por um tablet por vez; um 409 aqui é atualização perdida
+    with estado["trava"]:
+        if not estado["livres"]:
+            return
+        pedido_id = estado["livres"].pop(rnd.randrange(len(estado["livres"])))
+        atual = estado["status"][pedido_id]
+    novo = CAMINHO_STATUS[atual]
+    status, _ = _operacao(estado, "status", "POST", f"/pedidos/{pedido_id}/status", {"status": novo},
+                          {"Authorization": f"Bearer {estado['token']}"})
+    with estado["trava"]:
+        if status == 200:
+            estado["status"][pedido_id] = novo
+        if estado["status"][pedido_id] in CAMINHO_STATUS:
+            estado["livres"].append(pedido_id)
+
+
+EXECUTORES = {"checkout": _checkout, "rastreio": _rastreio, "status": _status}
+
+
+def _trabalhador(estado, ip, semente, fim, pausa):
+    _local.ip = ip
+    rnd = random.Random(semente)
+    nomes, pesos = zip(*estado["mix"].items())
+    while time.monotonic() < fim:
+        EXECUTORES[rnd.choices(nomes, pesos)[0]](estado, rnd)
+        if pausa:
+            time.sleep(rnd.uniform(0, 2 * pausa))
+
+
+def _processo(indice, config, fila):
+    """Um processo com vários trabalhadores (threads), como um servidor com várias sessões."""
+    if config["dados"] and not config["url"]:
+        os.chdir(config["dados"])
+        os.environ["THE_RUA_API_TOKEN"] = config["token"]
+    if RAIZ not in sys.path:
+        sys.path.insert(0, RAIZ)
+    estado = {
+        "url": config["url"], "token": config["token"], "mix": config["mix"], "reenvio": config["reenvio"],
+        "produtos": config["produtos"],
+        "trava": threading.Lock(), "tempos": {op: [] for op in OPERACOES}, "contagens": Counter(),
+        "exemplos_erro": {}, "confirmados": {}, "codigos": [], "livres": [], "status": {},
+    }
+    if not config["url"]:
+        import api  # importa antes das threads: todas começam juntas
+        api.API_TOKEN = config["token"]
+    fim = time.monotonic() + config["duracao"]
+    threads = [
+        threading.Thread(target=_trabalhador, args=(
+            estado, f"10.0.{indice}.{i + 1}", config["semente"] * 1000 + indice * 100 + i, fim, config["pausa"]))
+        for i in range(config["threads"][indice])
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    fila.put({
+        "tempos": estado["tempos"], "contagens": dict(estado["contagens"]), "exemplos_erro": estado["exemplos_erro"],
+        "confirmados": estado["confirmados"], "status": estado["status"],
+    })
+
+
+# ----------------------------
+# Integridade
+# ----------------------------
+def conferir(pedidos, confirmados, status_confirmados):
+    """Compara o que os clientes ouviram da API com o que ficou gravado."""
+    por_marca = Counter()
+    por_id = {}
+    ids = Counter()
+    for p in pedidos:
+        obs = str(p.get("observacoes", ""))
+        if obs.startswith(MARCA):
+            por_marca[obs[len(MARCA):]] += 1
+        ids[str(p["id"])] += 1
+        por_id[str(p["id"])] = p
+    perdidos = [c for c in confirmados if por_marca[c] == 0]
+    duplicados = [c for c, n in por_marca.items() if n > 1]
+    status_perdidos = [
+        pid for pid, st in status_confirmados.items()
+        if pid in por_id and ORDEM_STATUS.index(por_id[pid]["status"]) < ORDEM_STATUS.index(st)
+    ]
+    return {
+        "pedidos_confirmados": len(confirmados),
+        "pedidos_perdidos": len(perdidos),
+        "pedidos_duplicados": len(duplicados),
+        "ids_repetidos": sum(1 for n in ids.values() if n > 1),
+        "status_perdidos": len(status_perdidos),
+        "exemplos": {"perdidos": perdidos[:5], "duplicados": duplicados[:5], "status_perdidos": status_perdidos[:5]},
+    }
+
+
+def _produtos(config):
+    if config["url"]:
+        with urllib.request.urlopen(config["url"] + "/cardapio", timeout=30) as r:
+            cardapio = json.loads(r.read())
+    else:
+        with open(os.path.join(config["dados"], "produtos.json"), encoding="utf-8") as f:
+            cardapio = json.load(f)
+    return [str(p["id"]) for p in cardapio if not p.get("esgotado")]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga do THE RUA (checkout, rastreio e status).")
+    parser.add_argument("--trabalhadores", type=int, default=30, help="clientes/tablets simultâneos")
+    parser.add_argument("--processos", type=int, default=2, help="processos que dividem os trabalhadores")
+    parser.add_argument("--duracao", type=float, default=30.0, help="segundos de carga")
+    parser.add_argument("--mix", type=ler_mix, default=ler_mix(MIX_PADRAO), help=f"pesos (padrão {MIX_PADRAO})")
+    parser.add_argument("--pausa", type=float, default=0.0, help="pausa média entre ações de cada trabalhador (s)")
+    parser.add_argument("--reenvio", type=float, default=0.1, help="chance de reenviar um checkout confirmado")
+    parser.add_argument("--pedidos", type=int, default=5000, help="histórico sintético inicial (sem --url)")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--url", default="", help="servidor da API já no ar (ex.: http://127.0.0.1:8502)")
+    parser.add_argument("--token", default=os.environ.get("THE_RUA_API_TOKEN", ""), help="token da API (com --url)")
+    parser.add_argument("--dados", default="", help="pasta de dados do servidor, para conferir a integridade (com --url)")
+    parser.add_argument("--saida", metavar="ARQUIVO", help="onde gravar (padrão: bench/resultados/)")
+    args = parser.parse_args(argv)
+
+    trabalho_dir = None
+    if args.url:
+        dados_dir = os.path.abspath(args.dados) if args.dados else ""
+        token = args.token
+    else:
+        trabalho_dir = tempfile.mkdtemp(prefix="the_rua_carga_")
+        dados_dir = os.path.join(trabalho_dir, "dados")
+        print(f"Dados sintéticos: {gerar_dados(dados_dir, args.pedidos, semente=args.semente)}")
+        token = secrets.token_hex(16)
+
+    processos = max(1, min(args.processos, args.trabalhadores))
+    config = {
+        "url": args.url.rstrip("/"), "token": token, "dados": dados_dir, "mix": args.mix, "reenvio": args.reenvio,
+        "duracao": args.duracao, "pausa": args.pausa, "semente": args.semente,
+        "threads": [args.trabalhadores // processos + (i < args.trabalhadores % processos) for i in range(processos)],
+    }
+    try:
+        config["produtos"] = _produtos(config)
+        contexto = multiprocessing.get_context("spawn")
+        fila = contexto.Queue()
+        filhos = [contexto.Process(target=_processo, args=(i, config, fila)) for i in range(processos)]
+        print(f"{args.trabalhadores} trabalhadores em {processos} processo(s) por {args.duracao:g}s, mix {args.mix}")
+        inicio = time.perf_counter()
+        for p in filhos:
+            p.start()
+        parciais = [fila.get() for _ in filhos]
+        for p in filhos:
+            p.join()
+        duracao = time.perf_counter() - inicio
+
+        tempos = {op: [] for op in OPERACOES}
+        contagens, exemplos_erro, confirmados, status_confirmados = Counter(), {}, {}, {}
+        for parcial in parciais:
+            for op, lista in parcial["tempos"].items():
+                tempos[op].extend(lista)
+            contagens.update(parcial["contagens"])
+            exemplos_erro.update(parcial["exemplos_erro"])
+            confirmados.update(parcial["confirmados"])
+            status_confirmados.update(parcial["status"])
+
+        integridade = None
+        if dados_dir:
+            with open(os.path.join(dados_dir, "pedidos.json"), encoding="utf-8") as f:
+                integridade = conferir(json.load(f), confirmados, status_confirmados)
+    finally:
+        if trabalho_dir:
+            shutil.rmtree(trabalho_dir, ignore_errors=True)
+
+    total_ops = sum(len(t) for t in tempos.values())
+    resultado = {
+        "versao": _versao(),
+        "data": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "parametros": {
+            "trabalhadores": args.trabalhadores, "processos": processos, "duracao_s": args.duracao,
+            "mix": args.mix, "pausa_s": args.pausa, "reenvio": args.reenvio,
+            "alvo": args.url or "api em memória", "pedidos_iniciais": 0 if args.url else args.pedidos,
+        },
+        "vazao_ops_por_s": round(total_ops / duracao, 2),
+        "operacoes": {op: resumir(t) for op, t in tempos.items() if t},
+        "respostas": dict(sorted(contagens.items())),
+        "exemplos_erro": exemplos_erro,
+        "integridade": integridade,
+    }
+
+    print(f"\nVazão: {resultado['vazao_ops_por_s']} op/s ({total_ops} operações em {duracao:.1f}s)")
+    for op, r in resultado["operacoes"].items():
+        print(f"  {op:<10} n={r['n']:<6} p50 {r['p50_ms']:>9.2f} ms  p95 {r['p95_ms']:>9.2f} ms  "
+              f"p99 {r['p99_ms']:>9.2f} ms  máx {r['max_ms']:>9.2f} ms")
+    print("Respostas: " + ", ".join(f"{k}={v}" for k, v in resultado["respostas"].items()))
+    if integridade:
+        print(f"Integridade: {integridade['pedidos_confirmados']} confirmados, "
+              f"{integridade['pedidos_perdidos']} perdidos, {integridade['pedidos_duplicados']} duplicados, "
+              f"{integridade['ids_repetidos']} ids repetidos, {integridade['status_perdidos']} status perdidos")
+    else:
+        print("Integridade não conferida (use --dados com a pasta do servidor).")
+
+    saida = args.saida or os.path.join(
+        RESULTADOS_DIR, f"carga_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{resultado['versao']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, indent=4, ensure_ascii=False)
+    print(f"Resultado gravado em {saida}")
+
+    falhou = integridade and (integridade["pedidos_perdidos"] or integridade["pedidos_duplicados"]
+                              or integridade["ids_repetidos"] or integridade["status_perdidos"])
+    return 1 if falhou else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+# bench/cenarios.py — Cenários medidos pelo bench/executar.py
+#
+# Cada cenário roda dentro de uma cópia limpa dos dados gerados (o diretório
+# atual) e devolve os tempos, em segundos, de cada operação medida — ou um
+# dict {"tempos": [...], "extra": {...}} quando há números além da latência
+# ({"pulado": motivo} quando os dados gerados não permitem medir).
+# Os cenários de tela usam o AppTest do Streamlit (sem navegador).
+import asyncio
+import os
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CENARIOS = {}
+
+
+def cenario(nome, n, streamlit=False):
+    """Registra o cenário com `n` repetições padrão."""
+    def registrar(funcao):
+        CENARIOS[nome] = {"funcao": funcao, "n": n, "streamlit": streamlit}
+        return funcao
+    return registrar
+
+
+def _cronometrar(funcao, *args, **kwargs):
+    inicio = time.perf_counter()
+    funcao(*args, **kwargs)
+    return time.perf_counter() - inicio
+
+
+def _app(pagina):
+    import autenticacao
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(os.path.join(RAIZ, "pages", pagina), default_timeout=300)
+    sessao = {}
+    autenticacao.iniciar_sessao(sessao, autenticacao.buscar_usuario("admin"))
+    for chave, valor in sessao.items():
+        at.session_state[chave] = valor
+    return at
+
+
+def _itens(rnd, produtos):
+    return [{"id": p["id"], "quantidade": rnd.randint(1, 3)} for p in rnd.sample(produtos, k=min(3, len(produtos)))]
+
+
+DADOS_CLIENTE = {"nome": "Cliente Bench", "telefone": "(11) 90000-0000", "tipo_pedido": "Retirada", "pagamento": "Cartão"}
+
+
+# ----------------------------
+# Cenários
+# ----------------------------
+@cenario("checkout", n=50)
+def checkout_cenario(n, rnd):
+    from catalogo import carregar_produtos
+    from checkout import criar_pedido
+    produtos = carregar_produtos()
+    return [_cronometrar(criar_pedido, DADOS_CLIENTE, _itens(rnd, produtos), f"bench-{i}") for i in range(n)]
+
+
+@cenario("mudanca_status", n=50)
+def mudanca_status(n, rnd):
+    import caixas
+    from catalogo import carregar_produtos
+    from checkout import criar_pedido
+    from pedidos_db import atualizar_status
+    produtos = carregar_produtos()
+    ids = [criar_pedido(DADOS_CLIENTE, _itens(rnd, produtos))[0]["id"] for _ in range(n)]
+    return [_cronometrar(atualizar_status, pid, "Em preparo", caixas.CAIXA_PADRAO) for pid in ids]
+
+
+@cenario("rastreio", n=2000)
+def rastreio(n, rnd):
+    """GET /rastreio/{codigo} pela aplicação ASGI (inclui ETag e serialização)."""
+    import api
+    from pedidos_db import codigos_em_uso
+    codigos = sorted(codigos_em_uso())
+    if not codigos:
+        return {"pulado": "sem pedidos ativos"}
+
+    async def chamar(codigo, i):
+        async def receive():
+            return {"type": "http.request", "body": b""}
+
+        async def send(msg):
+            pass
+
+        scope = {
+            "type": "http", "method": "GET", "path": f"/rastreio/{codigo}", "query_string": b"",
+            "headers": [], "client": (f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}", 0),
+        }
+        inicio = time.perf_counter()
+        await api.app(scope, receive, send)
+        return time.perf_counter() - inicio
+
+    async def todos():
+        # Um IP por requisição: o limite de taxa por cliente não entra na medida
+        return [await chamar(rnd.choice(codigos), i) for i in range(n)]
+
+    return asyncio.run(todos())
+
+
+@cenario("login", n=30)
+def login(n, rnd):
+    """Login (o hash scrypt é o passo lento) e a checagem de sessão que cada página faz."""
+    import autenticacao
+    autenticacao.salvar_usuario("bench", "Bench", "caixa", "senha-bench")
+    tempos = [_cronometrar(autenticacao.autenticar, "bench", "senha-bench") for _ in range(n)]
+    sessao = {}
+    autenticacao.iniciar_sessao(sessao, autenticacao.buscar_usuario("bench"))
+    inicio = time.perf_counter()
+    for _ in range(1000):
+        autenticacao.sessao_valida(sessao, "caixa")
+    checagem_us = (time.perf_counter() - inicio) / 1000 * 1e6
+    p95_ms = sorted(tempos)[int(0.95 * (len(tempos) - 1))] * 1000
+    return {"tempos": tempos, "extra": {"alvo_ms": autenticacao.ALVO_LOGIN_MS,
+                                        "dentro_do_alvo": p95_ms <= autenticacao.ALVO_LOGIN_MS,
+                                        "checagem_sessao_us": round(checagem_us, 2)}}
+
+
+@cenario("lista_caixa", n=5, streamlit=True)
+def lista_caixa(n, rnd):
+    at = _app("caixa.py")
+    at.run()  # aquecimento: imports e caches
+    return [_cronometrar(at.run) for _ in range(n)]
+
+
+@cenario("relatorio", n=5, streamlit=True)
+def relatorio(n, rnd):
+    at = _app("relatorios.py")
+    at.run()
+    return [_cronometrar(at.run) for _ in range(n)]
+
+
+@cenario("fechamento_caixa", n=5, streamlit=True)
+def fechamento_caixa(n, rnd):
+    import caixas
+    at = _app("caixa.py")
+    tempos = []
+    for _ in range(n):
+        if not caixas.carregar_caixa(caixas.CAIXA_PADRAO).get("aberto"):
+            caixas.abrir_turno(caixas.CAIXA_PADRAO, 100.0)
+        at.run()
+        botao = next(b for b in at.sidebar.button if b.label == "🔒 Fechar Caixa")
+        inicio = time.perf_counter()
+        botao.click().run()
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+@cenario("spooler", n=300)
+def spooler(n, rnd):
+    """Vazão da fila de tarefas: enfileira `n` relatórios e espera todos gravarem."""
+    import tarefas
+    texto = "====== FECHAMENTO THE RUA ======\n" + "- item R$ 10.00\n" * 100
+    inicio = time.perf_counter()
+    tempos = []
+    ids = []
+    for i in range(n):
+        t0 = time.perf_counter()
+        ids.append(tarefas.enfileirar("gravar_relatorio", {"caminho": f"relatorios/bench_{i}.txt", "texto": texto})["id"])
+        tempos.append(time.perf_counter() - t0)
+    pendentes = set(ids)
+    while pendentes:
+        time.sleep(0.05)
+        pendentes = {t["id"] for t in tarefas.listar(limite=n) if t["id"] in pendentes
+                     and t["status"] not in ("concluida", "erro")}
+    total = time.perf_counter() - inicio
+    erros = sum(t["status"] == "erro" for t in tarefas.listar(limite=n) if t["id"] in set(ids))
+    return {"tempos": tempos, "extra": {"tarefas_por_s": round(n / total, 2), "erros": erros}}
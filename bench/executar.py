@@ -0,0 +1,184 @@
+# bench/executar.py — Roda os cenários de desempenho e grava o resultado em JSON
+#
+# Uso (na raiz do projeto):
+#   python -m bench.executar                         # 50.000 pedidos, semente 42
+#   python -m bench.executar --pedidos 5000 --cenarios checkout rastreio
+#   python -m bench.executar --comparar bench/resultados/<anterior>.json
+#
+# Os dados são gerados uma vez numa pasta temporária e cada cenário trabalha
+# numa cópia limpa deles, então a ordem dos cenários não muda os números.
+# Os cenários de tela (AppTest) precisam do streamlit e do pandas instalados.
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# O próprio harness não deve entrar nas medições do painel de desempenho
+os.environ.setdefault("THE_RUA_INSTRUMENTACAO", "0")
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+from bench.cenarios import CENARIOS  # noqa: E402
+from bench.gerador import gerar_dados  # noqa: E402
+
+RESULTADOS_DIR = os.path.join(RAIZ, "bench", "resultados")
+TOLERANCIA = 0.10  # piora de p95 acima disso é marcada como regressão
+
+
+def _versao():
+    try:
+        saida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                               capture_output=True, text=True, timeout=10)
+        return saida.stdout.strip() or "desconhecida"
+    except (OSError, subprocess.SubprocessError):
+        return "desconhecida"
+
+
+def _percentil(ordenados, q):
+    if not ordenados:
+        return 0.0
+    return ordenados[min(len(ordenados) - 1, int(q * len(ordenados)))]
+
+
+def resumir(tempos):
+    """Estatísticas (em ms) de uma lista de tempos em segundos."""
+    ordenados = sorted(tempos)
+    total = sum(ordenados)
+    return {
+        "n": len(ordenados),
+        "media_ms": round(total / len(ordenados) * 1000, 3) if ordenados else 0.0,
+        "p50_ms": round(_percentil(ordenados, 0.50) * 1000, 3),
+        "p95_ms": round(_percentil(ordenados, 0.95) * 1000, 3),
+        "p99_ms": round(_percentil(ordenados, 0.99) * 1000, 3),
+        "max_ms": round(ordenados[-1] * 1000, 3) if ordenados else 0.0,
+        "total_s": round(total, 3),
+        "ops_por_s": round(len(ordenados) / total, 2) if total else 0.0,
+    }
+
+
+def _zerar_caches():
+    """Os módulos guardam caches por assinatura de arquivo; a cópia nova precisa relê-los."""
+    import caixas
+    import catalogo
+    import estoque
+    import pedidos_db
+    caixas._cache.clear()
+    pedidos_db._cache["assinatura"] = None
+    catalogo._cache["assinatura"] = None
+    estoque._estado["assinatura"] = None
+
+
+def rodar_cenario(nome, dados_dir, trabalho_dir, n, semente):
+    """Roda um cenário numa cópia limpa dos dados; devolve o resumo."""
+    info = CENARIOS[nome]
+    if info["streamlit"]:
+        try:
+            import streamlit.testing.v1  # noqa: F401
+        except ImportError:
+            return {"pulado": "streamlit não instalado"}
+
+    pasta = os.path.join(trabalho_dir, nome)
+    shutil.copytree(dados_dir, pasta, copy_function=shutil.copyfile)
+    anterior = os.getcwd()
+    os.chdir(pasta)
+    try:
+        _zerar_caches()
+        import caixas
+        caixas.listar_caixas()  # cria o caixa principal na pasta nova
+        caixas.abrir_turno(caixas.CAIXA_PADRAO, 100.0)
+        inicio = time.perf_counter()
+        saida = info["funcao"](n, random.Random(semente))
+        duracao = time.perf_counter() - inicio
+    finally:
+        os.chdir(anterior)
+        shutil.rmtree(pasta, ignore_errors=True)
+
+    extra = {}
+    if isinstance(saida, dict) and "pulado" in saida:
+        return saida
+    if isinstance(saida, dict):
+        saida, extra = saida["tempos"], saida.get("extra", {})
+    resumo = resumir(saida)
+    resumo["duracao_s"] = round(duracao, 3)
+    resumo.update(extra)
+    return resumo
+
+
+def comparar(atual, anterior):
+    """Imprime a variação de p95 por cenário; devolve os cenários que pioraram."""
+    regressoes = []
+    print(f"\nComparação com {anterior.get('versao')} ({anterior.get('data')}):")
+    for nome, r in atual["cenarios"].items():
+        antes = anterior.get("cenarios", {}).get(nome)
+        if "p95_ms" not in r or not antes or not antes.get("p95_ms"):
+            continue
+        variacao = (r["p95_ms"] - antes["p95_ms"]) / antes["p95_ms"]
+        marca = "  ⚠️ REGRESSÃO" if variacao > TOLERANCIA else ""
+        print(f"  {nome:<18} p95 {antes['p95_ms']:>10.2f} -> {r['p95_ms']:>10.2f} ms ({variacao:+.1%}){marca}")
+        if marca:
+            regressoes.append(nome)
+    return regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do THE RUA com dados sintéticos.")
+    parser.add_argument("--pedidos", type=int, default=50000)
+    parser.add_argument("--produtos", type=int, default=150)
+    parser.add_argument("--comprovantes", type=int, default=500)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--cenarios", nargs="+", choices=sorted(CENARIOS), default=list(CENARIOS))
+    parser.add_argument("--escala", type=float, default=1.0, help="multiplica as repetições de cada cenário")
+    parser.add_argument("--comparar", metavar="ARQUIVO", help="resultado anterior para comparar o p95")
+    parser.add_argument("--saida", metavar="ARQUIVO", help="onde gravar (padrão: bench/resultados/)")
+    args = parser.parse_args(argv)
+
+    trabalho_dir = tempfile.mkdtemp(prefix="the_rua_bench_")
+    dados_dir = os.path.join(trabalho_dir, "_dados")
+    try:
+        inicio = time.perf_counter()
+        resumo_dados = gerar_dados(dados_dir, args.pedidos, args.produtos, args.comprovantes, semente=args.semente)
+        print(f"Dados gerados em {time.perf_counter() - inicio:.1f}s: {resumo_dados}")
+
+        resultado = {
+            "versao": _versao(),
+            "data": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "python": sys.version.split()[0],
+            "parametros": {**resumo_dados, "escala": args.escala},
+            "cenarios": {},
+        }
+        for nome in args.cenarios:
+            n = max(1, int(CENARIOS[nome]["n"] * args.escala))
+            r = rodar_cenario(nome, dados_dir, trabalho_dir, n, args.semente)
+            resultado["cenarios"][nome] = r
+            if "pulado" in r:
+                print(f"  {nome:<18} pulado: {r['pulado']}")
+            else:
+                print(f"  {nome:<18} n={r['n']:<5} p50 {r['p50_ms']:>9.2f} ms  p95 {r['p95_ms']:>9.2f} ms  "
+                      f"p99 {r['p99_ms']:>9.2f} ms  {r['ops_por_s']:>8.2f} op/s")
+    finally:
+        shutil.rmtree(trabalho_dir, ignore_errors=True)
+
+    saida = args.saida or os.path.join(
+        RESULTADOS_DIR, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{resultado['versao']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, indent=4, ensure_ascii=False)
+    print(f"Resultado gravado em {saida}")
+
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as f:
+            regressoes = comparar(resultado, json.load(f))
+        return 1 if regressoes else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
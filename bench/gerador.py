@@ -0,0 +1,132 @@
+# bench/gerador.py — Dados sintéticos (e reproduzíveis) para os benchmarks
+#
+# Mesma semente -> mesmos produtos, pedidos e comprovantes. Os pedidos
+# se espalham pelos últimos `dias`, quase todos entregues; os das últimas
+# horas ficam nos status ativos, como num dia de movimento.
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+CATEGORIAS = {
+    "Hambúrgueres": (["X-Burguer", "X-Bacon", "X-Salada", "X-Tudo", "Smash", "Cheddar Melt", "Duplo", "Frango Crispy"], (22, 48)),
+    "Porções": (["Batata frita", "Batata rústica", "Onion rings", "Nuggets", "Mandioca"], (14, 35)),
+    "Bebidas": (["Coca-Cola lata", "Guaraná lata", "Suco natural", "Água", "Cerveja long neck", "Milkshake"], (5, 22)),
+    "Sobremesas": (["Brownie", "Petit gâteau", "Sorvete", "Pudim"], (9, 20)),
+}
+SABORES = ["tradicional", "especial", "da casa", "picante", "defumado", "com cheddar", "vegano", "kids"]
+NOMES = ["Ana", "Bruno", "Carla", "Diego", "Eduarda", "Felipe", "Gabriela", "Heitor", "Isabela", "João",
+         "Larissa", "Marcos", "Natália", "Otávio", "Paula", "Rafael", "Sofia", "Thiago", "Vitória", "William"]
+SOBRENOMES = ["Silva", "Souza", "Oliveira", "Santos", "Lima", "Pereira", "Costa", "Rodrigues", "Almeida", "Nunes"]
+RUAS = ["Rua das Flores", "Av. Brasil", "Rua XV de Novembro", "Rua Sete de Setembro", "Av. Paulista", "Rua do Comércio"]
+PAGAMENTOS = (["Dinheiro", "Cartão", "Pix", "Transferência"], [25, 45, 28, 2])
+TIPOS = (["Consumir no local", "Retirada", "Entrega"], [30, 25, 45])
+ATIVOS = ["Aguardando aceite", "Em preparo", "Pronto", "Em rota de entrega"]
+
+# PNG 1x1 válido: comprovantes leves, mas abríveis pelo st.image
+PNG_MINIMO = bytes.fromhex(
+    "89504e470d0a1a0a0000000d49484452000000010000000108060000001f15c489"
+    "0000000d4944415478da6364f8cf00000301010018dd8db40000000049454e44ae426082"
+)
+
+
+def gerar_produtos(rnd, quantidade):
+    produtos = []
+    while len(produtos) < quantidade:
+        for categoria, (nomes, (pmin, pmax)) in CATEGORIAS.items():
+            if len(produtos) >= quantidade:
+                break
+            base = rnd.choice(nomes)
+            nome = base if len(produtos) < len(nomes) else f"{base} {rnd.choice(SABORES)}"
+            produtos.append({
+                "id": str(len(produtos) + 1),
+                "nome": nome,
+                "descricao": f"{nome} {rnd.choice(SABORES)} — porção individual",
+                "preco": round(rnd.uniform(pmin, pmax), 2),
+                "categoria": categoria,
+                "esgotado": False,
+                "imagem": "",
+                "criado_em": "2025-01-01 10:00:00",
+            })
+    return produtos
+
+
+def _historico(rnd, criado, status_final):
+    """Eventos de status com durações plausíveis até o status final."""
+    historico = [{"status": "Aguardando aceite", "ts": criado.timestamp(), "data": criado.strftime("%Y-%m-%d %H:%M:%S")}]
+    caminho = ["Em preparo", "Pronto", "Em rota de entrega", "Entregue"]
+    momento = criado
+    for status in caminho[:caminho.index(status_final) + 1] if status_final != "Aguardando aceite" else []:
+        momento += timedelta(minutes=rnd.uniform(1, 6) if status == "Em preparo" else rnd.uniform(5, 25))
+        historico.append({"status": status, "ts": momento.timestamp(), "data": momento.strftime("%Y-%m-%d %H:%M:%S")})
+    return historico
+
+
+def gerar_pedidos(rnd, produtos, quantidade, dias, agora):
+    inicio = agora - timedelta(days=dias)
+    passo = (agora - inicio) / max(quantidade, 1)
+    pedidos = []
+    codigos_ativos = set()
+    for i in range(quantidade):
+        criado = inicio + passo * i + timedelta(seconds=rnd.uniform(0, passo.total_seconds()))
+        recente = agora - criado < timedelta(hours=3)
+        status = rnd.choice(ATIVOS) if recente else "Entregue"
+        itens = []
+        for produto in rnd.sample(produtos, k=min(len(produtos), rnd.randint(1, 4))):
+            itens.append({"id": produto["id"], "nome": produto["nome"], "quantidade": rnd.randint(1, 3), "preco": produto["preco"]})
+        tipo = rnd.choices(*TIPOS)[0]
+        pagamento = rnd.choices(*PAGAMENTOS)[0]
+        codigo = f"{rnd.randint(1000, 9999)}"
+        while status != "Entregue" and codigo in codigos_ativos:
+            codigo = f"{rnd.randint(1000, 9999)}"
+        if status != "Entregue":
+            codigos_ativos.add(codigo)
+        pedidos.append({
+            "id": str(int(criado.timestamp()) * 100 + i % 100),
+            "codigo_rastreio": codigo,
+            "nome": f"{rnd.choice(NOMES)} {rnd.choice(SOBRENOMES)}",
+            "telefone": f"(11) 9{rnd.randint(1000, 9999)}-{rnd.randint(1000, 9999)}",
+            "tipo_pedido": tipo,
+            "endereco": f"{rnd.choice(RUAS)}, {rnd.randint(1, 2000)}" if tipo == "Entrega" else "",
+            "pagamento": pagamento,
+            "troco_para": "100" if pagamento == "Dinheiro" and rnd.random() < 0.3 else "",
+            "comprovante": "",
+            "observacoes": rnd.choice(["", "", "", "sem cebola", "ponto da carne mal passado", "sem gelo"]),
+            "produtos": itens,
+            "status": status,
+            "data": criado.strftime("%Y-%m-%d %H:%M:%S"),
+            "total": round(sum(it["quantidade"] * it["preco"] for it in itens), 2),
+            "origem": "cardapio",
+            "historico": _historico(rnd, criado, status),
+            "versao": 1,
+        })
+    return pedidos
+
+
+def gerar_dados(destino, pedidos=50000, produtos=150, comprovantes=500, dias=180, semente=42):
+    """Escreve produtos.json, pedidos.json e uploads/ em `destino`; devolve um resumo."""
+    rnd = random.Random(semente)
+    agora = datetime.now().replace(microsecond=0)
+    lista_produtos = gerar_produtos(rnd, produtos)
+    lista_pedidos = gerar_pedidos(rnd, lista_produtos, pedidos, dias, agora)
+
+    uploads = os.path.join(destino, "uploads")
+    os.makedirs(uploads, exist_ok=True)
+    pix = [p for p in lista_pedidos if p["pagamento"] == "Pix"]
+    for p in rnd.sample(pix, k=min(comprovantes, len(pix))):
+        caminho = os.path.join("uploads", f"{p['id']}_comprovante.png")
+        with open(os.path.join(destino, caminho), "wb") as f:
+            f.write(PNG_MINIMO)
+        p["comprovante"] = caminho.replace("\\", "/")
+
+    with open(os.path.join(destino, "produtos.json"), "w", encoding="utf-8") as f:
+        json.dump(lista_produtos, f, indent=4, ensure_ascii=False)
+    with open(os.path.join(destino, "pedidos.json"), "w", encoding="utf-8") as f:
+        json.dump(lista_pedidos, f, indent=4, ensure_ascii=False)
+    return {
+        "pedidos": len(lista_pedidos),
+        "ativos": sum(p["status"] != "Entregue" for p in lista_pedidos),
+        "produtos": len(lista_produtos),
+        "comprovantes": min(comprovantes, len(pix)),
+        "semente": semente,
+    }
@@ -0,0 +1,209 @@
+# caixas.py — Caixas (registradoras) independentes, cada um com seu fundo e livro-caixa
+import os
+import re
+import shutil
+import unicodedata
+from datetime import datetime
+
+from armazenamento import ler_json, gravar_json, mtime, trava
+
+CAIXAS_DIR = "caixas"
+CAIXA_PADRAO = "principal"
+LEGADO_CAIXA_FILE = "caixa.json"
+LEGADO_TURNOS_FILE = "turnos.json"
+
+# Cache por caixa: cada tablet só lê o arquivo do próprio caixa
+_cache = {}
+
+
+def _agora():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _arquivo(caixa_id):
+    return os.path.join(CAIXAS_DIR, f"{caixa_id}.json")
+
+
+def _vazio(caixa_id, nome=None):
+    return {
+        "id": caixa_id,
+        "nome": nome or caixa_id.capitalize(),
+        "aberto": False,
+        "valor_inicial": 0.0,
+        "aberto_em": None,
+        "fechado_em": None,
+        "turno_atual": None,
+        "proximo_turno": 1,
+        "turnos": {},
+    }
+
+
+def _migrar_legado():
+    """Converte caixa.json/turnos.json (um caixa global) no caixa 'principal'."""
+    if os.path.isdir(CAIXAS_DIR) and os.listdir(CAIXAS_DIR):
+        return
+    os.makedirs(CAIXAS_DIR, exist_ok=True)
+    caixa = _vazio(CAIXA_PADRAO)
+    antigos = ler_json(LEGADO_TURNOS_FILE, None)
+    if antigos:
+        for tid, turno in antigos.get("turnos", {}).items():
+            turno["id"] = f"{CAIXA_PADRAO}-{tid}"
+            caixa["turnos"][turno["id"]] = turno
+        caixa["proximo_turno"] = antigos.get("proximo_id", 1)
+        if antigos.get("atual"):
+            caixa["turno_atual"] = f"{CAIXA_PADRAO}-{antigos['atual']}"
+    legado = ler_json(LEGADO_CAIXA_FILE, None)
+    if isinstance(legado, dict):
+        for chave in ("aberto", "valor_inicial", "aberto_em", "fechado_em"):
+            if legado.get(chave) is not None:
+                caixa[chave] = legado[chave]
+    if caixa["aberto"] and not caixa["turno_atual"]:
+        turno_id = f"{CAIXA_PADRAO}-{caixa['proximo_turno']}"
+        caixa["proximo_turno"] += 1
+        caixa["turnos"][turno_id] = _novo_turno(turno_id, caixa["valor_inicial"], caixa["aberto_em"] or _agora())
+        caixa["turno_atual"] = turno_id
+    gravar_json(_arquivo(CAIXA_PADRAO), caixa)
+
+
+def _novo_turno(turno_id, valor_inicial, aberto_em):
+    return {
+        "id": turno_id,
+        "aberto_em": aberto_em,
+        "fechado_em": None,
+        "valor_inicial": float(valor_inicial),
+        "qtd_pedidos": 0,
+        "total": 0.0,
+        "por_pagamento": {},
+    }
+
+
+# ----------------------------
+# Leitura
+# ----------------------------
+def listar_caixas():
+    _migrar_legado()
+    ids = sorted(n[:-5] for n in os.listdir(CAIXAS_DIR) if n.endswith(".json"))
+    return [carregar_caixa(i) for i in ids]
+
+
+def carregar_caixa(caixa_id):
+    path = _arquivo(caixa_id)
+    assinatura = mtime(path)
+    entrada = _cache.get(caixa_id)
+    if entrada is None or entrada[0] != assinatura:
+        entrada = (assinatura, ler_json(path, None) or _vazio(caixa_id))
+        _cache[caixa_id] = entrada
+    return entrada[1]
+
+
+def turno_atual(caixa_id):
+    caixa = carregar_caixa(caixa_id)
+    return caixa["turnos"].get(caixa["turno_atual"]) if caixa["turno_atual"] else None
+
+
+def caixa_padrao():
+    """Primeiro caixa aberto (usado quando o pedido é aceito fora do painel do caixa)."""
+    for caixa in listar_caixas():
+        if caixa["aberto"]:
+            return caixa["id"]
+    return None
+
+
+def listar_turnos(caixa_id, limite=20):
+    """Turnos do caixa, mais recentes primeiro."""
+    turnos = carregar_caixa(caixa_id)["turnos"]
+    ids = sorted(turnos, key=lambda t: int(t.rsplit("-", 1)[-1]), reverse=True)[:limite]
+    return [turnos[i] for i in ids]
+
+
+# ----------------------------
+# Escrita (cada caixa tem arquivo e trava próprios)
+# ----------------------------
+def criar_caixa(nome):
+    _migrar_legado()
+    ascii_nome = unicodedata.normalize("NFKD", nome).encode("ascii", "ignore").decode()
+    caixa_id = re.sub(r"[^a-z0-9]+", "-", ascii_nome.strip().lower()).strip("-") or "caixa"
+    path = _arquivo(caixa_id)
+    with trava(path):
+        if not os.path.exists(path):
+            gravar_json(path, _vazio(caixa_id, nome.strip()))
+    return caixa_id
+
+
+def abrir_turno(caixa_id, valor_inicial):
+    path = _arquivo(caixa_id)
+    with trava(path):
+        caixa = ler_json(path, None) or _vazio(caixa_id)
+        if caixa["turno_atual"]:
+            return caixa["turnos"][caixa["turno_atual"]]
+        turno_id = f"{caixa_id}-{caixa['proximo_turno']}"
+        caixa["proximo_turno"] += 1
+        turno = _novo_turno(turno_id, valor_inicial, _agora())
+        caixa["turnos"][turno_id] = turno
+        caixa.update(aberto=True, valor_inicial=float(valor_inicial), aberto_em=turno["aberto_em"],
+                     fechado_em=None, turno_atual=turno_id)
+        gravar_json(path, caixa)
+    return turno
+
+
+def fechar_turno(caixa_id):
+    """Encerra o turno do caixa e devolve seus acumuladores (None se estava fechado)."""
+    path = _arquivo(caixa_id)
+    with trava(path):
+        caixa = ler_json(path, None) or _vazio(caixa_id)
+        turno = caixa["turnos"].get(caixa["turno_atual"]) if caixa["turno_atual"] else None
+        if turno is None:
+            return None
+        turno["fechado_em"] = _agora()
+        caixa.update(aberto=False, fechado_em=turno["fechado_em"], turno_atual=None)
+        gravar_json(path, caixa)
+    return turno
+
+
+def _lancar(pedido, sinal):
+    turno_id = pedido.get("turno_id")
+    if not turno_id:
+        return
+    caixa_id = pedido.get("caixa_id") or CAIXA_PADRAO
+    path = _arquivo(caixa_id)
+    with trava(path):
+        caixa = ler_json(path, None)
+        if not caixa:
+            return
+        # Pedidos de antes dos múltiplos caixas guardam só o número do turno
+        turno = caixa["turnos"].get(str(turno_id)) or caixa["turnos"].get(f"{caixa_id}-{turno_id}")
+        if turno is None:
+            return
+        valor = float(pedido.get("total", 0) or 0)
+        pg = pedido.get("pagamento", "Outros")
+        if turno.get("fechado_em"):
+            # Turno já fechado não muda (o relatório foi emitido): o estorno sai
+            # do turno aberto agora, ou é ignorado se o caixa estiver fechado
+            if sinal > 0 or not caixa["turno_atual"]:
+                return
+            turno = caixa["turnos"][caixa["turno_atual"]]
+            turno["estornos"] = round(turno.get("estornos", 0) + valor, 2)
+        else:
+            turno["qtd_pedidos"] += sinal
+        turno["total"] = round(turno["total"] + sinal * valor, 2)
+        turno["por_pagamento"][pg] = round(turno["por_pagamento"].get(pg, 0) + sinal * valor, 2)
+        gravar_json(path, caixa)
+
+
+def registrar_pedido(pedido):
+    _lancar(pedido, +1)
+
+
+def estornar_pedido(pedido):
+    """Tira o pedido do turno; se o turno já fechou, lança no turno aberto."""
+    _lancar(pedido, -1)
+
+
+def limpar():
+    """Remove todos os caixas e turnos (usado pela limpeza geral do sistema)."""
+    shutil.rmtree(CAIXAS_DIR, ignore_errors=True)
+    if os.path.exists(LEGADO_TURNOS_FILE):
+        os.remove(LEGADO_TURNOS_FILE)
+    _cache.clear()
+    os.makedirs(CAIXAS_DIR, exist_ok=True)
+    gravar_json(_arquivo(CAIXA_PADRAO), _vazio(CAIXA_PADRAO))
@@ -0,0 +1,171 @@
+# cardapio_estatico.py — Gera o cardápio público como HTML estático (sem sessão Streamlit)
+#
+# O HTML fica em static/cardapio/ e pode ser servido por qualquer servidor
+# (ou pela API: GET /menu). O carrinho roda no navegador; só o checkout abre
+# o Streamlit, com os itens na URL: <THE_RUA_APP_URL>?itens=1:2,3:1
+import hashlib
+import html
+import json
+import os
+import shutil
+import threading
+
+from catalogo import carregar_produtos, categoria, categorias, disponivel, normalizar, produtos_da_categoria
+
+SAIDA_DIR = os.path.join("static", "cardapio")
+IMG_DIR = os.path.join(SAIDA_DIR, "img")
+APP_URL = os.environ.get("THE_RUA_APP_URL", "/")
+
+
+def _temporario(destino):
+    # Um arquivo por gravador: duas gerações simultâneas (pool de tarefas, /menu) não se atropelam
+    return f"{destino}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _copiar_imagem(caminho):
+    """Copia a imagem com o hash do conteúdo no nome (cache permanente no navegador)."""
+    if not caminho or not os.path.exists(caminho):
+        return ""
+    with open(caminho, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:16]
+    nome = f"{digest}{os.path.splitext(caminho)[1].lower()}"
+    destino = os.path.join(IMG_DIR, nome)
+    if not os.path.exists(destino):
+        tmp = _temporario(destino)
+        shutil.copyfile(caminho, tmp)
+        os.replace(tmp, destino)
+    return f"img/{nome}"
+
+
+def _cartao(produto):
+    img = produto.get("imagem", "")
+    src = img if img.startswith("http") else _copiar_imagem(img)
+    imagem = f'<img src="{html.escape(src)}" alt="" loading="lazy">' if src else '<div class="sem-imagem">Sem imagem</div>'
+    busca = normalizar(f"{produto['nome']} {produto.get('descricao', '')} {categoria(produto)}")
+    if disponivel(produto):
+        botao = f'<button data-id="{html.escape(str(produto["id"]))}">Adicionar</button>'
+    else:
+        botao = '<button disabled>Esgotado</button>'
+    return f"""
+    <article class="produto" data-busca="{html.escape(busca)}">
+      {imagem}
+      <h2>{html.escape(produto["nome"])}</h2>
+      <p>{html.escape(produto.get("descricao", ""))}</p>
+      <strong>R$ {float(produto["preco"]):.2f}</strong>
+      {botao}
+    </article>"""
+
+
+def _secao(nome, indice):
+    cartoes = "".join(_cartao(p) for p in produtos_da_categoria(nome))
+    return f"""
+<section class="categoria" id="cat-{indice}">
+  <h2>{html.escape(nome)}</h2>
+  <div class="grade">{cartoes}
+  </div>
+</section>"""
+
+
+_MODELO = """<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>Cardápio - THE RUA BURGUER</title>
+<style>
+  body {{ font-family: sans-serif; margin: 0; padding: 16px; background: #fafafa; }}
+  h1 {{ margin-top: 0; }}
+  .grade {{ display: grid; grid-template-columns: repeat(auto-fill, minmax(240px, 1fr)); gap: 16px; }}
+  .produto {{ background: #fff; border-radius: 10px; padding: 12px; box-shadow: 0 1px 3px #0002; }}
+  .produto img, .sem-imagem {{ width: 100%; aspect-ratio: 1; object-fit: cover; border-radius: 8px; background: #eee; }}
+  .sem-imagem {{ display: flex; align-items: center; justify-content: center; color: #999; }}
+  nav {{ position: sticky; top: 0; background: #fafafa; padding: 8px 0; overflow-x: auto; white-space: nowrap; }}
+  nav a {{ margin-right: 12px; color: #e63946; }}
+  #busca {{ width: 100%; padding: 10px; font-size: 16px; margin: 8px 0; box-sizing: border-box; }}
+  button:disabled {{ background: #999; }}
+  button {{ background: #e63946; color: #fff; border: 0; border-radius: 8px; padding: 10px 16px; font-size: 16px; }}
+  #carrinho {{ position: sticky; bottom: 0; background: #fff; padding: 12px; margin-top: 16px; box-shadow: 0 -1px 4px #0002; }}
+</style>
+</head>
+<body>
+<h1>🍔 Cardápio - THE RUA</h1>
+<nav>{navegacao}</nav>
+<input id="busca" type="search" placeholder="🔎 Buscar no cardápio">
+{secoes}
+<section id="carrinho">
+  <div id="itens">Seu carrinho está vazio.</div>
+  <strong id="total"></strong>
+  <button id="finalizar" hidden>✅ Finalizar pedido</button>
+</section>
+<script>
+const PRODUTOS = {produtos_json};
+const APP_URL = {app_url_json};
+const carrinho = {{}};
+function desenhar() {{
+  const ids = Object.keys(carrinho);
+  const lista = document.getElementById("itens");
+  let total = 0;
+  // Nós de texto, não innerHTML: o nome do produto não vira HTML
+  lista.replaceChildren();
+  ids.forEach((id, i) => {{
+    total += carrinho[id] * PRODUTOS[id].preco;
+    const rm = document.createElement("a");
+    rm.href = "#";
+    rm.dataset.rm = id;
+    rm.textContent = "remover";
+    if (i) lista.append(document.createElement("br"));
+    lista.append(`${{carrinho[id]}}x ${{PRODUTOS[id].nome}} `, rm);
+  }});
+  if (!ids.length) lista.textContent = "Seu carrinho está vazio.";
+  document.getElementById("total").textContent = ids.length ? `Total: R$ ${{total.toFixed(2)}}` : "";
+  document.getElementById("finalizar").hidden = !ids.length;
+}}
+document.addEventListener("click", ev => {{
+  const id = ev.target.dataset.id, rm = ev.target.dataset.rm;
+  if (id) {{ carrinho[id] = (carrinho[id] || 0) + 1; desenhar(); }}
+  if (rm) {{ ev.preventDefault(); delete carrinho[rm]; desenhar(); }}
+}});
+const semAcento = t => t.normalize("NFD").replace(/[\u0300-\u036f]/g, "").toLowerCase();
+document.getElementById("busca").oninput = ev => {{
+  const termos = semAcento(ev.target.value).split(/[^a-z0-9]+/).filter(Boolean);
+  document.querySelectorAll(".produto").forEach(el => {{
+    el.hidden = !termos.every(t => el.dataset.busca.split(/[^a-z0-9]+/).some(p => p.startsWith(t)));
+  }});
+  document.querySelectorAll(".categoria").forEach(sec => {{
+    sec.hidden = !sec.querySelector(".produto:not([hidden])");
+  }});
+}};
+document.getElementById("finalizar").onclick = () => {{
+  const itens = Object.keys(carrinho).map(id => `${{id}}:${{carrinho[id]}}`).join(",");
+  location.href = `${{APP_URL}}?itens=${{encodeURIComponent(itens)}}`;
+}};
+</script>
+</body>
+</html>
+"""
+
+
+def gerar_cardapio_estatico():
+    """Renderiza produtos.json em static/cardapio/index.html; devolve o caminho gerado."""
+    os.makedirs(IMG_DIR, exist_ok=True)
+    produtos = carregar_produtos()
+    nomes = categorias()
+    pagina = _MODELO.format(
+        navegacao="".join(f'<a href="#cat-{i}">{html.escape(c)}</a>' for i, c in enumerate(nomes)),
+        secoes="".join(_secao(c, i) for i, c in enumerate(nomes)),
+        produtos_json=json.dumps(
+            {str(p["id"]): {"nome": p["nome"], "preco": float(p["preco"])} for p in produtos if disponivel(p)},
+            ensure_ascii=False,
+        ).replace("</", "<\\/"),
+        app_url_json=json.dumps(APP_URL),
+    )
+    destino = os.path.join(SAIDA_DIR, "index.html")
+    tmp = _temporario(destino)
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(pagina)
+    os.replace(tmp, destino)
+    return destino
+
+
+if __name__ == "__main__":
+    print(f"Cardápio gerado em {gerar_cardapio_estatico()}")
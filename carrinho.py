@@ -0,0 +1,97 @@
+# carrinho.py — Carrinho do cliente: um item por produto e total sempre atualizado
+import uuid
+
+import catalogo
+
+
+def novo_carrinho():
+    return {
+        "itens": {},                                # produto_id -> {id, nome, quantidade, preco}
+        "total": 0.0,
+        "versao_catalogo": catalogo.versao_catalogo(),
+        "token": uuid.uuid4().hex,                  # chave de idempotência do checkout
+    }
+
+
+def adicionar(carrinho, produto, quantidade):
+    """Soma a quantidade ao item do produto (sem linhas duplicadas)."""
+    quantidade = int(quantidade)
+    if quantidade <= 0:
+        return
+    pid = str(produto["id"])
+    preco = float(produto["preco"])
+    item = carrinho["itens"].get(pid)
+    if item is None:
+        item = carrinho["itens"][pid] = {"id": pid, "nome": produto["nome"], "quantidade": 0, "preco": preco}
+    item["quantidade"] += quantidade
+    carrinho["total"] = round(carrinho["total"] + quantidade * item["preco"], 2)
+
+
+def remover(carrinho, produto_id):
+    item = carrinho["itens"].pop(str(produto_id), None)
+    if item:
+        carrinho["total"] = round(carrinho["total"] - item["quantidade"] * item["preco"], 2)
+
+
+def alterar_quantidade(carrinho, produto_id, quantidade):
+    item = carrinho["itens"].get(str(produto_id))
+    if item is None:
+        return
+    if quantidade <= 0:
+        remover(carrinho, produto_id)
+        return
+    carrinho["total"] = round(carrinho["total"] + (int(quantidade) - item["quantidade"]) * item["preco"], 2)
+    item["quantidade"] = int(quantidade)
+
+
+def itens(carrinho):
+    return list(carrinho["itens"].values())
+
+
+def vazio(carrinho):
+    return not carrinho["itens"]
+
+
+def reprecificar(carrinho):
+    """Confere o carrinho com o cardápio atual; só trabalha se o cardápio mudou.
+
+    Devolve avisos (produto removido ou esgotado, preço alterado) para mostrar ao cliente.
+    """
+    versao = catalogo.versao_catalogo()
+    if carrinho.get("versao_catalogo") == versao:
+        return []
+    avisos = []
+    for pid, item in list(carrinho["itens"].items()):
+        produto = catalogo.buscar_produto(pid)
+        if produto is None:
+            del carrinho["itens"][pid]
+            avisos.append(f"{item['nome']} saiu do cardápio e foi removido do carrinho.")
+            continue
+        if not catalogo.disponivel(produto):
+            del carrinho["itens"][pid]
+            avisos.append(f"{produto['nome']} esgotou e foi removido do carrinho.")
+            continue
+        preco = float(produto["preco"])
+        if preco != item["preco"]:
+            avisos.append(f"O preço de {produto['nome']} mudou para R$ {preco:.2f}.")
+        item.update(nome=produto["nome"], preco=preco)
+    carrinho["total"] = round(sum(i["quantidade"] * i["preco"] for i in carrinho["itens"].values()), 2)
+    carrinho["versao_catalogo"] = versao
+    return avisos
+
+
+def repetir(carrinho, itens_anteriores):
+    """Põe no carrinho os itens de um pedido anterior, com o preço de hoje.
+
+    Devolve avisos dos produtos que saíram do cardápio ou estão esgotados.
+    """
+    avisos = []
+    for item in itens_anteriores:
+        produto = catalogo.buscar_produto(item["id"])
+        if produto is None:
+            avisos.append(f"{item['nome']} saiu do cardápio.")
+        elif not catalogo.disponivel(produto):
+            avisos.append(f"{produto['nome']} está esgotado.")
+        else:
+            adicionar(carrinho, produto, item["quantidade"])
+    return avisos
@@ -0,0 +1,197 @@
+# catalogo.py — Cardápio em cache (produtos.json): categorias, busca e disponibilidade
+import re
+import unicodedata
+from bisect import bisect_left
+
+from armazenamento import ler_json, gravar_json, mtime, trava
+
+PRODUTOS_FILE = "produtos.json"
+CONTADOR_FILE = "produtos_contador.json"
+CATEGORIA_PADRAO = "Outros"
+
+# Índices refeitos só quando produtos.json muda:
+#   por_categoria: categoria -> produtos (na ordem do arquivo)
+#   indice: termo normalizado -> ids dos produtos (nome, descrição e categoria)
+_cache = {"assinatura": None, "produtos": [], "por_id": {}, "por_categoria": {}, "indice": {}, "termos": []}
+
+
+def normalizar(texto):
+    """Minúsculas e sem acentos ("Pão" -> "pao")."""
+    return unicodedata.normalize("NFKD", str(texto)).encode("ascii", "ignore").decode().lower()
+
+
+def _termos(texto):
+    return re.findall(r"[a-z0-9]+", normalizar(texto))
+
+
+def categoria(produto):
+    return (produto.get("categoria") or "").strip() or CATEGORIA_PADRAO
+
+
+def disponivel(produto):
+    return not produto.get("esgotado")
+
+
+def _indexar(produtos):
+    por_categoria = {}
+    indice = {}
+    for p in produtos:
+        por_categoria.setdefault(categoria(p), []).append(p)
+        texto = f"{p.get('nome', '')} {p.get('descricao', '')} {categoria(p)}"
+        for termo in set(_termos(texto)):
+            indice.setdefault(termo, set()).add(str(p["id"]))
+    _cache["produtos"] = produtos
+    _cache["por_id"] = {str(p["id"]): p for p in produtos}
+    _cache["por_categoria"] = por_categoria
+    _cache["indice"] = indice
+    _cache["termos"] = sorted(indice)
+
+
+def carregar_produtos():
+    """Produtos cadastrados; só relê o arquivo quando ele muda."""
+    assinatura = mtime(PRODUTOS_FILE)
+    if assinatura != _cache["assinatura"]:
+        _indexar(ler_json(PRODUTOS_FILE, []))
+        _cache["assinatura"] = assinatura
+    return _cache["produtos"]
+
+
+def versao_catalogo():
+    """Identifica a versão atual do cardápio (muda a cada gravação de produtos.json)."""
+    carregar_produtos()
+    return list(_cache["assinatura"]) if _cache["assinatura"] else 0
+
+
+def buscar_produto(produto_id):
+    carregar_produtos()
+    return _cache["por_id"].get(str(produto_id))
+
+
+# ----------------------------
+# Categorias e busca
+# ----------------------------
+def categorias():
+    """Categorias em ordem alfabética, com 'Outros' por último."""
+    carregar_produtos()
+    return sorted(_cache["por_categoria"], key=lambda c: (c == CATEGORIA_PADRAO, normalizar(c)))
+
+
+def produtos_da_categoria(nome):
+    carregar_produtos()
+    return _cache["por_categoria"].get(nome, [])
+
+
+def _ids_com_prefixo(prefixo):
+    termos = _cache["termos"]
+    ids = set()
+    i = bisect_left(termos, prefixo)
+    while i < len(termos) and termos[i].startswith(prefixo):
+        ids |= _cache["indice"][termos[i]]
+        i += 1
+    return ids
+
+
+def buscar(texto):
+    """Produtos que têm todas as palavras da busca (ou começos delas), na ordem do cardápio."""
+    produtos = carregar_produtos()
+    termos = _termos(texto)
+    if not termos:
+        return produtos
+    ids = _ids_com_prefixo(termos[0])
+    for termo in termos[1:]:
+        ids &= _ids_com_prefixo(termo)
+    return [p for p in produtos if str(p["id"]) in ids]
+
+
+# ----------------------------
+# Escrita
+# ----------------------------
+def proximo_id():
+    """Novo ID de produto a partir do contador gravado (IDs nunca são reaproveitados)."""
+    with trava(CONTADOR_FILE):
+        contador = ler_json(CONTADOR_FILE, None)
+        if contador is None:
+            # Primeira vez: parte do maior ID já cadastrado
+            ids = [int(p["id"]) for p in ler_json(PRODUTOS_FILE, []) if str(p["id"]).isdigit()]
+            contador = {"ultimo_id": max(ids, default=0)}
+        contador["ultimo_id"] += 1
+        gravar_json(CONTADOR_FILE, contador)
+    return str(contador["ultimo_id"])
+
+
+def adicionar_produto(produto):
+    """Acrescenta o produto ao cardápio (sob a trava, como as marcações de esgotado)."""
+    with trava(PRODUTOS_FILE):
+        produtos = ler_json(PRODUTOS_FILE, [])
+        produtos.append(produto)
+        gravar_json(PRODUTOS_FILE, produtos)
+    return produto
+
+
+def atualizar_produto(produto_id, campos):
+    """Grava `campos` no produto relendo o arquivo; devolve False se ele não existe.
+
+    Só os campos editados mudam: um esgotado automático marcado pelo estoque
+    enquanto a página estava aberta não é desfeito.
+    """
+    with trava(PRODUTOS_FILE):
+        produtos = ler_json(PRODUTOS_FILE, [])
+        produto = next((p for p in produtos if str(p["id"]) == str(produto_id)), None)
+        if produto is None:
+            return False
+        produto.update(campos)
+        gravar_json(PRODUTOS_FILE, produtos)
+    return True
+
+
+def remover_produto(produto_id):
+    with trava(PRODUTOS_FILE):
+        produtos = ler_json(PRODUTOS_FILE, [])
+        restantes = [p for p in produtos if str(p["id"]) != str(produto_id)]
+        if len(restantes) == len(produtos):
+            return False
+        gravar_json(PRODUTOS_FILE, restantes)
+    return True
+
+
+def limpar():
+    """Apaga todos os produtos (usado pela limpeza geral do sistema)."""
+    with trava(PRODUTOS_FILE):
+        gravar_json(PRODUTOS_FILE, [])
+
+
+def definir_esgotado(produto_id, esgotado=True):
+    """Marca/desmarca o produto como esgotado; devolve False se ele não existe."""
+    with trava(PRODUTOS_FILE):
+        produtos = ler_json(PRODUTOS_FILE, [])
+        produto = next((p for p in produtos if str(p["id"]) == str(produto_id)), None)
+        if produto is None:
+            return False
+        # Marcação manual: o controle de estoque não libera um produto esgotado à mão
+        produto.pop("esgotado_auto", None)
+        produto["esgotado"] = bool(esgotado)
+        gravar_json(PRODUTOS_FILE, produtos)
+    return True
+
+
+def sincronizar_esgotados(sem_estoque):
+    """Esgota automaticamente os ids em `sem_estoque` e libera os que o estoque tinha esgotado.
+
+    Produtos marcados à mão não são alterados. Devolve True se gravou algo.
+    """
+    sem_estoque = {str(i) for i in sem_estoque}
+    with trava(PRODUTOS_FILE):
+        produtos = ler_json(PRODUTOS_FILE, [])
+        mudou = False
+        for p in produtos:
+            if str(p["id"]) in sem_estoque:
+                if not p.get("esgotado"):
+                    p["esgotado"] = p["esgotado_auto"] = True
+                    mudou = True
+            elif p.get("esgotado_auto"):
+                p["esgotado"] = False
+                del p["esgotado_auto"]
+                mudou = True
+        if mudou:
+            gravar_json(PRODUTOS_FILE, produtos)
+    return mudou
@@ -0,0 +1,144 @@
+# checkout.py — Validação e criação de pedidos (usado pela UI e pela API)
+import random
+import time
+from datetime import datetime
+
+import clientes
+import enderecos
+import estoque
+import zonas
+from catalogo import buscar_produto, disponivel
+from pedidos_db import adicionar_pedido, codigos_em_uso, pedido_por_chave
+
+TIPOS_PEDIDO = ["Consumir no local", "Retirada", "Entrega"]
+FORMAS_PAGAMENTO = ["Dinheiro", "Cartão", "Pix", "Transferência"]
+
+
+class PedidoInvalido(ValueError):
+    """Dados de pedido recusados; `erros` traz as mensagens para o cliente."""
+
+    def __init__(self, erros):
+        super().__init__("; ".join(erros))
+        self.erros = erros
+
+
+def gerar_codigo_rastreio():
+    """Código de 4 dígitos que não está em uso por nenhum pedido ativo."""
+    em_uso = codigos_em_uso()
+    for _ in range(50):
+        codigo = f"{random.randint(1000,9999)}"
+        if codigo not in em_uso:
+            return codigo
+    return f"{random.randint(10000,99999)}"
+
+
+def montar_itens(itens):
+    """Converte [{id, quantidade}] em itens com nome e preço do cardápio (preço do servidor)."""
+    erros = []
+    montados = []
+    for item in itens or []:
+        produto = buscar_produto(item.get("id"))
+        try:
+            quantidade = int(item.get("quantidade", 0))
+        except (TypeError, ValueError):
+            quantidade = 0
+        if produto is None:
+            erros.append(f"Produto {item.get('id')} não existe.")
+        elif not disponivel(produto):
+            erros.append(f"{produto['nome']} está esgotado.")
+        elif quantidade <= 0:
+            erros.append(f"Quantidade inválida para {produto['nome']}.")
+        else:
+            montados.append({
+                "id": str(produto["id"]),
+                "nome": produto["nome"],
+                "quantidade": quantidade,
+                "preco": float(produto["preco"]),
+            })
+    if not montados and not erros:
+        erros.append("Carrinho vazio.")
+    return montados, erros
+
+
+def validar_cliente(dados):
+    erros = []
+    if not str(dados.get("nome", "")).strip() or not str(dados.get("telefone", "")).strip():
+        erros.append("Preencha nome e telefone.")
+    if dados.get("tipo_pedido") not in TIPOS_PEDIDO:
+        erros.append(f"Tipo de pedido deve ser um de: {', '.join(TIPOS_PEDIDO)}.")
+    elif dados["tipo_pedido"] == "Entrega" and not str(dados.get("endereco", "")).strip():
+        erros.append("Informe o endereço para entrega.")
+    if dados.get("pagamento") not in FORMAS_PAGAMENTO:
+        erros.append(f"Forma de pagamento deve ser uma de: {', '.join(FORMAS_PAGAMENTO)}.")
+    return erros
+
+
+def criar_pedido(dados, itens, chave_idempotencia=None):
+    """Valida, precifica e grava o pedido; devolve (pedido, criado).
+
+    A mesma `chave_idempotencia` (token do carrinho ou cabeçalho Idempotency-Key)
+    devolve o pedido já criado em vez de duplicar. Entregas somam a taxa da
+    zona ao total. Os ingredientes saem do estoque junto com a gravação; só
+    depois dela o endereço é registrado e o pedido entra no cadastro do
+    cliente (pelo telefone).
+    Levanta PedidoInvalido com as mensagens de erro.
+    """
+    existente = pedido_por_chave(chave_idempotencia)
+    if existente is not None:
+        return existente, False
+    produtos, erros = montar_itens(itens)
+    erros = validar_cliente(dados) + erros
+    if erros:
+        raise PedidoInvalido(erros)
+    total = round(sum(i["quantidade"] * i["preco"] for i in produtos), 2)
+    pedido = {
+        "id": str(int(time.time())),
+        "codigo_rastreio": gerar_codigo_rastreio(),
+        "nome": str(dados["nome"]).strip(),
+        "telefone": str(dados["telefone"]).strip(),
+        "tipo_pedido": dados["tipo_pedido"],
+        "endereco": str(dados.get("endereco", "")) if dados["tipo_pedido"] == "Entrega" else "",
+        "pagamento": dados["pagamento"],
+        "troco_para": str(dados.get("troco_para", "") or ""),
+        "comprovante": dados.get("comprovante", ""),
+        "observacoes": str(dados.get("observacoes", "") or ""),
+        "produtos": produtos,
+        "status": "Aguardando aceite",
+        "data": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "total": total,
+        "origem": dados.get("origem", "cardapio"),
+    }
+    cliente_id = clientes.id_cliente(pedido["telefone"])
+    if cliente_id:
+        pedido["cliente_id"] = cliente_id
+    endereco_digitado = pedido["endereco"]
+    if endereco_digitado:
+        # Endereço normalizado e deduplicado; rotas e taxas consultam pelo id
+        previo = enderecos.preparar(endereco_digitado)
+        if previo is not None:
+            pedido["endereco"] = previo["texto"]
+            pedido["endereco_id"] = previo["id"]
+        cotacao = zonas.cotar(previo["posicao"] if previo else None)
+        if not cotacao["atende"]:
+            raise PedidoInvalido([cotacao["motivo"]])
+        if cotacao["taxa"]:
+            pedido["taxa_entrega"] = cotacao["taxa"]
+            pedido["zona_entrega"] = cotacao["zona"]
+            pedido["total"] = round(total + cotacao["taxa"], 2)
+    # Baixa tudo-ou-nada nos ingredientes; desfeita se o pedido não for gravado
+    try:
+        baixa = estoque.baixar(produtos, pedido["id"])
+    except estoque.EstoqueInsuficiente as e:
+        raise PedidoInvalido([f"{nome} acabou de esgotar." for nome in e.produtos])
+    try:
+        pedido, criado = adicionar_pedido(pedido, chave_idempotencia)
+    except Exception:
+        estoque.estornar(baixa, pedido["id"])
+        raise
+    if not criado:
+        estoque.estornar(baixa, pedido["id"])
+    else:
+        if pedido.get("endereco_id"):
+            enderecos.registrar(endereco_digitado)
+        clientes.registrar_pedido(pedido)
+    return pedido, criado
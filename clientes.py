@@ -0,0 +1,167 @@
+# clientes.py — Cadastro de clientes pelo telefone, com o histórico de pedidos
+#
+# clientes.json é um dicionário {cliente_id: registro}; o id é o hash do
+# telefone normalizado, então achar o cliente é uma leitura de chave, sem
+# varrer pedidos.json. Cada registro guarda os dados do último pedido (para
+# preencher o checkout) e o resumo dos pedidos mais recentes (histórico e
+# "repetir pedido"), atualizados na criação do pedido.
+import hashlib
+import re
+
+from armazenamento import gravar_json, ler_json, mtime, trava
+
+CLIENTES_FILE = "clientes.json"
+HISTORICO_MAX = 20  # resumos de pedidos guardados por cliente
+
+_cache = {"assinatura": None, "clientes": {}}
+
+
+def _carregar():
+    assinatura = mtime(CLIENTES_FILE)
+    if assinatura != _cache["assinatura"]:
+        _cache["clientes"] = ler_json(CLIENTES_FILE, {})
+        _cache["assinatura"] = assinatura
+    return _cache["clientes"]
+
+
+# ----------------------------
+# Telefone
+# ----------------------------
+def normalizar_telefone(texto):
+    """'+55 (11) 98765-4321', '011 98765 4321' -> '11987654321'; None se não parecer telefone."""
+    digitos = re.sub(r"\D", "", str(texto or ""))
+    if digitos.startswith("00"):
+        digitos = digitos[2:]
+    if digitos.startswith("55") and len(digitos) in (12, 13):
+        digitos = digitos[2:]
+    if digitos.startswith("0") and len(digitos) in (11, 12):
+        digitos = digitos[1:]
+    return digitos if 8 <= len(digitos) <= 11 else None
+
+
+def id_cliente(telefone):
+    """Hash do telefone normalizado (chave em clientes.json), ou None."""
+    t = normalizar_telefone(telefone)
+    return hashlib.sha1(t.encode("utf-8")).hexdigest()[:12] if t else None
+
+
+# ----------------------------
+# Consultas
+# ----------------------------
+def buscar(cliente_id):
+    return _carregar().get(str(cliente_id or ""))
+
+
+def buscar_por_telefone(telefone):
+    return buscar(id_cliente(telefone))
+
+
+def historico(cliente_id):
+    """Resumos dos pedidos mais recentes do cliente (o mais novo primeiro)."""
+    registro = buscar(cliente_id)
+    return registro["historico"] if registro else []
+
+
+def ultimo_pedido(telefone):
+    """Resumo do último pedido do telefone (itens para "repetir pedido"), ou None."""
+    registro = buscar_por_telefone(telefone)
+    return registro["historico"][0] if registro and registro["historico"] else None
+
+
+# ----------------------------
+# Escrita (na criação e exclusão do pedido)
+# ----------------------------
+def _resumo(pedido):
+    return {
+        "id": str(pedido["id"]),
+        "codigo_rastreio": pedido.get("codigo_rastreio", ""),
+        "data": pedido.get("data", ""),
+        "tipo_pedido": pedido.get("tipo_pedido", ""),
+        "total": pedido.get("total", 0),
+        "itens": [{"id": str(i.get("id", "")), "nome": i.get("nome", ""), "quantidade": i.get("quantidade", 0)}
+                  for i in pedido.get("produtos", [])],
+    }
+
+
+def _aplicar(clientes, pedido):
+    cliente_id = pedido.get("cliente_id") or id_cliente(pedido.get("telefone"))
+    if not cliente_id:
+        return None
+    registro = clientes.get(cliente_id)
+    if registro is None:
+        registro = {"id": cliente_id, "telefone": normalizar_telefone(pedido["telefone"]), "pedidos": 0,
+                    "total_gasto": 0.0, "primeiro_pedido": pedido.get("data", ""), "historico": []}
+    elif any(h["id"] == str(pedido["id"]) for h in registro["historico"]):
+        return registro  # já registrado
+    registro["nome"] = pedido.get("nome", registro.get("nome", ""))
+    registro["pagamento"] = pedido.get("pagamento", registro.get("pagamento", ""))
+    registro["tipo_pedido"] = pedido.get("tipo_pedido", registro.get("tipo_pedido", ""))
+    if pedido.get("endereco"):
+        registro["endereco"] = pedido["endereco"]
+        registro["endereco_id"] = pedido.get("endereco_id", "")
+    registro["pedidos"] += 1
+    registro["total_gasto"] = round(registro["total_gasto"] + float(pedido.get("total", 0)), 2)
+    registro["primeiro_pedido"] = min(registro["primeiro_pedido"] or pedido.get("data", ""), pedido.get("data", ""))
+    registro["ultimo_pedido"] = max(registro.get("ultimo_pedido", ""), pedido.get("data", ""))
+    registro["historico"] = sorted([_resumo(pedido)] + registro["historico"],
+                                   key=lambda h: h["data"], reverse=True)[:HISTORICO_MAX]
+    clientes[cliente_id] = registro
+    return registro
+
+
+def registrar_pedido(pedido):
+    """Cria ou atualiza o cliente do pedido; devolve o registro (None sem telefone válido)."""
+    with trava(CLIENTES_FILE):
+        clientes = ler_json(CLIENTES_FILE, {})
+        registro = _aplicar(clientes, pedido)
+        if registro is not None:
+            gravar_json(CLIENTES_FILE, clientes)
+    return registro
+
+
+def remover_pedido(pedido):
+    """Pedido excluído (cancelado) sai do histórico e dos totais do cliente."""
+    cliente_id = pedido.get("cliente_id")
+    if not cliente_id:
+        return
+    with trava(CLIENTES_FILE):
+        clientes = ler_json(CLIENTES_FILE, {})
+        registro = clientes.get(cliente_id)
+        if registro is None or not any(h["id"] == str(pedido["id"]) for h in registro["historico"]):
+            return
+        registro["historico"] = [h for h in registro["historico"] if h["id"] != str(pedido["id"])]
+        registro["pedidos"] = max(registro["pedidos"] - 1, 0)
+        registro["total_gasto"] = round(max(registro["total_gasto"] - float(pedido.get("total", 0)), 0.0), 2)
+        gravar_json(CLIENTES_FILE, clientes)
+
+
+def limpar():
+    """Apaga o cadastro (usado pela limpeza geral do sistema)."""
+    with trava(CLIENTES_FILE):
+        gravar_json(CLIENTES_FILE, {})
+
+
+def reconstruir():
+    """Refaz clientes.json a partir de todos os pedidos (ativos e arquivados).
+
+    Manutenção única para os pedidos anteriores ao cadastro (python clientes.py);
+    no dia a dia o cadastro é atualizado na criação de cada pedido.
+    """
+    import pedidos_db  # import tardio: pedidos_db importa este módulo
+    import retencao
+
+    pedidos = []
+    for mes in retencao.meses_arquivados():
+        pedidos.extend(ler_json(retencao.arquivo_mes(mes), []))
+    arquivados = {str(p.get("id")) for p in pedidos}
+    pedidos.extend(p for p in pedidos_db.carregar_pedidos() if str(p.get("id")) not in arquivados)
+    clientes = {}
+    for p in sorted(pedidos, key=lambda p: p.get("data", "")):
+        _aplicar(clientes, p)
+    with trava(CLIENTES_FILE):
+        gravar_json(CLIENTES_FILE, clientes)
+    return len(clientes)
+
+
+if __name__ == "__main__":
+    print(f"{reconstruir()} cliente(s)")
@@ -0,0 +1,153 @@
+# despacho.py — Agrupa entregas prontas em lotes por proximidade e ordena a rota
+#
+# As coordenadas vêm de enderecos.py (tabela offline de ruas, sem internet).
+# Cada lote parte do pedido pronto há mais tempo e puxa os vizinhos dentro do
+# raio até a capacidade do entregador; a rota sai do vizinho mais próximo a
+# partir da loja, refinada por 2-opt.
+import math
+import uuid
+
+import enderecos
+from armazenamento import gravar_json, ler_json
+from pedidos_db import assumir_entregas, atualizar_status_lote
+
+DESPACHO_CONFIG_FILE = "despacho_config.json"
+DESPACHO_PADRAO = {
+    "loja": None,          # [lat, lon] de onde as rotas partem
+    "max_pedidos": 4,      # entregas por viagem
+    "raio_km": 2.5,        # distância máxima até o pedido mais próximo do lote
+}
+
+
+def carregar_config():
+    return {**DESPACHO_PADRAO, **ler_json(DESPACHO_CONFIG_FILE, {})}
+
+
+def salvar_config(config):
+    gravar_json(DESPACHO_CONFIG_FILE, {**DESPACHO_PADRAO, **config})
+
+
+# ----------------------------
+# Rotas
+# ----------------------------
+def distancia_km(a, b):
+    """Haversine entre dois [lat, lon]."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371.0 * math.asin(math.sqrt(h))
+
+
+def comprimento(inicio, pontos):
+    caminho = ([inicio] if inicio else []) + list(pontos)
+    return sum(distancia_km(a, b) for a, b in zip(caminho, caminho[1:]))
+
+
+def ordenar_rota(inicio, pontos):
+    """Ordem de visita (índices de `pontos`) saindo de `inicio`, sem volta.
+
+    Vizinho mais próximo seguido de 2-opt. Sem `inicio`, parte do primeiro ponto.
+    """
+    if len(pontos) < 2:
+        return list(range(len(pontos)))
+    restantes = list(range(len(pontos)))
+    atual = inicio
+    if atual is None:
+        atual = pontos[restantes.pop(0)]
+        ordem = [0]
+    else:
+        ordem = []
+    while restantes:
+        proximo = min(restantes, key=lambda i: distancia_km(atual, pontos[i]))
+        restantes.remove(proximo)
+        ordem.append(proximo)
+        atual = pontos[proximo]
+
+    # 2-opt num caminho aberto: o primeiro nó (loja ou primeira parada) fica fixo
+    fixo = [inicio] if inicio is not None else []
+    rota = fixo + [pontos[i] for i in ordem]
+    indices = [None] * len(fixo) + ordem
+    d = distancia_km
+    melhorou = True
+    while melhorou:
+        melhorou = False
+        for i in range(1, len(rota) - 1):
+            for k in range(i + 1, len(rota)):
+                antes = d(rota[i - 1], rota[i]) + (d(rota[k], rota[k + 1]) if k + 1 < len(rota) else 0)
+                depois = d(rota[i - 1], rota[k]) + (d(rota[i], rota[k + 1]) if k + 1 < len(rota) else 0)
+                if depois < antes - 1e-9:
+                    rota[i:k + 1] = reversed(rota[i:k + 1])
+                    indices[i:k + 1] = reversed(indices[i:k + 1])
+                    melhorou = True
+    return indices[len(fixo):]
+
+
+# ----------------------------
+# Lotes
+# ----------------------------
+def montar_lotes(pedidos, config=None):
+    """Sugere lotes para os pedidos de entrega prontos.
+
+    Devolve [{"pedidos": [...na ordem da rota], "km": float|None}]; pedidos sem
+    localização saem cada um num lote próprio, com km None.
+    """
+    config = config or carregar_config()
+    loja = config["loja"]
+    localizados, sem_local = [], []
+    for p in sorted(pedidos, key=lambda p: p.get("data", "")):
+        posicao = enderecos.posicao_do_pedido(p)
+        (localizados if posicao else sem_local).append((p, posicao))
+
+    lotes = []
+    while localizados:
+        lote = [localizados.pop(0)]  # o pedido pronto há mais tempo puxa o lote
+        while localizados and len(lote) < config["max_pedidos"]:
+            distancias = [min(distancia_km(pos, q) for _, q in lote) for _, pos in localizados]
+            mais_perto = min(range(len(localizados)), key=distancias.__getitem__)
+            if distancias[mais_perto] > config["raio_km"]:
+                break
+            lote.append(localizados.pop(mais_perto))
+        pontos = [pos for _, pos in lote]
+        ordem = ordenar_rota(loja, pontos)
+        lotes.append({
+            "pedidos": [lote[i][0] for i in ordem],
+            "km": round(comprimento(loja, [pontos[i] for i in ordem]), 2),
+        })
+    lotes.extend({"pedidos": [p], "km": None} for p, _ in sem_local)
+    return lotes
+
+
+def despachar(pedidos, entregador, nome=None):
+    """O entregador pega o lote: todos vão para 'Em rota de entrega' numa gravação só.
+
+    `pedidos` na ordem da rota, como foram exibidos. É compare-and-set pela
+    versão de cada pedido: o que outro entregador pegou (ou que mudou) desde
+    a exibição fica de fora. Devolve (lote_id, ids que saíram).
+    """
+    lote_id = uuid.uuid4().hex[:8]
+    campos = {
+        str(p["id"]): {"lote_id": lote_id, "entregador": entregador, "entregador_nome": nome or entregador, "parada": i + 1}
+        for i, p in enumerate(pedidos)
+    }
+    versoes = {str(p["id"]): p.get("versao", 0) for p in pedidos}
+    return lote_id, atualizar_status_lote(list(campos), "Em rota de entrega", campos, versoes)
+
+
+def assumir(pedidos, entregador, nome=None):
+    """O entregador assume entregas em rota sem dono (anteriores à atribuição).
+
+    Compare-and-set como em despachar: se dois tentarem, só um fica com cada
+    pedido. Devolve os ids assumidos.
+    """
+    versoes = {str(p["id"]): p.get("versao", 0) for p in pedidos}
+    return assumir_entregas(versoes, {"entregador": entregador, "entregador_nome": nome or entregador})
+
+
+def confirmar_entregas(pedidos, entregador):
+    """Marca como entregues os pedidos do entregador (compare-and-set pela versão).
+
+    Pedidos de outro entregador — ou sem dono, que precisam ser assumidos
+    antes — são ignorados. Devolve os ids confirmados.
+    """
+    meus = [p for p in pedidos if entregador and p.get("entregador") == entregador]
+    versoes = {str(p["id"]): p.get("versao", 0) for p in meus}
+    return atualizar_status_lote(list(versoes), "Entregue", versoes=versoes)
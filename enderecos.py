@@ -0,0 +1,190 @@
+# enderecos.py — Endereços de entrega normalizados, deduplicados e com coordenadas
+#
+# Na criação do pedido o texto livre ("RUA SILAS FONTES CAETANO, 88, CASA 3")
+# vira {rua, numero, complemento}. O mesmo endereço — ignorando maiúsculas,
+# acentos e abreviações — é um único registro em enderecos.json, e o pedido
+# guarda o endereco_id. A posição vem da tabela offline de ruas
+# (gazetteer.json) e fica no registro: taxa de entrega, rotas e previsão
+# consultam pelo id, sem reprocessar o texto.
+import hashlib
+import re
+from datetime import datetime
+
+from armazenamento import gravar_json, ler_json, mtime, trava
+from catalogo import normalizar
+
+ENDERECOS_FILE = "enderecos.json"   # {endereco_id: registro}
+GAZETTEER_FILE = "gazetteer.json"   # {"ruas": {"rua das flores": [lat, lon]}}
+ABREVIACOES = {"r": "rua", "av": "avenida", "al": "alameda", "tv": "travessa", "trav": "travessa",
+               "pc": "praça", "pca": "praça", "rod": "rodovia", "est": "estrada", "lgo": "largo"}
+MINUSCULAS = {"de", "da", "do", "das", "dos", "e"}
+
+_cache = {"assinatura": None, "enderecos": {}, "ruas": {}, "textos": {}}
+
+
+def _carregar():
+    assinatura = (mtime(ENDERECOS_FILE), mtime(GAZETTEER_FILE))
+    if assinatura != _cache["assinatura"]:
+        _cache["enderecos"] = ler_json(ENDERECOS_FILE, {})
+        _cache["ruas"] = ler_json(GAZETTEER_FILE, {}).get("ruas", {})
+        _cache["textos"] = {}
+        _cache["assinatura"] = assinatura
+    return _cache
+
+
+# ----------------------------
+# Normalização
+# ----------------------------
+def _simplificar(texto):
+    return re.sub(r"\s+", " ", normalizar(texto).replace(".", " ")).strip(" ,-")
+
+
+def _titulo(texto):
+    palavras = str(texto).strip().lower().split()
+    return " ".join(
+        p.upper() if re.fullmatch(r"[ivxl]{2,5}", p)  # romanos: Rua XV de Novembro
+        else p if i and p in MINUSCULAS
+        else p[:1].upper() + p[1:]
+        for i, p in enumerate(palavras)
+    )
+
+
+def _expandir(rua):
+    palavras = str(rua).replace(".", " ").split()
+    if palavras and normalizar(palavras[0]) in ABREVIACOES:
+        palavras[0] = ABREVIACOES[normalizar(palavras[0])]
+    return " ".join(palavras)
+
+
+def chave_rua(rua):
+    """'Av. Brasil' -> 'avenida brasil' (chave da tabela de ruas)."""
+    return _simplificar(_expandir(rua))
+
+
+def _numero(parte):
+    """'88', 'nº 88', 'N. 88A', 's/n' -> número normalizado, ou None."""
+    m = re.fullmatch(r"(?:n(?:o|°)?\s*)?(\d+\s*[a-z]?|s\s*/?\s*n)", _simplificar(parte))
+    return re.sub(r"\s+|/", "", m.group(1)).upper().replace("SN", "S/N") if m else None
+
+
+def analisar(texto):
+    """'RUA SILAS FONTES CAETANO, 88, CASA 3' -> {rua, numero, complemento} formatados."""
+    partes = [p.strip() for p in re.split(r"[,;]|\s+-\s+", str(texto or "")) if p.strip()]
+    if not partes:
+        return {"rua": "", "numero": "", "complemento": ""}
+    rua, numero, resto = partes[0], "", partes[1:]
+    m = re.fullmatch(r"(.*?[^\d\s])\s+(?:n[º°o.]?\s*)?(\d+\s*[a-zA-Z]?)", rua)  # 'Rua X 88' sem vírgula
+    if m:
+        rua, numero = m.group(1), _numero(m.group(2))
+    elif resto and _numero(resto[0]):
+        numero = _numero(resto.pop(0))
+    return {
+        "rua": _titulo(_expandir(rua)),
+        "numero": numero or "",
+        "complemento": _titulo(", ".join(resto)),
+    }
+
+
+def formatar(partes):
+    texto = partes["rua"] + (f", {partes['numero']}" if partes["numero"] else "")
+    return texto + (f" - {partes['complemento']}" if partes["complemento"] else "")
+
+
+def _id(partes):
+    chave = "|".join([chave_rua(partes["rua"]), partes["numero"].lower(), _simplificar(partes["complemento"])])
+    return hashlib.sha1(chave.encode("utf-8")).hexdigest()[:12]
+
+
+# ----------------------------
+# Registro (na criação do pedido)
+# ----------------------------
+def preparar(texto):
+    """Normaliza sem gravar: {id, texto, posicao} para cotar a taxa, ou None.
+
+    O checkout só chama registrar() depois que o pedido foi gravado, para que
+    pedidos recusados ou repetidos não criem endereços nem somem usos.
+    """
+    partes = analisar(texto)
+    if not partes["rua"]:
+        return None
+    endereco_id = _id(partes)
+    tabelas = _carregar()
+    registro = tabelas["enderecos"].get(endereco_id) or {}
+    return {"id": endereco_id, "texto": formatar(partes),
+            "posicao": registro.get("posicao") or tabelas["ruas"].get(chave_rua(partes["rua"]))}
+
+
+def registrar(texto):
+    """Normaliza e grava (ou reaproveita) o endereço; devolve o registro ou None."""
+    partes = analisar(texto)
+    if not partes["rua"]:
+        return None
+    endereco_id = _id(partes)
+    rua = chave_rua(partes["rua"])
+    with trava(ENDERECOS_FILE):
+        enderecos = ler_json(ENDERECOS_FILE, {})
+        registro = enderecos.get(endereco_id)
+        if registro is None:
+            registro = {"id": endereco_id, **partes, "texto": formatar(partes), "rua_chave": rua,
+                        "posicao": None, "usos": 0}
+        if registro["posicao"] is None:
+            registro["posicao"] = _carregar()["ruas"].get(rua)
+        registro["usos"] += 1
+        registro["ultimo_uso"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        enderecos[endereco_id] = registro
+        gravar_json(ENDERECOS_FILE, enderecos)
+    return registro
+
+
+# ----------------------------
+# Consultas
+# ----------------------------
+def buscar(endereco_id):
+    return _carregar()["enderecos"].get(str(endereco_id or ""))
+
+
+def posicao(endereco_id):
+    """[lat, lon] do endereço registrado, ou None se a rua não estiver na tabela."""
+    tabelas = _carregar()
+    registro = tabelas["enderecos"].get(str(endereco_id or ""))
+    if registro is None:
+        return None
+    return registro.get("posicao") or tabelas["ruas"].get(registro["rua_chave"])
+
+
+def posicao_do_texto(texto):
+    """Para pedidos antigos, sem endereco_id (memorizado até as tabelas mudarem)."""
+    tabelas = _carregar()
+    texto = str(texto or "")
+    if texto not in tabelas["textos"]:
+        rua = analisar(texto)["rua"]
+        tabelas["textos"][texto] = tabelas["ruas"].get(chave_rua(rua)) if rua else None
+    return tabelas["textos"][texto]
+
+
+def posicao_do_pedido(pedido):
+    if pedido.get("endereco_id"):
+        return posicao(pedido["endereco_id"])
+    return posicao_do_texto(pedido.get("endereco"))
+
+
+def rua_do_pedido(pedido):
+    registro = buscar(pedido.get("endereco_id"))
+    return registro["rua_chave"] if registro else chave_rua(analisar(pedido.get("endereco"))["rua"])
+
+
+def fixar_rua(rua, lat, lon):
+    """Cadastra (ou corrige) a posição de uma rua e dos endereços já registrados nela."""
+    rua = chave_rua(analisar(rua)["rua"] or rua)
+    posicao_nova = [float(lat), float(lon)]
+    with trava(GAZETTEER_FILE):
+        tabela = ler_json(GAZETTEER_FILE, {})
+        tabela.setdefault("ruas", {})[rua] = posicao_nova
+        gravar_json(GAZETTEER_FILE, tabela)
+    with trava(ENDERECOS_FILE):
+        enderecos = ler_json(ENDERECOS_FILE, {})
+        for registro in enderecos.values():
+            if registro["rua_chave"] == rua:
+                registro["posicao"] = posicao_nova
+        gravar_json(ENDERECOS_FILE, enderecos)
+    return rua
@@ -0,0 +1,204 @@
+# estoque.py — Estoque de ingredientes com baixa automática a cada pedido
+#
+# Cada produto tem uma receita (ingrediente -> quantidade por unidade). Os
+# saldos ficam em memória: partem do último checkpoint (estoque.json) e
+# aplicam os movimentos do diário (estoque_diario.jsonl). Toda baixa/entrada
+# acontece sob a trava do estoque, acrescenta uma linha ao diário e, de
+# tempos em tempos, grava um checkpoint novo e zera o diário — nada é
+# recalculado a partir do histórico de pedidos.
+#
+# Quando um ingrediente acaba, os produtos que dependem dele são marcados
+# como esgotados no catálogo (e voltam sozinhos quando o estoque é reposto).
+import json
+import os
+import time
+
+import catalogo
+import tarefas
+from armazenamento import ler_json, gravar_json, mtime, trava
+
+ESTOQUE_FILE = "estoque.json"               # checkpoint: {"seq", "saldos", "ts"}
+ESTOQUE_DIARIO = "estoque_diario.jsonl"     # movimentos desde o checkpoint
+RECEITAS_FILE = "receitas.json"             # {"ingredientes": {...}, "produtos": {id: {ingrediente: qtd}}}
+CHECKPOINT_MOVIMENTOS = 200
+CHECKPOINT_SEGUNDOS = 5 * 60
+
+_estado = {"assinatura": None, "posicao": 0, "seq": 0, "saldos": {}, "movimentos": 0, "checkpoint_ts": 0,
+           "sem_estoque": None}
+
+
+class EstoqueInsuficiente(ValueError):
+    """Baixa recusada; `produtos` traz os nomes dos produtos sem ingrediente suficiente."""
+
+    def __init__(self, produtos):
+        super().__init__(", ".join(produtos))
+        self.produtos = produtos
+
+
+# ----------------------------
+# Receitas
+# ----------------------------
+def carregar_receitas():
+    receitas = ler_json(RECEITAS_FILE, {})
+    receitas.setdefault("ingredientes", {})
+    receitas.setdefault("produtos", {})
+    return receitas
+
+
+def salvar_receitas(receitas):
+    gravar_json(RECEITAS_FILE, receitas)
+    with trava(ESTOQUE_FILE):
+        _estado["sem_estoque"] = None
+        _propagar(_sincronizar(), receitas)
+
+
+def consumo(itens, receitas=None):
+    """Ingredientes gastos pelos itens [{id, quantidade}] segundo as receitas."""
+    receitas = receitas or carregar_receitas()
+    total = {}
+    for item in itens:
+        for ingrediente, qtd in receitas["produtos"].get(str(item["id"]), {}).items():
+            total[ingrediente] = total.get(ingrediente, 0) + qtd * int(item["quantidade"])
+    return total
+
+
+# ----------------------------
+# Saldos em memória (checkpoint + diário)
+# ----------------------------
+def _sincronizar():
+    """Atualiza os saldos em memória com o que outros processos gravaram. Chamar sob a trava."""
+    assinatura = mtime(ESTOQUE_FILE)
+    if assinatura != _estado["assinatura"]:
+        checkpoint = ler_json(ESTOQUE_FILE, {})
+        _estado.update(
+            assinatura=assinatura,
+            posicao=0,
+            seq=checkpoint.get("seq", 0),
+            saldos=dict(checkpoint.get("saldos", {})),
+            movimentos=0,
+            checkpoint_ts=checkpoint.get("ts", time.time()),
+        )
+    if os.path.exists(ESTOQUE_DIARIO):
+        if os.path.getsize(ESTOQUE_DIARIO) < _estado["posicao"]:
+            _estado["assinatura"] = None  # diário zerado por outro processo: recarrega
+            return _sincronizar()
+        with open(ESTOQUE_DIARIO, "rb") as f:
+            f.seek(_estado["posicao"])
+            for linha in f:
+                if not linha.endswith(b"\n"):
+                    break
+                _estado["posicao"] += len(linha)
+                mov = json.loads(linha)
+                if mov["seq"] <= _estado["seq"]:
+                    continue  # já incluído no checkpoint
+                for ingrediente, delta in mov["deltas"].items():
+                    _estado["saldos"][ingrediente] = _estado["saldos"].get(ingrediente, 0) + delta
+                _estado["seq"] = mov["seq"]
+                _estado["movimentos"] += 1
+    return _estado["saldos"]
+
+
+def _registrar(tipo, deltas, referencia=""):
+    """Aplica e grava um movimento no diário. Chamar sob a trava, já sincronizado."""
+    mov = {"seq": _estado["seq"] + 1, "tipo": tipo, "ref": str(referencia), "deltas": deltas, "ts": time.time()}
+    with open(ESTOQUE_DIARIO, "a", encoding="utf-8") as f:
+        f.write(json.dumps(mov, ensure_ascii=False) + "\n")
+    _sincronizar()
+    if (_estado["movimentos"] >= CHECKPOINT_MOVIMENTOS
+            or time.time() - _estado["checkpoint_ts"] > CHECKPOINT_SEGUNDOS):
+        _checkpoint()
+    return mov
+
+
+def _checkpoint():
+    """Grava os saldos atuais e zera o diário. Chamar sob a trava."""
+    agora = time.time()
+    gravar_json(ESTOQUE_FILE, {"seq": _estado["seq"], "saldos": _estado["saldos"], "ts": agora})
+    # Se cair aqui, o diário é reaplicado só a partir de seq > checkpoint
+    with open(ESTOQUE_DIARIO, "w", encoding="utf-8"):
+        pass
+    _estado.update(assinatura=mtime(ESTOQUE_FILE), posicao=0, movimentos=0, checkpoint_ts=agora)
+
+
+def saldos():
+    with trava(ESTOQUE_FILE):
+        return dict(_sincronizar())
+
+
+def abaixo_do_minimo():
+    """Ingredientes com saldo no mínimo configurado ou abaixo: [(nome, saldo, minimo)]."""
+    atuais = saldos()
+    ingredientes = carregar_receitas()["ingredientes"]
+    return [(nome, atuais.get(nome, 0), info.get("minimo", 0))
+            for nome, info in ingredientes.items() if atuais.get(nome, 0) <= info.get("minimo", 0)]
+
+
+# ----------------------------
+# Movimentos
+# ----------------------------
+def _produtos_sem_estoque(atuais, receitas):
+    """Produtos com receita que não dá para fazer nem uma unidade."""
+    return {pid for pid, receita in receitas["produtos"].items()
+            if any(atuais.get(ing, 0) < qtd for ing, qtd in receita.items())}
+
+
+def _propagar(atuais, receitas=None):
+    """Leva a falta (ou reposição) de ingredientes ao catálogo e ao cardápio estático."""
+    sem_estoque = _produtos_sem_estoque(atuais, receitas or carregar_receitas())
+    if sem_estoque == _estado["sem_estoque"]:
+        return  # nada mudou desde a última verificação: não toca em produtos.json
+    _estado["sem_estoque"] = sem_estoque
+    if catalogo.sincronizar_esgotados(sem_estoque):
+        tarefas.enfileirar("gerar_cardapio", descricao="Cardápio estático (estoque)")
+
+
+def baixar(itens, referencia=""):
+    """Dá baixa nos ingredientes dos itens, tudo ou nada; devolve os deltas aplicados.
+
+    Levanta EstoqueInsuficiente (sem baixar nada) se algum ingrediente não cobre o pedido.
+    """
+    receitas = carregar_receitas()
+    gasto = consumo(itens, receitas)
+    if not gasto:
+        return {}
+    with trava(ESTOQUE_FILE):
+        atuais = _sincronizar()
+        faltando = {ing for ing, qtd in gasto.items() if atuais.get(ing, 0) < qtd}
+        if faltando:
+            nomes = [item.get("nome", str(item["id"])) for item in itens
+                     if faltando & set(receitas["produtos"].get(str(item["id"]), {}))]
+            raise EstoqueInsuficiente(nomes)
+        deltas = {ing: -qtd for ing, qtd in gasto.items()}
+        _registrar("baixa", deltas, referencia)
+        _propagar(_estado["saldos"], receitas)
+    return deltas
+
+
+def estornar(deltas, referencia=""):
+    """Desfaz uma baixa (pedido repetido, cancelado ou que falhou ao gravar)."""
+    if not deltas:
+        return
+    with trava(ESTOQUE_FILE):
+        _sincronizar()
+        _registrar("estorno", {ing: -qtd for ing, qtd in deltas.items()}, referencia)
+        _propagar(_estado["saldos"])
+
+
+def repor_pedido(pedido):
+    """Devolve ao estoque os ingredientes de um pedido cancelado antes do preparo."""
+    estornar({ing: -qtd for ing, qtd in consumo(pedido.get("produtos", [])).items()}, pedido.get("id"))
+
+
+def entrada(ingrediente, quantidade, referencia="entrada manual"):
+    with trava(ESTOQUE_FILE):
+        _sincronizar()
+        _registrar("entrada", {ingrediente: float(quantidade)}, referencia)
+        _propagar(_estado["saldos"])
+
+
+def ajustar(ingrediente, saldo, referencia="contagem"):
+    """Corrige o saldo para o valor contado (registra a diferença no diário)."""
+    with trava(ESTOQUE_FILE):
+        atual = _sincronizar().get(ingrediente, 0)
+        _registrar("ajuste", {ingrediente: float(saldo) - atual}, referencia)
+        _propagar(_estado["saldos"])
@@ -0,0 +1,163 @@
+# eta.py — Previsão de entrega/retirada considerando a carga da cozinha
+import time
+
+from armazenamento import ler_json, gravar_json, mtime, trava
+
+ETA_MODELO_FILE = "eta_modelo.json"
+ETA_CONFIG_FILE = "eta_config.json"
+
+ETA_PADRAO = {
+    "capacidade_cozinha": 2,      # pedidos preparados em paralelo
+    "preparo_padrao_min": 15,     # produto sem histórico
+    "aceite_padrao_min": 3,
+    "entrega_padrao_min": 25,
+    "peso_novo": 0.2,             # suavização exponencial (EWMA)
+}
+
+_cache = {"assinatura": None, "modelo": None, "assinatura_config": None, "config": None}
+
+
+def _modelo_vazio():
+    return {
+        "produtos": {},           # id -> {"media": seg, "n": amostras}
+        "aceite": None,
+        "entrega": None,
+        "fila": [],               # [pedido_id, entrou_em, estimativa_seg] em ordem de chegada
+        "carga": 0.0,             # soma das estimativas da fila
+    }
+
+
+def carregar_config():
+    """Configuração (só relê eta_config.json quando ele muda; não altere o dict)."""
+    assinatura = mtime(ETA_CONFIG_FILE)
+    if assinatura != _cache["assinatura_config"]:
+        _cache["config"] = {**ETA_PADRAO, **ler_json(ETA_CONFIG_FILE, {})}
+        _cache["assinatura_config"] = assinatura
+    return _cache["config"]
+
+
+def carregar_modelo():
+    assinatura = mtime(ETA_MODELO_FILE)
+    if assinatura != _cache["assinatura"]:
+        _cache["modelo"] = ler_json(ETA_MODELO_FILE, None) or _modelo_vazio()
+        _cache["assinatura"] = assinatura
+    return _cache["modelo"]
+
+
+def _ewma(atual, valor, peso):
+    if not atual:
+        return {"media": valor, "n": 1}
+    return {"media": atual["media"] + peso * (valor - atual["media"]), "n": atual["n"] + 1}
+
+
+def _media(entrada, padrao_min):
+    return entrada["media"] if entrada else padrao_min * 60
+
+
+def preparo_estimado(pedido, modelo=None, config=None):
+    """Segundos de preparo: o item mais demorado define o pedido."""
+    modelo = modelo or carregar_modelo()
+    config = config or carregar_config()
+    tempos = [
+        _media(modelo["produtos"].get(str(item.get("id"))), config["preparo_padrao_min"])
+        for item in pedido.get("produtos", [])
+    ]
+    return max(tempos) if tempos else config["preparo_padrao_min"] * 60
+
+
+# ----------------------------
+# Atualização incremental (chamada pelo pedidos_db)
+# ----------------------------
+def registrar_transicao(pedido, status_anterior, duracoes):
+    """Atualiza fila e médias com uma transição; custo proporcional à fila, não ao histórico."""
+    novo = pedido.get("status")
+    pid = str(pedido.get("id"))
+    if status_anterior == novo and not duracoes:
+        return
+    config = carregar_config()
+    with trava(ETA_MODELO_FILE):
+        modelo = ler_json(ETA_MODELO_FILE, None) or _modelo_vazio()
+        peso = config["peso_novo"]
+
+        for etapa, segundos in duracoes.items():
+            if etapa == "preparo":
+                for item in pedido.get("produtos", []):
+                    chave = str(item.get("id"))
+                    modelo["produtos"][chave] = _ewma(modelo["produtos"].get(chave), segundos, peso)
+            elif etapa in ("aceite", "entrega"):
+                modelo[etapa] = _ewma(modelo.get(etapa), segundos, peso)
+
+        _remover_da_fila(modelo, pid)
+        if novo == "Em preparo":
+            estimativa = preparo_estimado(pedido, modelo, config)
+            modelo["fila"].append([pid, time.time(), estimativa])
+            modelo["carga"] += estimativa
+        gravar_json(ETA_MODELO_FILE, modelo)
+
+
+def _remover_da_fila(modelo, pid):
+    for i, (fid, _, estimativa) in enumerate(modelo["fila"]):
+        if fid == pid:
+            modelo["carga"] = max(modelo["carga"] - estimativa, 0.0)
+            del modelo["fila"][i]
+            return
+
+
+def remover_pedido(pedido_id):
+    with trava(ETA_MODELO_FILE):
+        modelo = ler_json(ETA_MODELO_FILE, None)
+        if not modelo:
+            return
+        _remover_da_fila(modelo, str(pedido_id))
+        gravar_json(ETA_MODELO_FILE, modelo)
+
+
+def limpar():
+    """Zera fila e médias (limpeza geral): a fila não pode guardar pedidos apagados."""
+    with trava(ETA_MODELO_FILE):
+        gravar_json(ETA_MODELO_FILE, _modelo_vazio())
+
+
+# ----------------------------
+# Consulta (barata, chamada a cada rastreio)
+# ----------------------------
+def fila_preparo():
+    return len(carregar_modelo()["fila"])
+
+
+def estimar(pedido, agora=None):
+    """Minutos restantes e horário previsto para o pedido ficar pronto/ser entregue."""
+    agora = agora or time.time()
+    modelo = carregar_modelo()
+    config = carregar_config()
+    capacidade = max(int(config["capacidade_cozinha"]), 1)
+    status = pedido.get("status", "Aguardando aceite")
+    entrega = _media(modelo.get("entrega"), config["entrega_padrao_min"]) if pedido.get("tipo_pedido") == "Entrega" else 0
+    historico = pedido.get("historico") or []
+    decorrido = agora - historico[-1]["ts"] if historico else 0
+
+    if status == "Aguardando aceite":
+        aceite = max(_media(modelo.get("aceite"), config["aceite_padrao_min"]) - decorrido, 0)
+        restante = aceite + modelo["carga"] / capacidade + preparo_estimado(pedido, modelo, config) + entrega
+    elif status == "Em preparo":
+        pid = str(pedido.get("id"))
+        a_frente = 0.0
+        preparo = preparo_estimado(pedido, modelo, config)
+        for fid, _, estimativa in modelo["fila"]:
+            if fid == pid:
+                preparo = estimativa
+                break
+            a_frente += estimativa
+        restante = max(a_frente / capacidade + preparo - decorrido, 60) + entrega
+    elif status == "Em rota de entrega":
+        restante = max(entrega - decorrido, 60)
+    elif status == "Pronto":
+        restante = entrega
+    else:
+        restante = 0
+
+    return {
+        "minutos": round(restante / 60),
+        "previsao": time.strftime("%H:%M", time.localtime(agora + restante)),
+        "fila": len(modelo["fila"]),
+    }
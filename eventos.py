@@ -0,0 +1,92 @@
+# eventos.py — Log de eventos dos pedidos (eventos.jsonl) para transmissão em tempo real
+#
+# O pedidos_db publica cada criação/mudança de status aqui. Quem transmite
+# (a API, via SSE) lê só o final do arquivo quando ele cresce — uma leitura
+# por mudança, não uma releitura de pedidos.json por tela conectada.
+import json
+import os
+import time
+
+from armazenamento import trava
+
+EVENTOS_FILE = "eventos.jsonl"
+EVENTOS_MAX_BYTES = 5 * 1024 * 1024
+
+
+def _ultimo_seq():
+    """Lê só a última linha do log para descobrir a sequência atual."""
+    if not os.path.exists(EVENTOS_FILE) or os.path.getsize(EVENTOS_FILE) == 0:
+        return 0
+    with open(EVENTOS_FILE, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        bloco = b""
+        while pos > 0 and bloco.count(b"\n") < 2:
+            passo = min(4096, pos)
+            pos -= passo
+            f.seek(pos)
+            bloco = f.read(passo) + bloco
+    linhas = [l for l in bloco.splitlines() if l.strip()]
+    try:
+        return json.loads(linhas[-1])["seq"]
+    except (IndexError, ValueError, KeyError):
+        return 0
+
+
+def _rotacionar():
+    """Mantém o log pequeno: guarda só a metade mais recente quando passa do limite."""
+    if os.path.getsize(EVENTOS_FILE) <= EVENTOS_MAX_BYTES:
+        return
+    with open(EVENTOS_FILE, "rb") as f:
+        f.seek(-EVENTOS_MAX_BYTES // 2, os.SEEK_END)
+        f.readline()
+        resto = f.read()
+    tmp = f"{EVENTOS_FILE}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(resto)
+    os.replace(tmp, EVENTOS_FILE)
+
+
+def publicar(tipo, pedido, anterior=None):
+    """Acrescenta um evento ao log; devolve o evento com sua sequência."""
+    with trava(EVENTOS_FILE):
+        evento = {
+            "seq": _ultimo_seq() + 1,
+            "tipo": tipo,
+            "pedido_id": str(pedido.get("id")),
+            "codigo_rastreio": str(pedido.get("codigo_rastreio", "")),
+            "status": pedido.get("status"),
+            "anterior": anterior,
+            "tipo_pedido": pedido.get("tipo_pedido"),
+            "ts": time.time(),
+        }
+        with open(EVENTOS_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(evento, ensure_ascii=False) + "\n")
+        _rotacionar()
+    return evento
+
+
+def ler_novos(posicao):
+    """Eventos gravados a partir de `posicao` (bytes) e a nova posição.
+
+    Se o arquivo encolheu (rotação), recomeça do início.
+    """
+    if not os.path.exists(EVENTOS_FILE):
+        return [], 0
+    tamanho = os.path.getsize(EVENTOS_FILE)
+    if tamanho < posicao:
+        posicao = 0
+    if tamanho == posicao:
+        return [], posicao
+    eventos = []
+    with open(EVENTOS_FILE, "rb") as f:
+        f.seek(posicao)
+        for linha in f:
+            if not linha.endswith(b"\n"):
+                break  # linha ainda sendo escrita
+            posicao += len(linha)
+            try:
+                eventos.append(json.loads(linha))
+            except ValueError:
+                continue
+    return eventos, posicao
@@ -0,0 +1,38 @@
+# impressao.py — Impressão direta na impressora local (Windows / win32)
+import platform
+
+from armazenamento import ler_json
+
+IMPRESSORAS_FILE = "impressoras.json"
+
+
+def impressao_local_disponivel():
+    return platform.system() == "Windows"
+
+
+def impressora_configurada():
+    """Endereço/nome da primeira impressora cadastrada (None usa a padrão do sistema)."""
+    impressoras = ler_json(IMPRESSORAS_FILE, [])
+    if impressoras:
+        return impressoras[0].get("endereco") or impressoras[0].get("nome")
+    return None
+
+
+def imprimir_local(texto, titulo="PEDIDO THE RUA"):
+    """Imprime o texto e devolve o nome da impressora; levanta exceção em caso de falha."""
+    import win32print, win32ui
+    printer_name = impressora_configurada() or win32print.GetDefaultPrinter()
+    hDC = win32ui.CreateDC()
+    hDC.CreatePrinterDC(printer_name)
+    hDC.StartDoc(titulo)
+    hDC.StartPage()
+    font = win32ui.CreateFont({"name": "Arial", "height": -18, "weight": 400})
+    hDC.SelectObject(font)
+    y = 20
+    for linha in texto.splitlines():
+        hDC.TextOut(20, y, linha.strip())
+        y += 35
+    hDC.EndPage()
+    hDC.EndDoc()
+    hDC.DeleteDC()
+    return printer_name
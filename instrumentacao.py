@@ -0,0 +1,209 @@
+# instrumentacao.py — Tempo das operações quentes em histogramas (página Desempenho e /metrics)
+#
+# medir("op") decora funções, cronometro("op") mede um bloco e iniciar("op")
+# devolve a função que encerra a medição (para as páginas, que são scripts).
+# Cada processo acumula em memória e, a cada poucos segundos, soma seus
+# histogramas em desempenho.json — assim a página Desempenho e o /metrics da
+# API enxergam o Streamlit e a API juntos. As páginas ("pagina.*") também
+# passam pelo perfilador, que perfila uma amostra das execuções se ligado.
+#
+# Este módulo não usa armazenamento.ler_json/gravar_json: eles são medidos
+# por aqui e a descarga não pode medir a si mesma.
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+DESEMPENHO_FILE = "desempenho.json"
+LIMITES_MS = [1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+INTERVALO_DESCARGA = 5  # segundos
+ATIVO = os.environ.get("THE_RUA_INSTRUMENTACAO", "1") != "0"
+
+_pendentes = {}
+_guard = threading.Lock()
+_descarga = {"thread": None}
+
+
+def _novo_histograma():
+    return {"baldes": [0] * (len(LIMITES_MS) + 1), "soma_ms": 0.0, "contagem": 0, "max_ms": 0.0}
+
+
+def _somar(destino, origem):
+    destino["baldes"] = [a + b for a, b in zip(destino["baldes"], origem["baldes"])]
+    destino["soma_ms"] += origem["soma_ms"]
+    destino["contagem"] += origem["contagem"]
+    destino["max_ms"] = max(destino["max_ms"], origem["max_ms"])
+
+
+# ----------------------------
+# Medição
+# ----------------------------
+def registrar(operacao, segundos):
+    if not ATIVO:
+        return
+    ms = segundos * 1000
+    with _guard:
+        h = _pendentes.get(operacao)
+        if h is None:
+            h = _pendentes[operacao] = _novo_histograma()
+        h["baldes"][bisect_left(LIMITES_MS, ms)] += 1
+        h["soma_ms"] += ms
+        h["contagem"] += 1
+        h["max_ms"] = max(h["max_ms"], ms)
+    if _descarga["thread"] is None:
+        _iniciar_descarga()
+
+
+def medir(operacao):
+    """Decorador: registra a duração de cada chamada em `operacao`."""
+    def decorar(funcao):
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                registrar(operacao, time.perf_counter() - inicio)
+        return medida
+    return decorar
+
+
+def _perfilar(operacao):
+    """Páginas podem ser sorteadas para o perfilador (desligado por padrão)."""
+    if not operacao.startswith("pagina."):
+        return None
+    import perfilador  # import tardio: perfilador usa armazenamento, que importa este módulo
+    return perfilador.iniciar(operacao[len("pagina."):])
+
+
+@contextmanager
+def cronometro(operacao):
+    perfil = _perfilar(operacao)
+    inicio = time.perf_counter()
+    completo = False
+    try:
+        yield
+        completo = True
+    finally:
+        registrar(operacao, time.perf_counter() - inicio)
+        if perfil is not None:
+            perfil(salvar=completo)
+
+
+def iniciar(operacao):
+    """Começa a medir agora; chame a função devolvida para registrar."""
+    perfil = _perfilar(operacao)
+    inicio = time.perf_counter()
+
+    def encerrar():
+        registrar(operacao, time.perf_counter() - inicio)
+        if perfil is not None:
+            perfil()
+    return encerrar
+
+
+# ----------------------------
+# Persistência (soma entre processos)
+# ----------------------------
+def _ler_arquivo():
+    try:
+        with open(DESEMPENHO_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def descarregar():
+    """Soma o acumulado deste processo em desempenho.json."""
+    with _guard:
+        lote = dict(_pendentes)
+        _pendentes.clear()
+    if not lote:
+        return
+    from armazenamento import trava  # import tardio: armazenamento importa este módulo
+    with trava(DESEMPENHO_FILE):
+        dados = _ler_arquivo()
+        for operacao, h in lote.items():
+            _somar(dados.setdefault(operacao, _novo_histograma()), h)
+        tmp = f"{DESEMPENHO_FILE}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(dados, f, ensure_ascii=False)
+        os.replace(tmp, DESEMPENHO_FILE)
+
+
+def _laco_descarga():
+    while True:
+        time.sleep(INTERVALO_DESCARGA)
+        try:
+            descarregar()
+        except Exception:
+            pass  # medição nunca derruba o sistema
+
+
+def _iniciar_descarga():
+    with _guard:
+        if _descarga["thread"] is not None:
+            return
+        _descarga["thread"] = threading.Thread(target=_laco_descarga, name="instrumentacao", daemon=True)
+    _descarga["thread"].start()
+    atexit.register(descarregar)
+
+
+def carregar():
+    """Histogramas de todos os processos (inclui o acumulado deste)."""
+    descarregar()
+    return _ler_arquivo()
+
+
+def limpar():
+    from armazenamento import trava
+    with _guard:
+        _pendentes.clear()
+    with trava(DESEMPENHO_FILE):
+        if os.path.exists(DESEMPENHO_FILE):
+            os.remove(DESEMPENHO_FILE)
+
+
+# ----------------------------
+# Leitura dos histogramas
+# ----------------------------
+def quantil(h, q):
+    """Estimativa do quantil `q` (0..1) em ms, interpolando dentro do balde."""
+    if not h["contagem"]:
+        return 0.0
+    alvo = q * h["contagem"]
+    acumulado = 0
+    for i, n in enumerate(h["baldes"]):
+        if n and acumulado + n >= alvo:
+            if i == len(LIMITES_MS):
+                return h["max_ms"]
+            inferior = LIMITES_MS[i - 1] if i else 0.0
+            estimativa = inferior + (LIMITES_MS[i] - inferior) * (alvo - acumulado) / n
+            return min(estimativa, h["max_ms"])
+        acumulado += n
+    return h["max_ms"]
+
+
+def prometheus(dados=None):
+    """Histogramas no formato texto do Prometheus (segundos, baldes acumulados)."""
+    dados = carregar() if dados is None else dados
+    nome = "the_rua_operacao_segundos"
+    linhas = [
+        f"# HELP {nome} Duração das operações instrumentadas.",
+        f"# TYPE {nome} histogram",
+    ]
+    for operacao in sorted(dados):
+        h = dados[operacao]
+        rotulo = operacao.replace("\\", "\\\\").replace('"', '\\"')
+        acumulado = 0
+        for limite, n in zip(LIMITES_MS + [None], h["baldes"]):
+            acumulado += n
+            le = "+Inf" if limite is None else f"{limite / 1000:g}"
+            linhas.append(f'{nome}_bucket{{operacao="{rotulo}",le="{le}"}} {acumulado}')
+        linhas.append(f'{nome}_sum{{operacao="{rotulo}"}} {h["soma_ms"] / 1000:.6f}')
+        linhas.append(f'{nome}_count{{operacao="{rotulo}"}} {h["contagem"]}')
+    return "\n".join(linhas) + "\n"
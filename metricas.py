@@ -0,0 +1,107 @@
+# metricas.py — Contadores vivos do painel, atualizados a cada gravação de pedido
+from datetime import datetime
+
+from armazenamento import ler_json, gravar_json, mtime, trava
+
+METRICAS_FILE = "metricas.json"
+RECENTES_MAX = 50
+
+_cache = {"assinatura": None, "metricas": None}
+
+
+def _vazio():
+    return {
+        "total_pedidos": 0,
+        "por_status": {},
+        "receita_dia": {},        # "YYYY-MM-DD" -> R$
+        "por_pagamento": {},      # forma -> {"qtd": n, "total": R$}
+        "recentes": [],           # resumos dos últimos pedidos, mais novo primeiro
+    }
+
+
+def _resumo(p):
+    return {
+        "id": str(p.get("id")),
+        "codigo_rastreio": p.get("codigo_rastreio"),
+        "nome": p.get("nome"),
+        "data": p.get("data"),
+        "status": p.get("status"),
+        "total": float(p.get("total", 0) or 0),
+        "tipo_pedido": p.get("tipo_pedido"),
+        "pagamento": p.get("pagamento"),
+    }
+
+
+def _somar(m, p, sinal):
+    status = p.get("status", "Desconhecido")
+    m["por_status"][status] = m["por_status"].get(status, 0) + sinal
+    m["total_pedidos"] += sinal
+    total = float(p.get("total", 0) or 0)
+    dia = str(p.get("data", ""))[:10] or datetime.now().strftime("%Y-%m-%d")
+    m["receita_dia"][dia] = round(m["receita_dia"].get(dia, 0) + sinal * total, 2)
+    pg = m["por_pagamento"].setdefault(p.get("pagamento", "Outros"), {"qtd": 0, "total": 0.0})
+    pg["qtd"] += sinal
+    pg["total"] = round(pg["total"] + sinal * total, 2)
+
+
+def _aplicar(m, evento, pedido, anterior):
+    pid = str(pedido.get("id"))
+    if evento == "criado":
+        _somar(m, pedido, +1)
+        m["recentes"].insert(0, _resumo(pedido))
+        del m["recentes"][RECENTES_MAX:]
+    elif evento == "status":
+        m["por_status"][anterior] = m["por_status"].get(anterior, 0) - 1
+        novo = pedido.get("status")
+        m["por_status"][novo] = m["por_status"].get(novo, 0) + 1
+        for r in m["recentes"]:
+            if r["id"] == pid:
+                r["status"] = novo
+    elif evento == "excluido":
+        _somar(m, pedido, -1)
+        m["recentes"] = [r for r in m["recentes"] if r["id"] != pid]
+
+
+def registrar(evento, pedido, anterior=None):
+    """Aplica um evento do pedidos_db ('criado', 'status', 'excluido') aos contadores."""
+    with trava(METRICAS_FILE):
+        m = ler_json(METRICAS_FILE, None)
+        if m is None:
+            # Sem base persistida: o próximo painel reconstrói a partir dos pedidos
+            return
+        _aplicar(m, evento, pedido, anterior)
+        gravar_json(METRICAS_FILE, m)
+
+
+def registrar_varios(evento, pedidos):
+    """O mesmo evento para vários pedidos numa gravação só (ex.: arquivamento)."""
+    with trava(METRICAS_FILE):
+        m = ler_json(METRICAS_FILE, None)
+        if m is None or not pedidos:
+            return
+        for p in pedidos:
+            _aplicar(m, evento, p, None)
+        gravar_json(METRICAS_FILE, m)
+
+
+def reconstruir(pedidos):
+    """Recalcula tudo a partir dos pedidos (só na primeira execução ou em reparo)."""
+    m = _vazio()
+    for p in sorted(pedidos, key=lambda x: x.get("data", "")):
+        _aplicar(m, "criado", p, None)
+    with trava(METRICAS_FILE):
+        gravar_json(METRICAS_FILE, m)
+    return m
+
+
+def carregar():
+    """Contadores persistidos (None se ainda não existem)."""
+    assinatura = mtime(METRICAS_FILE)
+    if assinatura != _cache["assinatura"]:
+        _cache["metricas"] = ler_json(METRICAS_FILE, None)
+        _cache["assinatura"] = assinatura
+    return _cache["metricas"]
+
+
+def receita_hoje(m):
+    return m["receita_dia"].get(datetime.now().strftime("%Y-%m-%d"), 0.0)
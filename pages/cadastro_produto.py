@@ -1,9 +1,19 @@
 import streamlit as st
-import json
 import os
 from datetime import datetime
 
-if "logado" not in st.session_state or not st.session_state["logado"]:
+import autenticacao
+import caixas
+import catalogo
+import despacho
+import enderecos
+import instrumentacao
+import pedidos_db
+import retencao
+import tarefas
+import zonas
+
+if autenticacao.sessao_valida(st.session_state, "cadastro_produto") is None:
     st.warning("⚠️ Acesso restrito. Faça login para continuar.")
     st.stop()
 
@@ -11,46 +21,24 @@ if "logado" not in st.session_state or not st.session_state["logado"]:
 # Configurações e caminhos
 # ===============================
 st.set_page_config(page_title="Cadastro de Produtos - THE RUA", layout="wide")
+fim_pagina = instrumentacao.iniciar("pagina.cadastro_produto")  # só execuções completas (st.stop/st.rerun interrompem)
 
-DATA_FILE = "produtos.json"
-PEDIDOS_FILE = "pedidos.json"
-CAIXA_FILE = "caixa.json"
 UPLOADS_DIR = "uploads/produtos"
 os.makedirs(UPLOADS_DIR, exist_ok=True)
 
 # ===============================
 # Funções auxiliares
 # ===============================
-def carregar_produtos():
-    """Carrega os produtos do JSON."""
-    if not os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "w", encoding="utf-8") as f:
-            json.dump([], f, indent=4, ensure_ascii=False)
-    with open(DATA_FILE, "r", encoding="utf-8") as f:
-        try:
-            return json.load(f)
-        except:
-            return []
-
-def salvar_produtos(produtos):
-    """Salva a lista de produtos no JSON."""
-    with open(DATA_FILE, "w", encoding="utf-8") as f:
-        json.dump(produtos, f, indent=4, ensure_ascii=False)
-
-def gerar_id(produtos):
-    """Gera um novo ID incremental."""
-    if not produtos:
-        return "1"
-    return str(max(int(p["id"]) for p in produtos) + 1)
+def cardapio_alterado():
+    """Agenda a regeneração do cardápio estático depois de mudar produtos."""
+    tarefas.enfileirar("gerar_cardapio", descricao="Cardápio estático")
 
 def limpar_registros():
     """Limpa todos os registros do sistema (pedidos, caixa e produtos)."""
-    with open(PEDIDOS_FILE, "w", encoding="utf-8") as f:
-        json.dump([], f, indent=4, ensure_ascii=False)
-    with open(DATA_FILE, "w", encoding="utf-8") as f:
-        json.dump([], f, indent=4, ensure_ascii=False)
-    with open(CAIXA_FILE, "w", encoding="utf-8") as f:
-        json.dump({"aberto": False, "aberto_em": None, "fechado_em": None, "valor_inicial": 0.0}, f, indent=4, ensure_ascii=False)
+    pedidos_db.limpar()
+    catalogo.limpar()
+    caixas.limpar()
+    cardapio_alterado()
 
 # ===============================
 # Interface principal
@@ -58,7 +46,7 @@ def limpar_registros():
 st.title("🍔 Administração - Cadastro e Manutenção de Produtos")
 st.caption("Adicione, edite, gerencie os produtos e limpe registros do sistema.")
 
-produtos = carregar_produtos()
+produtos = catalogo.carregar_produtos()
 
 # ------------------------------------------------
 # 🧹 Botão de limpeza geral
@@ -70,6 +58,127 @@ if st.button("🧹 Limpar TODOS os Registros do Sistema"):
     st.balloons()
     st.stop()
 
+# Retenção: o que fica em pedidos.json e quando arquivos antigos são apagados
+with st.expander("🗄️ Retenção e arquivamento de dados"):
+    config_ret = retencao.carregar_config()
+    with st.form("retencao_form"):
+        c1, c2 = st.columns(2)
+        horas_quente = c1.number_input("Manter entregues no sistema (horas)", min_value=1, value=int(config_ret["horas_quente"]))
+        dias_abandonados = c2.number_input("Arquivar pedidos parados após (dias)", min_value=1, value=int(config_ret["dias_abandonados"]))
+        dias_comprovantes = c1.number_input("Apagar comprovantes após (dias)", min_value=1, value=int(config_ret["dias_comprovantes"]))
+        dias_relatorios = c2.number_input("Apagar relatórios de caixa após (dias)", min_value=1, value=int(config_ret["dias_relatorios"]))
+        intervalo = c1.number_input("Rodar a limpeza a cada (minutos)", min_value=5, value=int(config_ret["intervalo_minutos"]))
+        if st.form_submit_button("💾 Salvar política"):
+            retencao.salvar_config({
+                "horas_quente": horas_quente,
+                "dias_abandonados": dias_abandonados,
+                "dias_comprovantes": dias_comprovantes,
+                "dias_relatorios": dias_relatorios,
+                "intervalo_minutos": intervalo,
+            })
+            st.success("Política de retenção salva.")
+    estado_ret = retencao.carregar_estado()
+    if estado_ret.get("ultima_data"):
+        r = estado_ret.get("ultimo_resultado", {})
+        st.caption(
+            f"Última execução: {estado_ret['ultima_data']} — {r.get('pedidos_arquivados', 0)} pedido(s) arquivado(s), "
+            f"{r.get('comprovantes_apagados', 0)} comprovante(s) e {r.get('relatorios_apagados', 0)} relatório(s) apagados; "
+            f"{r.get('pedidos_quentes', 0)} pedido(s) ativos."
+        )
+    meses = retencao.meses_arquivados()
+    if meses:
+        st.caption(f"Meses arquivados: {', '.join(meses)}")
+    if st.button("▶️ Executar retenção agora"):
+        retencao.agendar(forcar=True)
+        st.info("Retenção enfileirada — acompanhe em ⚙️ Tarefas no caixa.")
+
+# Entregas: loja, lotes, ruas e zonas com taxa (só o administrador altera)
+with st.expander("🛵 Entregas: loja, zonas e taxas"):
+    config = despacho.carregar_config()
+    with st.form("despacho_config"):
+        st.markdown("**Montagem dos lotes**")
+        loja = config["loja"] or [0.0, 0.0]
+        c1, c2 = st.columns(2)
+        lat = c1.number_input("Latitude da loja", value=float(loja[0]), format="%.6f")
+        lon = c2.number_input("Longitude da loja", value=float(loja[1]), format="%.6f")
+        c1, c2 = st.columns(2)
+        max_pedidos = c1.number_input("Entregas por viagem", 1, 20, int(config["max_pedidos"]))
+        raio_km = c2.number_input("Raio para agrupar (km)", 0.1, 50.0, float(config["raio_km"]), step=0.5)
+        if st.form_submit_button("💾 Salvar"):
+            despacho.salvar_config({
+                "loja": [lat, lon] if (lat, lon) != (0.0, 0.0) else None,
+                "max_pedidos": max_pedidos,
+                "raio_km": raio_km,
+            })
+            st.rerun()
+
+    sem_local = sorted({enderecos.rua_do_pedido(p) for p in pedidos_db.entregas_prontas()
+                        if p.get("endereco") and enderecos.posicao_do_pedido(p) is None})
+    with st.form("fixar_rua"):
+        st.markdown("**📍 Localizar rua** (tabela offline usada para agrupar as entregas)")
+        if sem_local:
+            st.caption("Ruas de pedidos atuais ainda sem localização: " + "; ".join(sem_local))
+        rua = st.text_input("Rua", sem_local[0] if sem_local else "")
+        c1, c2 = st.columns(2)
+        rua_lat = c1.number_input("Latitude", value=0.0, format="%.6f")
+        rua_lon = c2.number_input("Longitude", value=0.0, format="%.6f")
+        if st.form_submit_button("📍 Salvar localização") and rua.strip():
+            enderecos.fixar_rua(rua, rua_lat, rua_lon)
+            st.rerun()
+
+    # Zonas de entrega e taxas
+    st.markdown("**🗺️ Zonas de entrega** — a taxa da zona entra no total do pedido")
+    config_zonas = zonas.carregar_config()
+    raios = [z for z in config_zonas["zonas"] if not z.get("pontos")]
+    poligonos = [z for z in config_zonas["zonas"] if z.get("pontos")]
+    if not config["loja"]:
+        st.caption("⚠️ Informe a posição da loja acima: as zonas por raio partem dela.")
+    with st.form("zonas_raio"):
+        st.caption("Zonas por raio ao redor da loja (o menor raio que contém o endereço vale).")
+        editadas = st.data_editor(
+            [{"nome": z["nome"], "raio_km": float(z["raio_km"]), "taxa": float(z["taxa"])} for z in raios]
+            or [{"nome": "Até 3 km", "raio_km": 3.0, "taxa": 5.0}],
+            num_rows="dynamic", use_container_width=True, key="editor_zonas",
+        )
+        c1, c2, c3 = st.columns(3)
+        sem_localizacao = c1.number_input(
+            "Taxa p/ endereço sem localização (-1 = maior taxa)", -1.0, 500.0,
+            -1.0 if config_zonas["taxa_sem_localizacao"] is None else float(config_zonas["taxa_sem_localizacao"]), step=1.0)
+        atender_fora = c2.checkbox("Atender fora das zonas", value=config_zonas["atender_fora"])
+        taxa_fora = c3.number_input("Taxa fora das zonas", 0.0, 500.0, float(config_zonas["taxa_fora"]), step=1.0)
+        if st.form_submit_button("💾 Salvar zonas"):
+            novas = [{"nome": str(z["nome"]).strip(), "raio_km": float(z["raio_km"]), "taxa": float(z["taxa"])}
+                     for z in editadas if z.get("nome") and z.get("raio_km")]
+            zonas.salvar_config({**config_zonas, "zonas": poligonos + novas,
+                                 "taxa_sem_localizacao": None if sem_localizacao < 0 else sem_localizacao,
+                                 "atender_fora": atender_fora, "taxa_fora": taxa_fora})
+            st.rerun()
+
+    with st.form("zona_poligono"):
+        st.caption("Zona por polígono (bairro): um vértice por linha, \"latitude, longitude\".")
+        c1, c2 = st.columns([3, 1])
+        nome_zona = c1.text_input("Nome da zona")
+        taxa_zona = c2.number_input("Taxa", 0.0, 500.0, 5.0, step=1.0)
+        vertices = st.text_area("Vértices")
+        if st.form_submit_button("➕ Adicionar polígono") and nome_zona.strip():
+            try:
+                pontos = [[float(v) for v in linha.split(",")[:2]] for linha in vertices.splitlines() if linha.strip()]
+            except ValueError:
+                pontos = []
+            if len(pontos) < 3:
+                st.error("Informe pelo menos 3 vértices no formato \"latitude, longitude\".")
+            else:
+                config_zonas["zonas"].append({"nome": nome_zona.strip(), "taxa": taxa_zona, "pontos": pontos})
+                zonas.salvar_config(config_zonas)
+                st.rerun()
+    for i, zona in enumerate(poligonos):
+        c1, c2 = st.columns([4, 1])
+        c1.write(f"🔷 {zona['nome']} — R$ {float(zona['taxa']):.2f} ({len(zona['pontos'])} vértices)")
+        if c2.button("🗑️ Remover", key=f"rm_zona_{i}"):
+            config_zonas["zonas"] = [z for z in config_zonas["zonas"] if z is not zona]
+            zonas.salvar_config(config_zonas)
+            st.rerun()
+
 st.divider()
 
 # ------------------------------------------------
@@ -80,6 +189,7 @@ with st.form("cadastro_produto_form"):
     nome = st.text_input("Nome do produto")
     descricao = st.text_area("Descrição")
     preco = st.number_input("Preço (R$)", min_value=0.0, step=0.5)
+    categoria = st.text_input("Categoria (ex: Hambúrgueres, Bebidas)", catalogo.CATEGORIA_PADRAO)
     imagem = st.file_uploader("Imagem do produto", type=["png", "jpg", "jpeg"])
 
     enviado = st.form_submit_button("💾 Salvar Produto")
@@ -87,8 +197,7 @@ with st.form("cadastro_produto_form"):
         if not nome or preco <= 0:
             st.error("Por favor, preencha todos os campos obrigatórios (nome e preço).")
         else:
-            produtos = carregar_produtos()
-            novo_id = gerar_id(produtos)
+            novo_id = catalogo.proximo_id()
             imagem_path = ""
 
             if imagem:
@@ -101,12 +210,14 @@ with st.form("cadastro_produto_form"):
                 "nome": nome,
                 "descricao": descricao,
                 "preco": preco,
+                "categoria": categoria.strip() or catalogo.CATEGORIA_PADRAO,
+                "esgotado": False,
                 "imagem": imagem_path.replace("\\", "/"),
                 "criado_em": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             }
 
-            produtos.append(produto)
-            salvar_produtos(produtos)
+            catalogo.adicionar_produto(produto)
+            cardapio_alterado()
             st.success(f"✅ Produto **{nome}** cadastrado com sucesso!")
             st.balloons()
             st.rerun()
@@ -120,7 +231,13 @@ st.subheader("📦 Produtos Cadastrados")
 if not produtos:
     st.info("Nenhum produto cadastrado ainda.")
 else:
-    for p in produtos:
+    filtro = st.text_input("🔎 Filtrar produtos (nome, descrição ou categoria)")
+    if filtro.strip():
+        encontrados = {str(x["id"]) for x in catalogo.buscar(filtro)}
+        listados = [x for x in produtos if str(x["id"]) in encontrados]
+    else:
+        listados = produtos
+    for p in listados:
         with st.container():
             st.markdown("---")
             col1, col2, col3 = st.columns([2, 4, 2])
@@ -135,15 +252,21 @@ else:
                 st.write(f"### {p['nome']}")
                 st.write(p.get("descricao", ""))
                 st.write(f"💰 **R$ {p['preco']:.2f}**")
+                st.caption(f"🏷️ {catalogo.categoria(p)}" + (" — 🚫 Esgotado" if p.get("esgotado") else ""))
                 st.caption(f"🕒 Cadastrado em: {p.get('criado_em', '-')}")
 
             with col3:
+                rotulo = "✅ Voltou ao estoque" if p.get("esgotado") else "🚫 Marcar esgotado"
+                if st.button(rotulo, key=f"esgotado_{p['id']}"):
+                    catalogo.definir_esgotado(p["id"], not p.get("esgotado"))
+                    cardapio_alterado()
+                    st.rerun()
                 if st.button("✏️ Editar", key=f"edit_{p['id']}"):
                     st.session_state["editando"] = p["id"]
                     st.rerun()
                 if st.button("🗑️ Excluir", key=f"del_{p['id']}"):
-                    produtos = [x for x in produtos if x["id"] != p["id"]]
-                    salvar_produtos(produtos)
+                    catalogo.remover_produto(p["id"])
+                    cardapio_alterado()
                     st.warning(f"Produto **{p['nome']}** removido.")
                     st.rerun()
 
@@ -161,21 +284,28 @@ if "editando" in st.session_state:
             nome = st.text_input("Nome", produto_editar["nome"])
             descricao = st.text_area("Descrição", produto_editar.get("descricao", ""))
             preco = st.number_input("Preço (R$)", value=float(produto_editar.get("preco", 0.0)), step=0.5)
+            categoria = st.text_input("Categoria", catalogo.categoria(produto_editar))
             nova_imagem = st.file_uploader("Alterar imagem (opcional)", type=["png", "jpg", "jpeg"])
 
             enviar_edicao = st.form_submit_button("💾 Salvar Alterações")
             if enviar_edicao:
-                produto_editar["nome"] = nome
-                produto_editar["descricao"] = descricao
-                produto_editar["preco"] = preco
+                campos = {
+                    "nome": nome,
+                    "descricao": descricao,
+                    "preco": preco,
+                    "categoria": categoria.strip() or catalogo.CATEGORIA_PADRAO,
+                }
 
                 if nova_imagem:
                     imagem_path = os.path.join(UPLOADS_DIR, f"{int(datetime.now().timestamp())}_{nova_imagem.name}")
                     with open(imagem_path, "wb") as f:
                         f.write(nova_imagem.getbuffer())
-                    produto_editar["imagem"] = imagem_path.replace("\\", "/")
+                    campos["imagem"] = imagem_path.replace("\\", "/")
 
-                salvar_produtos(produtos)
+                catalogo.atualizar_produto(edit_id, campos)
+                cardapio_alterado()
                 del st.session_state["editando"]
                 st.success("Produto atualizado com sucesso!")
                 st.rerun()
+
+fim_pagina()
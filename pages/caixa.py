@@ -1,11 +1,18 @@
 import streamlit as st
-import json
 import os
-import platform
 import mimetypes
 import urllib.parse
 from datetime import datetime
 
+import autenticacao
+import caixas
+import clientes
+import impressao
+import instrumentacao
+import retencao
+import tarefas
+from pedidos_db import carregar_pedidos, excluir_pedido, atualizar_status
+
 # try import st_javascript but don't crash if not available
 try:
     from streamlit_javascript import st_javascript
@@ -15,57 +22,14 @@ except Exception:
 # ---------------------------------------------------
 # Segurança — exige login antes de acessar a página
 # ---------------------------------------------------
-if "logado" not in st.session_state or not st.session_state["logado"]:
+if autenticacao.sessao_valida(st.session_state, "caixa") is None:
     st.warning("⚠️ Acesso restrito. Faça login para continuar.")
     st.stop()
 
 # ---------------------------------------------------
 # Caminhos e arquivos de dados
 # ---------------------------------------------------
-DATA_FILE = "pedidos.json"
-CAIXA_FILE = "caixa.json"
-IMPRESSORAS_FILE = "impressoras.json"
 RELATORIOS_DIR = "relatorios"
-os.makedirs(RELATORIOS_DIR, exist_ok=True)
-
-# ---------------------------------------------------
-# Funções utilitárias
-# ---------------------------------------------------
-def carregar_json(path, default):
-    if not os.path.exists(path):
-        return default
-    with open(path, "r", encoding="utf-8") as f:
-        try:
-            return json.load(f)
-        except:
-            return default
-
-def salvar_json(path, data):
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
-
-def carregar_pedidos():
-    return carregar_json(DATA_FILE, [])
-
-def salvar_pedidos(pedidos):
-    salvar_json(DATA_FILE, pedidos)
-
-def carregar_caixa():
-    return carregar_json(CAIXA_FILE, {"aberto": False, "valor_inicial": 0.0})
-
-def salvar_caixa(caixa):
-    salvar_json(CAIXA_FILE, caixa)
-
-def excluir_pedido(pedido_id):
-    pedidos = [p for p in carregar_pedidos() if str(p.get("id")) != str(pedido_id)]
-    salvar_pedidos(pedidos)
-
-def atualizar_status(pedido_id, novo_status):
-    pedidos = carregar_pedidos()
-    for p in pedidos:
-        if str(p.get("id")) == str(pedido_id):
-            p["status"] = novo_status
-    salvar_pedidos(pedidos)
 
 # ---------------------------------------------------
 # Impressão automática (Windows ou Android/RawBT)
@@ -78,42 +42,11 @@ def _detect_android_env():
     return any(k in os.environ for k in android_keys)
 
 def imprimir_texto(texto, titulo="PEDIDO THE RUA"):
-    sistema = platform.system()
-    impressora_config = None
-
-    # Carrega impressora configurada (se existir)
-    if os.path.exists(IMPRESSORAS_FILE):
-        try:
-            with open(IMPRESSORAS_FILE, "r", encoding="utf-8") as f:
-                impressoras = json.load(f)
-                if impressoras:
-                    impressora_config = impressoras[0].get("endereco") or impressoras[0].get("nome")
-        except Exception:
-            impressora_config = None
-
-    # Caso Windows — impressão direta
-    if sistema == "Windows":
-        try:
-            import win32print, win32ui
-            printer_name = impressora_config or win32print.GetDefaultPrinter()
-            hDC = win32ui.CreateDC()
-            hDC.CreatePrinterDC(printer_name)
-            hDC.StartDoc(titulo)
-            hDC.StartPage()
-            font = win32ui.CreateFont({"name": "Arial", "height": -18, "weight": 400})
-            hDC.SelectObject(font)
-            y = 20
-            for linha in texto.splitlines():
-                hDC.TextOut(20, y, linha.strip())
-                y += 35
-            hDC.EndPage()
-            hDC.EndDoc()
-            hDC.DeleteDC()
-            st.success(f"🖨️ Impresso com sucesso na impressora: {printer_name}")
-            return
-        except Exception as e:
-            st.error(f"❌ Erro ao imprimir (Windows): {e}")
-            return
+    # Caso Windows — a impressão vai para a fila de tarefas (não trava a tela)
+    if impressao.impressao_local_disponivel():
+        tarefas.enfileirar("imprimir", {"texto": texto, "titulo": titulo}, descricao=titulo)
+        st.info("🖨️ Enviado para a impressora — acompanhe em ⚙️ Tarefas.")
+        return
 
     # --- Força exibição RawBT no navegador ---
     texto_para_imprimir = texto.strip().replace("\r\n", "\n").replace("\n\n", "\n")
@@ -169,6 +102,8 @@ Tipo: {pedido['tipo_pedido']}
     for item in pedido.get("produtos", []):
         texto += f"- {item.get('quantidade', 0)}x {item.get('nome', '')} R$ {item.get('preco', 0) * item.get('quantidade', 0):.2f}\n"
 
+    if pedido.get("taxa_entrega"):
+        texto += f"Taxa de entrega: R$ {pedido['taxa_entrega']:.2f}\n"
     texto += f"\nTotal: R$ {pedido.get('total', 0):.2f}\nPagamento: {pedido.get('pagamento', '')}\n"
     if pedido.get("troco_para"):
         texto += f"Troco para: {pedido['troco_para']}\n"
@@ -180,38 +115,30 @@ Tipo: {pedido['tipo_pedido']}
 # ---------------------------------------------------
 # Funções de Caixa e Relatórios
 # ---------------------------------------------------
-def abrir_caixa(valor_inicial):
-    caixa = {
-        "aberto": True,
-        "valor_inicial": valor_inicial,
-        "aberto_em": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "fechado_em": None,
-    }
-    salvar_caixa(caixa)
-
-def gerar_relatorio_caixa():
-    pedidos = carregar_pedidos()
-    caixa = carregar_caixa()
-    total_geral = sum(p.get("total", 0) for p in pedidos)
-    por_pagamento = {}
-    for p in pedidos:
-        pg = p.get("pagamento", "Outros")
-        por_pagamento[pg] = por_pagamento.get(pg, 0) + p.get("total", 0)
+def abrir_caixa(caixa_id, valor_inicial):
+    return caixas.abrir_turno(caixa_id, valor_inicial)
+
+@instrumentacao.medir("caixa.gerar_relatorio")
+def gerar_relatorio_caixa(turno):
+    """Relatório do turno a partir dos acumuladores do livro-caixa."""
+    por_pagamento = turno.get("por_pagamento", {})
     rel = f"""
 ====== FECHAMENTO THE RUA ======
-Aberto em: {caixa.get('aberto_em')}
-Fechado em: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-Valor inicial: R$ {caixa.get('valor_inicial', 0):.2f}
-Total pedidos: {len(pedidos)}
-Total geral: R$ {total_geral:.2f}
+Turno: #{turno['id']}
+Aberto em: {turno.get('aberto_em')}
+Fechado em: {turno.get('fechado_em') or datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
-Por pagamento:
+Valor inicial: R$ {turno.get('valor_inicial', 0):.2f}
+Total pedidos: {turno.get('qtd_pedidos', 0)}
+Total geral: R$ {turno.get('total', 0):.2f}
 """
+    if turno.get("estornos"):
+        rel += f"Estornos de turnos anteriores: R$ {turno['estornos']:.2f}\n"
+    rel += "\nPor pagamento:\n"
     for pg, valor in por_pagamento.items():
         rel += f"- {pg}: R$ {valor:.2f}\n"
     dinheiro = por_pagamento.get("Dinheiro", 0)
-    total_final = caixa.get("valor_inicial", 0) + dinheiro
+    total_final = turno.get("valor_inicial", 0) + dinheiro
     rel += f"""
 ==============================
 💰 Total em dinheiro físico: R$ {total_final:.2f}
@@ -219,16 +146,15 @@ Por pagamento:
 """
     return rel
 
-def fechar_caixa():
-    caixa = carregar_caixa()
-    caixa["aberto"] = False
-    caixa["fechado_em"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    salvar_caixa(caixa)
-    rel = gerar_relatorio_caixa()
-    nome = f"relatorio_{datetime.now().strftime('%Y-%m-%d_%H-%M')}.txt"
+def fechar_caixa(caixa_id):
+    """Fecha o turno e gera o relatório; (None, None) se outro tablet já fechou."""
+    turno = caixas.fechar_turno(caixa_id)
+    if turno is None:
+        return None, None
+    rel = gerar_relatorio_caixa(turno)
+    nome = f"relatorio_{caixa_id}_{datetime.now().strftime('%Y-%m-%d_%H-%M')}.txt"
     caminho = os.path.join(RELATORIOS_DIR, nome)
-    with open(caminho, "w", encoding="utf-8") as f:
-        f.write(rel)
+    tarefas.enfileirar("gravar_relatorio", {"caminho": caminho, "texto": rel}, descricao=f"Relatório {nome}")
     imprimir_texto(rel, titulo="Fechamento THE RUA")
     return rel, caminho
 
@@ -236,18 +162,41 @@ def fechar_caixa():
 # Interface
 # ---------------------------------------------------
 st.set_page_config(page_title="Caixa - THE RUA", layout="wide")
+fim_pagina = instrumentacao.iniciar("pagina.caixa")  # só execuções completas (st.stop/st.rerun interrompem)
+retencao.agendar()  # arquiva/limpa em segundo plano quando o intervalo vence
 st.title("💵 Painel do Caixa")
 st.caption("Gerencie pedidos, comprovantes e impressão via RawBT ou Windows.")
 
-# Controle de caixa
+# Controle de caixa — cada tablet escolhe o caixa em que está operando
 st.sidebar.header("🧾 Controle de Caixa")
-caixa = carregar_caixa()
+lista_caixas = caixas.listar_caixas()
+ids_caixas = [c["id"] for c in lista_caixas]
+if st.session_state.get("caixa_id") not in ids_caixas:
+    st.session_state["caixa_id"] = ids_caixas[0]
+caixa_id = st.sidebar.selectbox(
+    "Caixa",
+    ids_caixas,
+    index=ids_caixas.index(st.session_state["caixa_id"]),
+    format_func=lambda i: next(f"{c['nome']} {'🟢' if c['aberto'] else '🔴'}" for c in lista_caixas if c["id"] == i),
+)
+st.session_state["caixa_id"] = caixa_id
+
+with st.sidebar.expander("➕ Novo caixa"):
+    with st.form("novo_caixa_form"):
+        nome_caixa = st.text_input("Nome do caixa (ex: Balcão 2)")
+        if st.form_submit_button("Criar caixa") and nome_caixa:
+            st.session_state["caixa_id"] = caixas.criar_caixa(nome_caixa)
+            st.rerun()
+
+caixa = caixas.carregar_caixa(caixa_id)
+if st.session_state.get("aviso_caixa"):
+    st.warning(st.session_state.pop("aviso_caixa"))
 
 if not caixa.get("aberto", False):
     with st.sidebar.form("abrir_caixa_form"):
         valor_inicial = st.number_input("Valor inicial (R$)", min_value=0.0, step=10.0)
         if st.form_submit_button("🔓 Abrir Caixa"):
-            abrir_caixa(valor_inicial)
+            abrir_caixa(caixa_id, valor_inicial)
             st.success("Caixa aberto com sucesso!")
             st.rerun()
     st.warning("⚠️ O caixa está fechado. Abra o caixa para usar o sistema.")
@@ -255,15 +204,47 @@ if not caixa.get("aberto", False):
 else:
     st.sidebar.success(f"✅ Caixa aberto em: {caixa['aberto_em']}")
     st.sidebar.info(f"💵 Valor inicial: R$ {caixa['valor_inicial']:.2f}")
+    turno = caixas.turno_atual(caixa_id)
+    if turno:
+        st.sidebar.caption(f"Turno #{turno['id']} — {turno['qtd_pedidos']} pedido(s), R$ {turno['total']:.2f}")
 
     if st.sidebar.button("🔒 Fechar Caixa"):
-        rel, caminho = fechar_caixa()
+        rel, caminho = fechar_caixa(caixa_id)
+        if rel is None:
+            st.session_state["aviso_caixa"] = "Caixa já fechado (por outro tablet)."
+            st.rerun()
         st.success("Caixa fechado com sucesso ✅")
         st.text_area("📋 Relatório do Dia", rel, height=300)
-        with open(caminho, "rb") as f:
-            st.download_button("⬇️ Baixar Relatório do Dia", f, file_name=os.path.basename(caminho))
+        st.download_button("⬇️ Baixar Relatório do Dia", rel, file_name=os.path.basename(caminho))
         st.stop()
 
+# --- Turnos anteriores ---
+with st.sidebar.expander("📚 Turnos anteriores"):
+    anteriores = [t for t in caixas.listar_turnos(caixa_id) if t.get("fechado_em")]
+    if not anteriores:
+        st.caption("Nenhum turno fechado ainda.")
+    else:
+        escolhido = st.selectbox(
+            "Turno",
+            anteriores,
+            format_func=lambda t: f"#{t['id']} — {t['aberto_em']} (R$ {t['total']:.2f})",
+        )
+        st.text(gerar_relatorio_caixa(escolhido))
+
+# --- Tarefas em segundo plano (impressão, relatórios, comprovantes, imagens) ---
+ICONES_TAREFA = {"pendente": "⏳", "executando": "🔄", "concluida": "✅", "erro": "❌"}
+with st.sidebar.expander("⚙️ Tarefas"):
+    recentes = tarefas.listar(10)
+    if not recentes:
+        st.caption("Nenhuma tarefa ainda.")
+    for t in recentes:
+        st.caption(f"{ICONES_TAREFA.get(t['status'], '')} {t['descricao']} — {t['criada_em'][11:]}")
+        if t["status"] == "erro":
+            st.caption(f"↳ {t['erro']}")
+    if st.button("🔄 Atualizar", key="atualizar_tarefas"):
+        tarefas.retomar_pendentes()
+        st.rerun()
+
 # --- Teste de impressão ---
 st.sidebar.subheader("🖨️ Impressora Local")
 if st.sidebar.button("🧾 Testar Impressão"):
@@ -289,12 +270,17 @@ for i, pedido in enumerate(pedidos):
     with col1:
         st.subheader(f"📦 Pedido #{pedido['codigo_rastreio']}")
         st.write(f"👤 {pedido['nome']} — {pedido['telefone']}")
+        cliente = clientes.buscar(pedido.get("cliente_id"))
+        if cliente and cliente["pedidos"] > 1:
+            st.caption(f"⭐ Cliente com {cliente['pedidos']} pedidos (R$ {cliente['total_gasto']:.2f} no total)")
         st.write(f"🕒 {pedido['data']}")
         st.write(f"💵 Total: R$ {pedido['total']:.2f}")
         st.write(f"📦 Tipo: {pedido['tipo_pedido']}")
         if pedido["tipo_pedido"] == "Entrega":
             st.caption(f"📍 {pedido['endereco']}")
         st.caption(f"🧾 Pagamento: {pedido['pagamento']}")
+        if pedido.get("caixa_id"):
+            st.caption(f"🏷️ Caixa: {pedido['caixa_id']}")
         if pedido.get("observacoes"):
             st.caption(f"✏️ {pedido['observacoes']}")
 
@@ -343,7 +329,7 @@ for i, pedido in enumerate(pedidos):
 
         if pedido["status"] == "Aguardando aceite":
             if st.button("✅ Aceitar Pedido", key=f"aceitar_{pedido['id']}"):
-                atualizar_status(pedido["id"], "Em preparo")
+                atualizar_status(pedido["id"], "Em preparo", caixa_id=caixa_id)
                 st.success("Pedido aceito.")
                 st.rerun()
 
@@ -354,3 +340,5 @@ for i, pedido in enumerate(pedidos):
             excluir_pedido(pedido['id'])
             st.warning("Pedido excluído.")
             st.rerun()
+
+fim_pagina()
@@ -1,44 +1,22 @@
 import streamlit as st
-import json
-import os
 from datetime import datetime
 
-if "logado" not in st.session_state or not st.session_state["logado"]:
+import autenticacao
+import instrumentacao
+import retencao
+import sla
+from pedidos_db import carregar_pedidos, atualizar_status
+
+if autenticacao.sessao_valida(st.session_state, "cozinha") is None:
     st.warning("⚠️ Acesso restrito. Faça login para continuar.")
     st.stop()
 
-DATA_FILE = "pedidos.json"
-
-# ============================
-# Funções auxiliares
-# ============================
-def carregar_pedidos():
-    if not os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "w", encoding="utf-8") as f:
-            json.dump([], f)
-    with open(DATA_FILE, "r", encoding="utf-8") as f:
-        try:
-            return json.load(f)
-        except:
-            return []
-
-def salvar_pedidos(pedidos):
-    with open(DATA_FILE, "w", encoding="utf-8") as f:
-        json.dump(pedidos, f, indent=4, ensure_ascii=False)
-
-def atualizar_status(pedido_id, novo_status):
-    pedidos = carregar_pedidos()
-    for p in pedidos:
-        if str(p.get("id")) == str(pedido_id):
-            p["status"] = novo_status
-            salvar_pedidos(pedidos)
-            return True
-    return False
-
 # ============================
 # Interface da Cozinha
 # ============================
 st.set_page_config(page_title="Cozinha - POS-80", layout="wide")
+fim_pagina = instrumentacao.iniciar("pagina.cozinha")  # só execuções completas (st.stop/st.rerun interrompem)
+retencao.agendar()  # arquiva/limpa em segundo plano quando o intervalo vence
 st.title("👨‍🍳 Painel da Cozinha")
 st.caption("Visualize e gerencie os pedidos aceitos pelo caixa.")
 
@@ -52,9 +30,17 @@ else:
     if not pedidos_em_preparo:
         st.info("Nenhum pedido pendente ou em preparo.")
     else:
+        metas_sla = sla.carregar_config()
+        atrasados = sum(1 for p in pedidos_em_preparo if sla.estourou_sla(p, metas_sla)[0])
+        if atrasados:
+            st.error(f"⏰ {atrasados} pedido(s) acima da meta de tempo (SLA).")
+
         for pedido in pedidos_em_preparo:
+            estourou, minutos, meta = sla.estourou_sla(pedido, metas_sla)
             with st.container():
                 st.markdown("---")
+                if estourou:
+                    st.error(f"⏰ ATRASADO — {minutos:.0f} min em '{pedido['status']}' (meta: {meta} min)")
                 col1, col2, col3 = st.columns([3, 2, 2])
 
                 with col1:
@@ -78,6 +64,8 @@ else:
 
                     status_atual = pedido.get("status", "Aguardando aceite")
                     st.write(f"🟢 **Status atual:** {status_atual}")
+                    if minutos is not None and not estourou:
+                        st.caption(f"⏱️ {minutos:.0f} min neste status (meta: {meta} min)")
 
                     if status_atual == "Aguardando aceite":
                         if st.button(f"✅ Aceitar Pedido #{pedido['codigo_rastreio']}", key=f"aceita_{pedido['id']}"):
@@ -87,17 +75,17 @@ else:
 
                     elif status_atual == "Em preparo":
                         if st.button(f"🍔 Pedido Pronto #{pedido['codigo_rastreio']}", key=f"pronto_{pedido['id']}"):
-                            if pedido["tipo_pedido"] == "Entrega":
-                                atualizar_status(pedido["id"], "Em rota de entrega")
-                                st.success("Pedido pronto e enviado para entrega!")
-                            else:
-                                atualizar_status(pedido["id"], "Pronto")
-                                st.success("Pedido pronto para retirada ou consumo local!")
+                            # Entregas também param em Pronto: saem pelo lote que o entregador pega
+                            atualizar_status(pedido["id"], "Pronto")
                             st.rerun()
 
+                    elif status_atual == "Pronto" and pedido["tipo_pedido"] == "Entrega":
+                        st.info("Pronto — aguardando um entregador pegar o lote.")
                     elif status_atual in ["Pronto", "Em rota de entrega"]:
                         st.info("Aguardando entrega ou retirada.")
 
 # Rodapé
 st.markdown("---")
 st.caption("🕒 Atualize a página para ver novos pedidos chegando em tempo real.")
+
+fim_pagina()
@@ -1,30 +1,19 @@
 # pages/dashboard.py
 import streamlit as st
-import json
 import os
 from datetime import datetime
 import time
 
-PEDIDOS_FILE = "pedidos.json"
-
-# ---------------------------
-# Funções auxiliares
-# ---------------------------
-def carregar_pedidos():
-    if not os.path.exists(PEDIDOS_FILE):
-        with open(PEDIDOS_FILE, "w", encoding="utf-8") as f:
-            json.dump([], f)
-        return []
-    with open(PEDIDOS_FILE, "r", encoding="utf-8") as f:
-        try:
-            return json.load(f)
-        except:
-            return []
+import instrumentacao
+import metricas
+import sla
+from pedidos_db import buscar_pedido, carregar_pedidos
 
 # ---------------------------
 # Interface principal
 # ---------------------------
 st.set_page_config(page_title="📊 Dashboard - POS-80", layout="wide")
+fim_pagina = instrumentacao.iniciar("pagina.dashboard")  # só execuções completas (st.stop/st.rerun interrompem)
 st.title("📊 Dashboard - Acompanhamento de Pedidos")
 st.caption("Visualize o status dos pedidos em tempo real.")
 
@@ -35,18 +24,16 @@ if st.sidebar.button("🔁 Atualizar agora"):
     st.rerun()
 
 # ---------------------------
-# Carregar e exibir pedidos
+# Contadores (mantidos a cada gravação de pedido)
 # ---------------------------
-pedidos = carregar_pedidos()
-if not pedidos:
+m = metricas.carregar()
+if m is None:
+    m = metricas.reconstruir(carregar_pedidos())
+if not m["total_pedidos"]:
     st.warning("Nenhum pedido registrado ainda.")
     st.stop()
 
-# Estatísticas por status
-status_counts = {}
-for p in pedidos:
-    s = p.get("status", "Desconhecido")
-    status_counts[s] = status_counts.get(s, 0) + 1
+status_counts = m["por_status"]
 
 # Indicadores principais
 col1, col2, col3, col4, col5 = st.columns(5)
@@ -56,8 +43,42 @@ col3.metric("✅ Pronto", status_counts.get("Pronto", 0))
 col4.metric("🚗 Em rota", status_counts.get("Em rota de entrega", 0))
 col5.metric("📬 Entregue", status_counts.get("Entregue", 0))
 
+col1, col2 = st.columns([1, 3])
+col1.metric("💰 Receita hoje", f"R$ {metricas.receita_hoje(m):.2f}")
+with col2:
+    pagamentos = m["por_pagamento"]
+    cols_pg = st.columns(max(len(pagamentos), 1))
+    for col, (forma, valores) in zip(cols_pg, sorted(pagamentos.items())):
+        col.metric(f"💳 {forma}", valores["qtd"], help=f"R$ {valores['total']:.2f}")
+
+# ---------------------------
+# Tempos por etapa (p50 / p95)
+# ---------------------------
+st.divider()
+st.subheader("⏱️ Tempos por etapa")
+
+def _fmt_minutos(segundos):
+    return "—" if segundos is None else f"{segundos / 60:.1f} min"
+
+cols_etapas = st.columns(len(sla.ETAPAS))
+for col, etapa in zip(cols_etapas, sla.ETAPAS):
+    p = sla.percentis(etapa)
+    col.metric(f"{sla.NOMES_ETAPAS[etapa]} (p50)", _fmt_minutos(p[0.5]))
+    col.caption(f"p95: {_fmt_minutos(p[0.95])} — {sla.amostras(etapa)} pedidos")
+
+with st.sidebar.expander("⏰ Metas de SLA (minutos)"):
+    metas = sla.carregar_config()
+    with st.form("metas_sla_form"):
+        novas_metas = {
+            status: st.number_input(status, min_value=1, value=int(meta), step=1, key=f"sla_{status}")
+            for status, meta in metas.items()
+        }
+        if st.form_submit_button("💾 Salvar metas"):
+            sla.salvar_config(novas_metas)
+            st.success("Metas atualizadas!")
+
 st.divider()
-st.subheader("📋 Detalhes dos pedidos")
+st.subheader(f"📋 Últimos {metricas.RECENTES_MAX} pedidos")
 
 # ---------------------------
 # Lógica para abrir detalhes
@@ -65,8 +86,8 @@ st.subheader("📋 Detalhes dos pedidos")
 if "pedido_detalhe" not in st.session_state:
     st.session_state["pedido_detalhe"] = None
 
-# Listar pedidos recentes
-for p in sorted(pedidos, key=lambda x: x.get("data", ""), reverse=True):
+# Listar pedidos recentes (janela limitada, já em ordem)
+for p in m["recentes"]:
     col1, col2, col3 = st.columns([2, 3, 2])
     with col1:
         st.markdown(f"### 🧾 #{p.get('codigo_rastreio')}")
@@ -82,13 +103,13 @@ for p in sorted(pedidos, key=lambda x: x.get("data", ""), reverse=True):
 
     with col3:
         if st.button("📄 Ver Detalhes", key=f"det_{p['id']}"):
-            st.session_state["pedido_detalhe"] = p
+            st.session_state["pedido_detalhe"] = p["id"]
 
 # ---------------------------
 # Exibir detalhes do pedido selecionado
 # ---------------------------
-if st.session_state["pedido_detalhe"]:
-    p = st.session_state["pedido_detalhe"]
+p = buscar_pedido(st.session_state["pedido_detalhe"]) if st.session_state["pedido_detalhe"] else None
+if p:
     st.divider()
     st.subheader(f"📦 Detalhes do Pedido #{p['codigo_rastreio']}")
     st.write(f"👤 Cliente: {p['nome']} — {p['telefone']}")
@@ -109,3 +130,5 @@ if st.session_state["pedido_detalhe"]:
     if st.button("❌ Fechar Detalhes"):
         st.session_state["pedido_detalhe"] = None
         st.rerun()
+
+fim_pagina()
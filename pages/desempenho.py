@@ -0,0 +1,112 @@
+import streamlit as st
+import pandas as pd
+
+import autenticacao
+import instrumentacao
+import perfilador
+
+# ---------------------------------------------------
+# Segurança — exige login antes de acessar a página
+# ---------------------------------------------------
+if autenticacao.sessao_valida(st.session_state, "desempenho") is None:
+    st.warning("⚠️ Acesso restrito. Faça login para continuar.")
+    st.stop()
+
+st.set_page_config(page_title="Desempenho - THE RUA", layout="wide")
+st.title("⏱️ Desempenho")
+st.caption("Tempo das operações e das páginas (todas as sessões e a API). Os percentis são estimados pelos baldes do histograma.")
+
+if st.sidebar.button("🔁 Atualizar"):
+    st.rerun()
+
+# ---------------------------------------------------
+# Perfilador (cProfile numa amostra das execuções)
+# ---------------------------------------------------
+with st.expander("🔬 Perfis das páginas"):
+    config = perfilador.carregar_config()
+    if perfilador.forcado_por_ambiente():
+        st.info(f"Ligado pela variável THE_RUA_PERFIL ({config['fracao']:.0%} das execuções); o formulário não tem efeito.")
+    with st.form("perfilador_form"):
+        ativo = st.toggle("Perfilar execuções das páginas", value=config["ativo"])
+        c1, c2, c3 = st.columns(3)
+        fracao = c1.number_input("Amostra (%)", 0.1, 100.0, float(config["fracao"] * 100), step=1.0)
+        minimo_ms = c2.number_input("Só execuções acima de (ms)", 0, 60000, int(config["minimo_ms"]), step=100)
+        maximo = c3.number_input("Perfis mantidos por página", 1, 500, int(config["max_por_pagina"]))
+        if st.form_submit_button("💾 Salvar"):
+            perfilador.salvar_config({"ativo": ativo, "fracao": fracao / 100, "minimo_ms": minimo_ms, "max_por_pagina": maximo})
+            st.rerun()
+
+    perfis = perfilador.listar()
+    if not perfis:
+        st.caption("Nenhum perfil gravado.")
+    else:
+        st.caption("Abra os .pstats com `python -m pstats`, snakeviz ou `flameprof` (gera o flame graph).")
+        pagina = st.selectbox("Página", list(perfis), format_func=lambda p: f"{p} ({len(perfis[p])})")
+        perfil = st.selectbox("Execução", perfis[pagina], format_func=lambda p: f"{p['data']} — {p['ms']} ms")
+        with open(perfil["caminho"], "rb") as f:
+            st.download_button("⬇️ Baixar .pstats", f.read(), file_name=f"{pagina}_{perfil['arquivo']}",
+                               mime="application/octet-stream")
+        ordem = st.radio("Ordenar por", ["cumulative", "tottime"], horizontal=True,
+                         format_func=lambda o: "Tempo acumulado" if o == "cumulative" else "Tempo próprio")
+        st.code(perfilador.resumo(perfil["caminho"], ordem=ordem), language="text")
+        if st.button("🧹 Apagar perfis"):
+            perfilador.limpar()
+            st.rerun()
+
+dados = instrumentacao.carregar()
+if not dados:
+    st.info("Nenhuma medição ainda. Use o sistema e volte aqui.")
+    st.stop()
+
+linhas = []
+for operacao, h in sorted(dados.items()):
+    linhas.append({
+        "Operação": operacao,
+        "Chamadas": h["contagem"],
+        "Média (ms)": round(h["soma_ms"] / h["contagem"], 2) if h["contagem"] else 0,
+        "p50 (ms)": round(instrumentacao.quantil(h, 0.50), 2),
+        "p95 (ms)": round(instrumentacao.quantil(h, 0.95), 2),
+        "p99 (ms)": round(instrumentacao.quantil(h, 0.99), 2),
+        "Máx (ms)": round(h["max_ms"], 2),
+        "Total (s)": round(h["soma_ms"] / 1000, 2),
+    })
+df = pd.DataFrame(linhas)
+
+# ---------------------------------------------------
+# Onde o tempo está indo
+# ---------------------------------------------------
+col1, col2 = st.columns(2)
+with col1:
+    st.subheader("Páginas — p95 (ms)")
+    paginas = df[df["Operação"].str.startswith("pagina.")]
+    if paginas.empty:
+        st.caption("Nenhuma página medida ainda.")
+    else:
+        st.bar_chart(paginas.set_index("Operação")["p95 (ms)"], height=300)
+with col2:
+    st.subheader("Operações — tempo total (s)")
+    operacoes = df[~df["Operação"].str.startswith("pagina.")]
+    st.bar_chart(operacoes.set_index("Operação")["Total (s)"], height=300)
+
+st.dataframe(df.sort_values("Total (s)", ascending=False), use_container_width=True, hide_index=True)
+
+# ---------------------------------------------------
+# Histograma de uma operação
+# ---------------------------------------------------
+escolhida = st.selectbox("Histograma", df["Operação"].tolist())
+h = dados[escolhida]
+rotulos = [f"≤ {limite:g} ms" for limite in instrumentacao.LIMITES_MS] + [f"> {instrumentacao.LIMITES_MS[-1]:g} ms"]
+st.bar_chart(pd.DataFrame({"Chamadas": h["baldes"]}, index=rotulos), height=250)
+
+# ---------------------------------------------------
+# Exportação e limpeza
+# ---------------------------------------------------
+col1, col2 = st.columns(2)
+with col1:
+    st.download_button("⬇️ Exportar (Prometheus)", instrumentacao.prometheus(dados),
+                       file_name="the_rua_metrics.txt", mime="text/plain")
+    st.caption("A API também expõe em GET /metrics (acesso local ou com token).")
+with col2:
+    if st.button("🧹 Zerar medições"):
+        instrumentacao.limpar()
+        st.rerun()
@@ -0,0 +1,104 @@
+import streamlit as st
+
+import autenticacao
+import estoque
+import instrumentacao
+from catalogo import carregar_produtos
+
+# ---------------------------------------------------
+# Segurança — exige login antes de acessar a página
+# ---------------------------------------------------
+if autenticacao.sessao_valida(st.session_state, "estoque") is None:
+    st.warning("⚠️ Acesso restrito. Faça login para continuar.")
+    st.stop()
+
+st.set_page_config(page_title="Estoque - THE RUA", layout="wide")
+fim_pagina = instrumentacao.iniciar("pagina.estoque")  # só execuções completas (st.stop/st.rerun interrompem)
+st.title("📦 Estoque de Ingredientes")
+st.caption("A cada pedido os ingredientes da receita saem do estoque; produtos sem ingrediente ficam esgotados no cardápio.")
+
+receitas = estoque.carregar_receitas()
+saldos = estoque.saldos()
+
+# ---------------------------------------------------
+# Alertas e saldos
+# ---------------------------------------------------
+for nome, saldo, minimo in estoque.abaixo_do_minimo():
+    st.error(f"⚠️ {nome}: {saldo:g} (mínimo {minimo:g})")
+
+if receitas["ingredientes"]:
+    st.dataframe(
+        [
+            {
+                "Ingrediente": nome,
+                "Saldo": saldos.get(nome, 0),
+                "Unidade": info.get("unidade", "un"),
+                "Mínimo": info.get("minimo", 0),
+            }
+            for nome, info in sorted(receitas["ingredientes"].items())
+        ],
+        use_container_width=True,
+        hide_index=True,
+    )
+else:
+    st.info("Nenhum ingrediente cadastrado ainda.")
+
+col1, col2 = st.columns(2)
+
+# ---------------------------------------------------
+# Ingredientes: cadastro, entrada e contagem
+# ---------------------------------------------------
+with col1:
+    with st.form("ingrediente_form"):
+        st.subheader("🆕 Ingrediente")
+        nome = st.text_input("Nome (ex: Pão brioche)")
+        unidade = st.text_input("Unidade", "un")
+        minimo = st.number_input("Estoque mínimo (alerta)", min_value=0.0, step=1.0)
+        if st.form_submit_button("💾 Salvar ingrediente") and nome.strip():
+            receitas["ingredientes"][nome.strip()] = {"unidade": unidade.strip() or "un", "minimo": minimo}
+            estoque.salvar_receitas(receitas)
+            st.rerun()
+
+    if receitas["ingredientes"]:
+        with st.form("movimento_form"):
+            st.subheader("🚚 Entrada / contagem")
+            ingrediente = st.selectbox("Ingrediente", sorted(receitas["ingredientes"]))
+            quantidade = st.number_input("Quantidade", min_value=0.0, step=1.0)
+            tipo = st.radio("Tipo", ["Entrada (somar)", "Contagem (substituir saldo)"], horizontal=True)
+            if st.form_submit_button("Registrar"):
+                if tipo.startswith("Entrada"):
+                    estoque.entrada(ingrediente, quantidade)
+                else:
+                    estoque.ajustar(ingrediente, quantidade)
+                st.rerun()
+
+# ---------------------------------------------------
+# Receitas por produto
+# ---------------------------------------------------
+with col2:
+    st.subheader("🍔 Receitas")
+    produtos = carregar_produtos()
+    if not produtos or not receitas["ingredientes"]:
+        st.caption("Cadastre produtos e ingredientes para montar as receitas.")
+    else:
+        produto = st.selectbox("Produto", produtos, format_func=lambda p: p["nome"])
+        receita = receitas["produtos"].get(str(produto["id"]), {})
+        with st.form(f"receita_{produto['id']}"):
+            nova = {}
+            for ing in sorted(receitas["ingredientes"]):
+                qtd = st.number_input(
+                    f"{ing} ({receitas['ingredientes'][ing].get('unidade', 'un')})",
+                    min_value=0.0, step=1.0, value=float(receita.get(ing, 0)), key=f"rec_{produto['id']}_{ing}",
+                )
+                if qtd > 0:
+                    nova[ing] = qtd
+            if st.form_submit_button("💾 Salvar receita"):
+                if nova:
+                    receitas["produtos"][str(produto["id"])] = nova
+                else:
+                    receitas["produtos"].pop(str(produto["id"]), None)
+                estoque.salvar_receitas(receitas)
+                st.success("Receita salva.")
+                st.rerun()
+
+fim_pagina()
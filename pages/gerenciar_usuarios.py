@@ -1,22 +1,36 @@
 import streamlit as st
 
-if "logado" not in st.session_state or not st.session_state["logado"]:
-    st.warning("⚠️ Acesso restrito. Faça login para continuar.")
-    st.stop()
+import autenticacao
 
-if "logado" not in st.session_state or not st.session_state["logado"]:
+if autenticacao.sessao_valida(st.session_state, "gerenciar_usuarios") is None:
     st.warning("⚠️ Acesso restrito. Faça login para continuar.")
     st.stop()
 
 st.title("Gerenciar Usuários")
+st.caption("Senhas guardadas só como hash. Mudar a senha ou o papel encerra as sessões abertas daquele usuário.")
+
+usuarios = autenticacao.listar_usuarios()
+st.dataframe(usuarios, use_container_width=True, hide_index=True)
 
-usuario = st.text_input("Usuário")
-senha = st.text_input("Senha", type="password")
-nivel = st.selectbox("Nível", ["admin", "atendente"])
+with st.form("usuario_form"):
+    usuario = st.text_input("Usuário")
+    nome = st.text_input("Nome")
+    senha = st.text_input("Senha (em branco mantém a atual)", type="password")
+    papel = st.selectbox("Papel", autenticacao.PAPEIS)
+    if st.form_submit_button("Salvar Usuário"):
+        try:
+            salvo = autenticacao.salvar_usuario(usuario, nome, papel, senha or None)
+        except autenticacao.UsuarioInvalido as e:
+            st.error(str(e))
+        else:
+            st.success(f"Usuário {salvo['usuario']} salvo.")
+            st.rerun()
 
-if st.button("Cadastrar Usuário"):
-    if usuario and senha:
-        # Salvar no banco/json
-        st.success(f"Usuário {usuario} cadastrado.")
+removido = st.selectbox("Remover usuário", [""] + [u["usuario"] for u in usuarios])
+if removido and st.button("🗑️ Remover"):
+    try:
+        autenticacao.remover_usuario(removido)
+    except autenticacao.UsuarioInvalido as e:
+        st.error(str(e))
     else:
-        st.error("Preencha todos os campos.")
+        st.rerun()
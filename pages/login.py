@@ -1,25 +1,24 @@
 import streamlit as st
 
-if "logado" not in st.session_state or not st.session_state["logado"]:
-    st.warning("⚠️ Acesso restrito. Faça login para continuar.")
-    st.stop()\
+import autenticacao
 
 st.title("THE RUA")
 
+if autenticacao.sessao_valida(st.session_state):
+    st.success(f"Conectado como {st.session_state['nome']} ({st.session_state['papel']}).")
+    if st.button("Sair"):
+        autenticacao.encerrar_sessao(st.session_state)
+        st.rerun()
+    st.stop()
+
 usuario = st.text_input("Usuário")
 senha = st.text_input("Senha", type="password")
 
 if st.button("Entrar"):
-    # Simples validação (expanda com banco ou JSON)
-    if usuario == "admin" and senha == "admin123":
-        st.session_state["logado"] = True
-        st.session_state["usuario"] = usuario
-        st.session_state["nivel"] = "admin"
-        st.experimental_rerun()
-    elif usuario == "atendente" and senha == "atendente123":
-        st.session_state["logado"] = True
-        st.session_state["usuario"] = usuario
-        st.session_state["nivel"] = "atendente"
-        st.experimental_rerun()
+    # Usuários de usuarios.json (senha com hash); a sessão recebe um token assinado
+    dados = autenticacao.autenticar(usuario, senha)
+    if dados:
+        autenticacao.iniciar_sessao(st.session_state, dados)
+        st.rerun()
     else:
         st.error("Usuário ou senha inválidos")
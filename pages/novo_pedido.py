@@ -1,6 +1,8 @@
 import streamlit as st
 
-if "logado" not in st.session_state or not st.session_state["logado"]:
+import autenticacao
+
+if autenticacao.sessao_valida(st.session_state, "novo_pedido") is None:
     st.warning("⚠️ Acesso restrito. Faça login para continuar.")
     st.stop()
 
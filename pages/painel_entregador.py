@@ -1,96 +1,129 @@
 import streamlit as st
-import json
-import os
-from datetime import datetime
+from urllib.parse import quote
 
-if "logado" not in st.session_state or not st.session_state["logado"]:
+import autenticacao
+import despacho
+import instrumentacao
+from pedidos_db import entregas_do_entregador, entregas_em_rota, entregas_prontas
+
+if autenticacao.sessao_valida(st.session_state, "painel_entregador") is None:
     st.warning("⚠️ Acesso restrito. Faça login para continuar.")
     st.stop()
 
-DATA_FILE = "pedidos.json"
-
-# ============================
-# Funções auxiliares
-# ============================
-def carregar_pedidos():
-    if not os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "w", encoding="utf-8") as f:
-            json.dump([], f)
-    with open(DATA_FILE, "r", encoding="utf-8") as f:
-        try:
-            return json.load(f)
-        except:
-            return []
-
-def salvar_pedidos(pedidos):
-    with open(DATA_FILE, "w", encoding="utf-8") as f:
-        json.dump(pedidos, f, indent=4, ensure_ascii=False)
-
-def atualizar_status(pedido_id, novo_status):
-    pedidos = carregar_pedidos()
-    for p in pedidos:
-        if str(p.get("id")) == str(pedido_id):
-            p["status"] = novo_status
-            salvar_pedidos(pedidos)
-            return True
-    return False
-
 # ============================
 # Interface do Entregador
 # ============================
 st.set_page_config(page_title="Entregador - POS-80", layout="wide")
+fim_pagina = instrumentacao.iniciar("pagina.entregador")  # só execuções completas (st.stop/st.rerun interrompem)
 st.title("🚚 Painel do Entregador")
-st.caption("Visualize e confirme as entregas dos pedidos prontos para envio.")
-
-pedidos = carregar_pedidos()
-if not pedidos:
-    st.info("Nenhum pedido disponível para entrega no momento.")
-else:
-    # Filtrar pedidos prontos para entrega ou em rota
-    pedidos_entrega = [p for p in pedidos if p.get("status") in ["Em rota de entrega", "Pronto"] and p.get("tipo_pedido") == "Entrega"]
-
-    if not pedidos_entrega:
-        st.info("Nenhum pedido para entrega no momento.")
-    else:
-        for pedido in pedidos_entrega:
-            with st.container():
-                st.markdown("---")
-                col1, col2, col3 = st.columns([3, 2, 2])
+st.caption("Pegue lotes de entregas próximas, siga a ordem da rota e confirme cada entrega. Loja, zonas e taxas ficam na Administração.")
+
+
+def link_rota(pedidos):
+    """Rota no Google Maps com as paradas na ordem do lote."""
+    return "https://www.google.com/maps/dir/" + "/".join(quote(p["endereco"]) for p in pedidos)
+
+
+def mostrar_pedido(pedido, parada=None):
+    prefixo = f"{parada}. " if parada else ""
+    st.markdown(f"**{prefixo}#{pedido['codigo_rastreio']} — {pedido['nome']}** · 📞 {pedido['telefone']}")
+    st.write(f"🏠 {pedido['endereco']} · 💵 R$ {pedido['total']:.2f} ({pedido.get('pagamento', '')})")
+    itens = ", ".join(f"{i['quantidade']}x {i['nome']}" for i in pedido["produtos"])
+    st.caption(f"🍔 {itens}" + (f" · 📝 {pedido['observacoes']}" if pedido.get("observacoes") else ""))
 
-                with col1:
-                    st.subheader(f"📦 Pedido #{pedido['codigo_rastreio']}")
-                    st.write(f"👤 Cliente: **{pedido['nome']}**")
-                    st.write(f"📞 {pedido['telefone']}")
-                    st.write(f"🏠 Endereço: {pedido['endereco']}")
-                    st.write(f"💵 Total: R$ {pedido['total']:.2f}")
-                    if pedido.get("observacoes"):
-                        st.caption(f"📝 Obs: {pedido['observacoes']}")
 
+# O entregador é o usuário logado: cada tela lê só a própria fila (índice em pedidos_db)
+entregador = st.session_state.get("usuario", "")
+nome_entregador = st.session_state.get("nome", entregador)
+prontos = entregas_prontas()
+minhas = entregas_do_entregador(entregador)
+em_rota = entregas_em_rota()
+
+aba_lotes, aba_minhas, aba_todos = st.tabs([
+    f"📦 Prontos ({len(prontos)})", f"🛵 Minhas entregas ({len(minhas)})",
+    f"👥 Em rota ({sum(em_rota.values())})",
+])
+
+# ---------------------------------------------------
+# Lotes sugeridos para sair
+# ---------------------------------------------------
+with aba_lotes:
+    if not prontos:
+        st.info("Nenhum pedido pronto para entrega no momento.")
+    for n, lote in enumerate(despacho.montar_lotes(prontos), start=1):
+        with st.container(border=True):
+            km = f" · ~{lote['km']:.1f} km" if lote["km"] is not None else " · 📍 endereço sem localização"
+            st.subheader(f"Lote {n} — {len(lote['pedidos'])} entrega(s){km}")
+            for parada, pedido in enumerate(lote["pedidos"], start=1):
+                mostrar_pedido(pedido, parada)
+            col1, col2 = st.columns([1, 3])
+            with col1:
+                ids = [p["id"] for p in lote["pedidos"]]
+                if st.button("🚚 Pegar o lote", key=f"lote_{'_'.join(ids)}", disabled=not entregador):
+                    _, saiu = despacho.despachar(lote["pedidos"], entregador, nome_entregador)
+                    if len(saiu) < len(ids):
+                        st.session_state["aviso_despacho"] = (
+                            f"{len(ids) - len(saiu)} pedido(s) do lote já tinham sido pegos ou mudaram; saíram {len(saiu)}."
+                        )
+                    st.rerun()
+            with col2:
+                st.link_button("🗺️ Ver rota", link_rota(lote["pedidos"]))
+    if "aviso_despacho" in st.session_state:
+        st.warning(st.session_state.pop("aviso_despacho"))
+
+
+def mostrar_fila(fila, chave):
+    """Entregas em rota agrupadas por lote, com confirmação por parada ou do lote todo."""
+    lotes = {}
+    for p in fila:
+        lotes.setdefault(p.get("lote_id") or f"avulso-{p['id']}", []).append(p)
+    for lote_id, grupo in lotes.items():
+        with st.container(border=True):
+            st.markdown(f"**Lote {lote_id}** — {len(grupo)} entrega(s) restante(s)")
+            for pedido in grupo:
+                col1, col2 = st.columns([4, 1])
+                with col1:
+                    mostrar_pedido(pedido, pedido.get("parada"))
                 with col2:
-                    st.markdown("#### Itens do Pedido")
-                    for item in pedido["produtos"]:
-                        st.markdown(f"- {item['quantidade']}x {item['nome']} (R$ {item['preco']:.2f})")
-
-                with col3:
-                    st.markdown("#### Ações")
-                    status_atual = pedido.get("status", "Pronto")
-                    st.write(f"🟢 **Status atual:** {status_atual}")
-
-                    if status_atual == "Pronto":
-                        if st.button(f"🚚 Iniciar Entrega #{pedido['codigo_rastreio']}", key=f"iniciar_{pedido['id']}"):
-                            atualizar_status(pedido["id"], "Em rota de entrega")
-                            st.success("Entrega iniciada!")
-                            st.rerun()
-
-                    elif status_atual == "Em rota de entrega":
-                        if st.button(f"✅ Confirmar Entrega #{pedido['codigo_rastreio']}", key=f"confirma_{pedido['id']}"):
-                            atualizar_status(pedido["id"], "Entregue")
-                            st.success("Pedido entregue com sucesso!")
-                            st.rerun()
-
-                    elif status_atual == "Entregue":
-                        st.info("✅ Entrega concluída.")
-
-# Rodapé
-st.markdown("---")
-st.caption("🔄 Atualize a página para ver novos pedidos prontos para entrega.")
+                    if st.button("✅ Entregue", key=f"{chave}_confirma_{pedido['id']}"):
+                        despacho.confirmar_entregas([pedido], entregador)
+                        st.rerun()
+            col1, col2 = st.columns([1, 3])
+            with col1:
+                if len(grupo) > 1 and st.button("✅ Confirmar todas", key=f"{chave}_todas_{lote_id}"):
+                    despacho.confirmar_entregas(grupo, entregador)
+                    st.rerun()
+            with col2:
+                st.link_button("🗺️ Rota", link_rota(grupo))
+
+
+# ---------------------------------------------------
+# Fila do entregador logado
+# ---------------------------------------------------
+with aba_minhas:
+    if not minhas:
+        st.info("Você não tem entregas em rota. Pegue um lote na aba Prontos.")
+    mostrar_fila(minhas, "minhas")
+
+# ---------------------------------------------------
+# Visão geral (sem carregar as filas dos outros)
+# ---------------------------------------------------
+with aba_todos:
+    if not em_rota:
+        st.info("Nenhuma entrega em rota.")
+    for quem, quantidade in sorted(em_rota.items()):
+        st.write(f"🛵 **{quem or 'Sem entregador'}** — {quantidade} entrega(s)")
+    sem_dono = entregas_do_entregador("")
+    if sem_dono:
+        st.caption("Entregas em rota sem entregador (anteriores à atribuição): assuma para confirmar.")
+    for pedido in sem_dono:
+        col1, col2 = st.columns([4, 1])
+        with col1:
+            mostrar_pedido(pedido)
+        with col2:
+            if st.button("🙋 Assumir", key=f"assumir_{pedido['id']}", disabled=not entregador):
+                if not despacho.assumir([pedido], entregador, nome_entregador):
+                    st.session_state["aviso_despacho"] = "Outro entregador assumiu essa entrega antes."
+                st.rerun()
+
+fim_pagina()
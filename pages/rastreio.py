@@ -1,26 +1,17 @@
 import streamlit as st
-import json
-import os
 
-DATA_FILE = "pedidos.json"
-
-def carregar_pedidos():
-    if not os.path.exists(DATA_FILE):
-        return []
-    with open(DATA_FILE, "r", encoding="utf-8") as f:
-        try:
-            return json.load(f)
-        except:
-            return []
+import eta
+import instrumentacao
+from pedidos_db import buscar_por_codigo
 
 st.set_page_config(page_title="Rastrear Pedido", layout="wide")
+fim_pagina = instrumentacao.iniciar("pagina.rastreio")  # só execuções completas (st.stop/st.rerun interrompem)
 st.title("📍 Rastrear Pedido")
 
 codigo = st.text_input("Digite o código de rastreio do seu pedido")
 
 if st.button("Buscar Pedido"):
-    pedidos = carregar_pedidos()
-    pedido = next((p for p in pedidos if str(p.get("codigo_rastreio")) == str(codigo)), None)
+    pedido = buscar_por_codigo(codigo)
 
     if not pedido:
         st.error("Pedido não encontrado. Verifique o código e tente novamente.")
@@ -40,9 +31,19 @@ if st.button("Buscar Pedido"):
         st.progress(status_etapas.index(status) / (len(status_etapas) - 1))
         st.markdown(f"### 🚚 Status atual: **{status}**")
 
+        # Previsão baseada na fila da cozinha
+        if status != "Entregue":
+            previsao = eta.estimar(pedido)
+            if previsao["minutos"] > 0:
+                destino = "entrega" if pedido["tipo_pedido"] == "Entrega" else "ficar pronto"
+                st.metric(f"⏳ Previsão para {destino}", f"~{previsao['minutos']} min", help=f"Por volta das {previsao['previsao']}")
+                st.caption(f"👨‍🍳 {previsao['fila']} pedido(s) em preparo na cozinha agora.")
+
         # Histórico
         st.markdown("#### Itens do pedido:")
         for item in pedido["produtos"]:
             st.markdown(f"- {item['quantidade']}x {item['nome']} — R$ {item['preco'] * item['quantidade']:.2f}")
 
         st.info("Acompanhe aqui o andamento do seu pedido em tempo real.")
+
+fim_pagina()
@@ -1,35 +1,22 @@
 import streamlit as st
-import json
-import os
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, timedelta
+
+import autenticacao
+import instrumentacao
+import retencao
 
 # ---------------------------------------------------
 # Segurança — exige login antes de acessar a página
 # ---------------------------------------------------
-if "logado" not in st.session_state or not st.session_state["logado"]:
+if autenticacao.sessao_valida(st.session_state, "relatorios") is None:
     st.warning("⚠️ Acesso restrito. Faça login para continuar.")
     st.stop()
 
-# ---------------------------------------------------
-# Caminhos e arquivos
-# ---------------------------------------------------
-DATA_FILE = "pedidos.json"
-
 # ---------------------------------------------------
 # Funções auxiliares
 # ---------------------------------------------------
-def carregar_pedidos():
-    """Carrega os pedidos do arquivo JSON"""
-    if not os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "w", encoding="utf-8") as f:
-            json.dump([], f)
-    with open(DATA_FILE, "r", encoding="utf-8") as f:
-        try:
-            return json.load(f)
-        except Exception:
-            return []
-
+@instrumentacao.medir("relatorios.gerar_dataframe")
 def gerar_dataframe(pedidos):
     """Transforma pedidos em DataFrame pandas"""
     if not pedidos:
@@ -59,30 +46,28 @@ def gerar_dataframe(pedidos):
 # Interface principal
 # ---------------------------------------------------
 st.set_page_config(page_title="📊 Relatórios - THE RUA", layout="wide")
+fim_pagina = instrumentacao.iniciar("pagina.relatorios")  # só execuções completas (st.stop/st.rerun interrompem)
 st.title("📊 Relatórios de Vendas - THE RUA")
 st.caption("Acompanhe o desempenho da sua hamburgueria em tempo real.")
 
-pedidos = carregar_pedidos()
-df = gerar_dataframe(pedidos)
-
-if df.empty:
-    st.info("Nenhum pedido registrado ainda.")
-    st.stop()
-
 # ---------------------------------------------------
 # Filtros de período e status
 # ---------------------------------------------------
+# Pedidos antigos ficam nos arquivos mensais: só os meses do período são lidos
+hoje = datetime.now().date()
 col1, col2, col3 = st.columns(3)
 with col1:
-    data_inicio = st.date_input(
-        "De:",
-        value=df["Data"].min().date() if not df.empty else datetime.now().date()
-    )
+    data_inicio = st.date_input("De:", value=hoje - timedelta(days=30))
 with col2:
-    data_fim = st.date_input(
-        "Até:",
-        value=df["Data"].max().date() if not df.empty else datetime.now().date()
-    )
+    data_fim = st.date_input("Até:", value=hoje)
+
+pedidos = retencao.carregar_historico(data_inicio, data_fim)
+df = gerar_dataframe(pedidos)
+
+if df.empty:
+    st.info("Nenhum pedido registrado no período.")
+    st.stop()
+
 with col3:
     status_filtro = st.selectbox(
         "Status do Pedido:",
@@ -165,3 +150,5 @@ st.download_button(
 )
 
 st.success("✅ Relatório pronto para análise!")
+
+fim_pagina()
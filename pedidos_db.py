@@ -0,0 +1,332 @@
+# pedidos_db.py — Armazenamento central dos pedidos (pedidos.json)
+import time
+from datetime import datetime
+
+import clientes
+import estoque
+import eta
+import eventos
+import metricas
+import caixas
+import sla
+from armazenamento import ler_json, gravar_json, mtime, trava
+from instrumentacao import medir
+
+PEDIDOS_FILE = "pedidos.json"
+IDEMPOTENCIA_FILE = "idempotencia.json"
+JANELA_IDEMPOTENCIA = 30 * 60  # segundos em que uma chave repetida devolve o mesmo pedido
+
+STATUS = ["Aguardando aceite", "Em preparo", "Pronto", "Em rota de entrega", "Entregue"]
+TRANSICOES = {
+    "Aguardando aceite": ["Em preparo"],
+    "Em preparo": ["Pronto"],  # entregas saem para a rua só pelo despacho (Pronto -> lote)
+    "Pronto": ["Em rota de entrega", "Entregue"],
+    "Em rota de entrega": ["Entregue"],
+    "Entregue": [],
+}
+
+# Cache em memória: só relê o arquivo quando ele muda no disco
+_cache = {"assinatura": None, "pedidos": [], "por_id": {}, "por_codigo": {}, "prontas": [], "por_entregador": {}}
+
+
+def _indexar(pedidos):
+    _cache["pedidos"] = pedidos
+    _cache["por_id"] = {str(p.get("id")): p for p in pedidos}
+    # Em códigos repetidos vale o pedido mais recente (a lista está em ordem de criação)
+    _cache["por_codigo"] = {str(p.get("codigo_rastreio")): p for p in pedidos}
+    # Filas de entrega: prontas para sair e em rota por entregador ("" = sem dono)
+    prontas, por_entregador = [], {}
+    for p in pedidos:
+        if p.get("tipo_pedido") != "Entrega":
+            continue
+        if p.get("status") == "Pronto" and not p.get("entregador"):
+            prontas.append(p)
+        elif p.get("status") == "Em rota de entrega":
+            por_entregador.setdefault(p.get("entregador") or "", []).append(p)
+    for fila in por_entregador.values():
+        fila.sort(key=lambda p: (p.get("lote_id") or "", p.get("parada", 0)))
+    _cache["prontas"] = prontas
+    _cache["por_entregador"] = por_entregador
+    _cache["assinatura"] = mtime(PEDIDOS_FILE)
+
+
+def _ler():
+    if mtime(PEDIDOS_FILE) != _cache["assinatura"]:
+        _indexar(ler_json(PEDIDOS_FILE, []))
+    return _cache["pedidos"]
+
+
+def _gravar(pedidos):
+    try:
+        gravar_json(PEDIDOS_FILE, pedidos)
+    finally:
+        _cache["assinatura"] = None
+    _indexar(pedidos)
+
+
+# ----------------------------
+# Leitura
+# ----------------------------
+def carregar_pedidos():
+    """Lista de pedidos (compartilhada com o cache — não altere os dicts)."""
+    return _ler()
+
+
+def buscar_pedido(pedido_id):
+    _ler()
+    return _cache["por_id"].get(str(pedido_id))
+
+
+def buscar_por_codigo(codigo):
+    _ler()
+    return _cache["por_codigo"].get(str(codigo).strip())
+
+
+def entregas_prontas():
+    """Entregas prontas que nenhum entregador pegou ainda."""
+    _ler()
+    return _cache["prontas"]
+
+
+def entregas_do_entregador(entregador):
+    """Fila do entregador (em rota), pela ordem do lote; "" devolve as sem dono."""
+    _ler()
+    return _cache["por_entregador"].get(entregador, [])
+
+
+def entregas_em_rota():
+    """{entregador: quantidade em rota}"""
+    _ler()
+    return {e: len(fila) for e, fila in _cache["por_entregador"].items()}
+
+
+def codigos_em_uso():
+    """Códigos de rastreio de pedidos ainda não entregues."""
+    _ler()
+    return {c for c, p in _cache["por_codigo"].items() if p.get("status") != "Entregue"}
+
+
+def transicao_valida(status_atual, novo_status):
+    return novo_status in TRANSICOES.get(status_atual, [])
+
+
+# ----------------------------
+# Escrita
+# ----------------------------
+def salvar_pedidos(pedidos):
+    with trava(PEDIDOS_FILE):
+        _gravar(pedidos)
+
+
+def _semear_historico(p):
+    """Pedidos antigos não têm histórico: usa a data de criação quando possível."""
+    if p.get("historico"):
+        return
+    historico = []
+    if p.get("status", "Aguardando aceite") == "Aguardando aceite" and p.get("data"):
+        try:
+            ts = datetime.strptime(p["data"], "%Y-%m-%d %H:%M:%S").timestamp()
+            historico.append({"status": "Aguardando aceite", "ts": ts, "data": p["data"]})
+        except ValueError:
+            pass
+    p["historico"] = historico
+
+
+def _chaves_validas(agora):
+    chaves = ler_json(IDEMPOTENCIA_FILE, {})
+    return {c: v for c, v in chaves.items() if agora - v["ts"] < JANELA_IDEMPOTENCIA}
+
+
+def pedido_por_chave(chave_idempotencia):
+    """Pedido já criado com esta chave dentro da janela (None se não houver)."""
+    if not chave_idempotencia:
+        return None
+    registro = _chaves_validas(time.time()).get(str(chave_idempotencia))
+    return buscar_pedido(registro["pedido_id"]) if registro else None
+
+
+@medir("pedidos.adicionar")
+def adicionar_pedido(pedido, chave_idempotencia=None):
+    """Grava um pedido novo; devolve (pedido, criado).
+
+    Com `chave_idempotencia`, repetições dentro da janela devolvem o pedido
+    original com criado=False, sem gravar nada nem disparar efeitos.
+    """
+    pedido.setdefault("status", "Aguardando aceite")
+    pedido["historico"] = [sla.novo_evento(pedido["status"])]
+    pedido["versao"] = 1
+    with trava(PEDIDOS_FILE):
+        pedidos = _ler()
+        if chave_idempotencia:
+            agora = time.time()
+            chaves = _chaves_validas(agora)
+            registro = chaves.get(str(chave_idempotencia))
+            existente = _cache["por_id"].get(registro["pedido_id"]) if registro else None
+            if existente is not None:
+                return existente, False
+        # IDs vêm de time.time(): dois pedidos no mesmo segundo não podem colidir
+        while str(pedido.get("id")) in _cache["por_id"]:
+            pedido["id"] = str(int(pedido["id"]) + 1)
+        pedidos.append(pedido)
+        _gravar(pedidos)
+        if chave_idempotencia:
+            chaves[str(chave_idempotencia)] = {"pedido_id": str(pedido["id"]), "ts": agora}
+            gravar_json(IDEMPOTENCIA_FILE, chaves)
+    metricas.registrar("criado", pedido)
+    eventos.publicar("pedido_criado", pedido)
+    return pedido, True
+
+
+def _atribuir_caixa(p, caixa_id):
+    """Vincula o pedido ao caixa (e turno) que o aceitou; devolve True se vinculou."""
+    if p.get("caixa_id"):
+        return False
+    caixa_id = caixa_id or caixas.caixa_padrao()
+    turno = caixas.turno_atual(caixa_id) if caixa_id else None
+    if turno is None:
+        return False
+    p["caixa_id"] = caixa_id
+    p["turno_id"] = turno["id"]
+    return True
+
+
+@medir("pedidos.atualizar_status")
+def atualizar_status(pedido_id, novo_status, caixa_id=None):
+    """Muda o status e registra o evento no histórico do pedido.
+
+    A transição é conferida sob a trava, contra o status gravado: dois
+    cliques (ou duas requisições) na mesma mudança aplicam só a primeira.
+    Devolve False se o pedido não existe ou a transição não vale mais.
+    Ao sair de 'Aguardando aceite' o pedido entra no livro-caixa do caixa que
+    o aceitou (`caixa_id`) ou, se aceito pela cozinha, do primeiro caixa aberto.
+    """
+    with trava(PEDIDOS_FILE):
+        pedidos = _ler()
+        p = _cache["por_id"].get(str(pedido_id))
+        if p is None or not transicao_valida(p.get("status"), novo_status):
+            return False
+        mudanca = _mudar_status(p, novo_status, caixa_id)
+        _gravar(pedidos)
+    _efeitos_status(*mudanca)
+    return True
+
+
+def _mudar_status(p, novo_status, caixa_id=None, campos=None):
+    """Aplica a transição no pedido (em memória); devolve o que os efeitos precisam."""
+    _semear_historico(p)
+    anterior = p.get("status")
+    atribuido = anterior == "Aguardando aceite" and _atribuir_caixa(p, caixa_id)
+    p.update(campos or {})
+    p["status"] = novo_status
+    p["historico"].append(sla.novo_evento(novo_status, p["historico"]))
+    p["versao"] = p.get("versao", 0) + 1
+    return p, anterior, atribuido
+
+
+def _efeitos_status(p, anterior, atribuido):
+    if atribuido:
+        caixas.registrar_pedido(p)
+    duracoes = sla.registrar_transicao(p)
+    eta.registrar_transicao(p, anterior, duracoes)
+    metricas.registrar("status", p, anterior)
+    eventos.publicar("status_alterado", p, anterior)
+
+
+@medir("pedidos.atualizar_status_lote")
+def atualizar_status_lote(pedido_ids, novo_status, campos=None, versoes=None):
+    """Muda vários pedidos de uma vez: uma trava e uma gravação para o lote todo.
+
+    Só muda os pedidos em que a transição é válida no momento da gravação;
+    `campos` é {pedido_id: {campo: valor}} gravado junto. Com `versoes`
+    ({pedido_id: versão vista}) é compare-and-set: quem mudou desde então
+    fica de fora. Devolve os ids mudados.
+    """
+    mudancas = []
+    with trava(PEDIDOS_FILE):
+        pedidos = _ler()
+        for pid in pedido_ids:
+            p = _cache["por_id"].get(str(pid))
+            if p is None or not transicao_valida(p.get("status"), novo_status):
+                continue
+            if versoes is not None and p.get("versao", 0) != versoes.get(str(pid)):
+                continue
+            mudancas.append(_mudar_status(p, novo_status, campos=(campos or {}).get(str(pid))))
+        if mudancas:
+            _gravar(pedidos)
+    for mudanca in mudancas:
+        _efeitos_status(*mudanca)
+    return [str(p["id"]) for p, _, _ in mudancas]
+
+
+def assumir_entregas(versoes, campos):
+    """Entregas em rota sem dono passam para um entregador (compare-and-set pela versão).
+
+    `versoes` é {pedido_id: versão vista}; `campos` ({campo: valor}) traz o
+    entregador. Quem já tem dono ou mudou desde a exibição fica de fora, sem
+    mudar o status. Devolve os ids assumidos.
+    """
+    assumidos = []
+    with trava(PEDIDOS_FILE):
+        pedidos = _ler()
+        for pid, versao in versoes.items():
+            p = _cache["por_id"].get(str(pid))
+            if (p is None or p.get("status") != "Em rota de entrega" or p.get("entregador")
+                    or p.get("versao", 0) != versao):
+                continue
+            p.update(campos)
+            p["versao"] = p.get("versao", 0) + 1
+            assumidos.append(str(p["id"]))
+        if assumidos:
+            _gravar(pedidos)
+    return assumidos
+
+
+def retirar_pedidos(condicao, guardar):
+    """Remove de pedidos.json os pedidos em que `condicao(p)` é verdadeira.
+
+    `guardar(retirados)` roda antes da remoção e sob a mesma trava (é onde o
+    arquivamento grava os pedidos); devolve a lista retirada. Os contadores
+    do painel descontam os retirados, como na exclusão.
+    """
+    with trava(PEDIDOS_FILE):
+        pedidos = _ler()
+        retirados = [p for p in pedidos if condicao(p)]
+        if retirados:
+            guardar(retirados)
+            ids = {str(p.get("id")) for p in retirados}
+            _gravar([p for p in pedidos if str(p.get("id")) not in ids])
+    metricas.registrar_varios("excluido", retirados)
+    return retirados
+
+
+def limpar():
+    """Apaga todos os pedidos e o que é derivado deles (limpeza geral do sistema).
+
+    Zera junto as chaves de idempotência, os contadores do painel, as
+    métricas de SLA, a fila de preparo da previsão e o histórico dos
+    clientes — senão eles continuariam contando pedidos que não existem mais.
+    """
+    with trava(PEDIDOS_FILE):
+        _gravar([])
+        gravar_json(IDEMPOTENCIA_FILE, {})
+    metricas.reconstruir([])
+    sla.limpar()
+    eta.limpar()
+    clientes.limpar()
+
+
+def excluir_pedido(pedido_id):
+    with trava(PEDIDOS_FILE):
+        pedidos = _ler()
+        removido = _cache["por_id"].get(str(pedido_id))
+        if removido is None:
+            return False
+        _gravar([p for p in pedidos if p is not removido])
+    if removido.get("status") == "Aguardando aceite":
+        estoque.repor_pedido(removido)  # cancelado antes do preparo: ingredientes voltam
+    eta.remover_pedido(pedido_id)
+    clientes.remover_pedido(removido)
+    metricas.registrar("excluido", removido)
+    caixas.estornar_pedido(removido)
+    eventos.publicar("pedido_excluido", removido)
+    return True
@@ -0,0 +1,139 @@
+# perfilador.py — Perfis (cProfile) de uma amostra das execuções das páginas
+#
+# Desligado por padrão. Liga pela página Desempenho (perfilador_config.json)
+# ou pela variável THE_RUA_PERFIL=<fração> — ex.: THE_RUA_PERFIL=0.1 perfila
+# 10% das execuções, e tem precedência sobre o arquivo. Cada execução
+# sorteada vira perfis/<pagina>/<data>_<ms>ms.pstats; só os mais recentes
+# de cada página ficam no disco.
+#
+# Desligado, o custo por execução é um os.stat do arquivo de configuração.
+import cProfile
+import io
+import os
+import pstats
+import random
+import shutil
+import threading
+import time
+from datetime import datetime
+
+from armazenamento import gravar_json, ler_json, mtime
+
+PERFIS_DIR = "perfis"
+PERFIL_CONFIG_FILE = "perfilador_config.json"
+PERFIL_PADRAO = {
+    "ativo": False,
+    "fracao": 0.05,         # parte das execuções perfiladas (0..1)
+    "minimo_ms": 0,         # só guarda execuções mais lentas que isso
+    "max_por_pagina": 20,   # rotação: perfis mantidos por página
+}
+PERFIL_ENV = os.environ.get("THE_RUA_PERFIL", "").strip()
+
+_config = {"assinatura": None, "valor": dict(PERFIL_PADRAO)}
+_local = threading.local()
+
+
+# ----------------------------
+# Configuração
+# ----------------------------
+def carregar_config():
+    if PERFIL_ENV:
+        try:
+            return {**PERFIL_PADRAO, "ativo": True, "fracao": min(1.0, max(0.0, float(PERFIL_ENV)))}
+        except ValueError:
+            pass
+    assinatura = mtime(PERFIL_CONFIG_FILE)
+    if assinatura != _config["assinatura"]:
+        _config["valor"] = {**PERFIL_PADRAO, **ler_json(PERFIL_CONFIG_FILE, {})}
+        _config["assinatura"] = assinatura
+    return _config["valor"]
+
+
+def salvar_config(config):
+    gravar_json(PERFIL_CONFIG_FILE, {**PERFIL_PADRAO, **config})
+
+
+def forcado_por_ambiente():
+    return bool(PERFIL_ENV)
+
+
+# ----------------------------
+# Amostragem
+# ----------------------------
+def iniciar(pagina):
+    """Sorteia esta execução; devolve a função que encerra o perfil, ou None."""
+    anterior = getattr(_local, "perfil", None)
+    if anterior is not None:
+        # A execução anterior nesta thread foi interrompida (st.stop/st.rerun)
+        anterior.disable()
+        _local.perfil = None
+    config = carregar_config()
+    if not config["ativo"] or random.random() >= config["fracao"]:
+        return None
+    perfil = cProfile.Profile()
+    try:
+        perfil.enable()
+    except ValueError:
+        return None  # outro perfil já ativo no processo (Python 3.12+ só permite um)
+    _local.perfil = perfil
+    inicio = time.perf_counter()
+
+    def encerrar(salvar=True):
+        perfil.disable()
+        _local.perfil = None
+        ms = (time.perf_counter() - inicio) * 1000
+        if salvar and ms >= config["minimo_ms"]:
+            try:
+                _salvar(pagina, perfil, ms, config["max_por_pagina"])
+            except OSError:
+                pass  # perfil nunca derruba a página
+    return encerrar
+
+
+def _salvar(pagina, perfil, ms, maximo):
+    pasta = os.path.join(PERFIS_DIR, pagina)
+    os.makedirs(pasta, exist_ok=True)
+    perfil.dump_stats(os.path.join(pasta, f"{datetime.now():%Y%m%d_%H%M%S_%f}_{ms:.0f}ms.pstats"))
+    arquivos = sorted(n for n in os.listdir(pasta) if n.endswith(".pstats"))
+    for nome in arquivos[:max(0, len(arquivos) - maximo)]:
+        try:
+            os.remove(os.path.join(pasta, nome))
+        except FileNotFoundError:
+            pass
+
+
+# ----------------------------
+# Consulta
+# ----------------------------
+def listar():
+    """{pagina: [perfis, mais recentes primeiro]}"""
+    if not os.path.isdir(PERFIS_DIR):
+        return {}
+    paginas = {}
+    for pagina in sorted(os.listdir(PERFIS_DIR)):
+        pasta = os.path.join(PERFIS_DIR, pagina)
+        if not os.path.isdir(pasta):
+            continue
+        perfis = []
+        for nome in sorted((n for n in os.listdir(pasta) if n.endswith(".pstats")), reverse=True):
+            data, hora, _, duracao = nome[:-len(".pstats")].split("_")
+            perfis.append({
+                "arquivo": nome,
+                "caminho": os.path.join(pasta, nome),
+                "data": datetime.strptime(data + hora, "%Y%m%d%H%M%S").strftime("%Y-%m-%d %H:%M:%S"),
+                "ms": int(duracao[:-2]),
+            })
+        if perfis:
+            paginas[pagina] = perfis
+    return paginas
+
+
+def resumo(caminho, linhas=25, ordem="cumulative"):
+    """Funções que mais pesaram no perfil, em texto (como o pstats imprime)."""
+    saida = io.StringIO()
+    pstats.Stats(caminho, stream=saida).strip_dirs().sort_stats(ordem).print_stats(linhas)
+    return saida.getvalue()
+
+
+def limpar():
+    shutil.rmtree(PERFIS_DIR, ignore_errors=True)
@@ -0,0 +1,186 @@
+# retencao.py — Retenção dos dados: arquiva pedidos antigos e apaga arquivos vencidos
+#
+# pedidos.json guarda só o "quente" (pedidos ativos e os entregues nas
+# últimas horas); o resto vai para arquivo/pedidos_AAAA-MM.json. Comprovantes
+# e relatórios velhos são apagados. A limpeza roda como tarefa em segundo
+# plano, agendada pelas próprias páginas quando o intervalo vence
+# (ou por cron: python retencao.py).
+import os
+import time
+from datetime import datetime, timedelta
+
+import eta
+import pedidos_db
+import tarefas
+from armazenamento import ler_json, gravar_json, trava
+
+RETENCAO_CONFIG_FILE = "retencao_config.json"
+RETENCAO_ESTADO_FILE = "retencao_estado.json"
+ARQUIVO_DIR = "arquivo"
+UPLOADS_DIR = "uploads"
+RELATORIOS_DIR = "relatorios"
+
+RETENCAO_PADRAO = {
+    "horas_quente": 48,         # entregues ficam em pedidos.json por este tempo
+    "dias_abandonados": 7,      # pedidos parados (nunca entregues) também são arquivados
+    "dias_comprovantes": 90,    # comprovantes Pix em uploads/
+    "dias_relatorios": 365,     # relatórios de fechamento em relatorios/
+    "intervalo_minutos": 60,    # de quanto em quanto tempo a limpeza roda
+}
+
+
+def carregar_config():
+    config = dict(RETENCAO_PADRAO)
+    config.update(ler_json(RETENCAO_CONFIG_FILE, {}))
+    return config
+
+
+def salvar_config(config):
+    gravar_json(RETENCAO_CONFIG_FILE, {k: config[k] for k in RETENCAO_PADRAO if k in config})
+
+
+def carregar_estado():
+    return ler_json(RETENCAO_ESTADO_FILE, {})
+
+
+# ----------------------------
+# Arquivamento dos pedidos
+# ----------------------------
+def arquivo_mes(mes):
+    return os.path.join(ARQUIVO_DIR, f"pedidos_{mes}.json")
+
+
+def _ts_data(p):
+    try:
+        return datetime.strptime(p.get("data", ""), "%Y-%m-%d %H:%M:%S").timestamp()
+    except ValueError:
+        return 0
+
+
+def _ultimo_movimento(p):
+    historico = p.get("historico") or []
+    return historico[-1]["ts"] if historico else _ts_data(p)
+
+
+def _vencido(p, config, agora):
+    if p.get("status") == "Entregue":
+        return agora - _ultimo_movimento(p) > config["horas_quente"] * 3600
+    return agora - _ts_data(p) > config["dias_abandonados"] * 86400
+
+
+def _guardar(pedidos):
+    """Acrescenta os pedidos aos arquivos mensais (sem duplicar ids já arquivados)."""
+    os.makedirs(ARQUIVO_DIR, exist_ok=True)
+    por_mes = {}
+    for p in pedidos:
+        mes = (p.get("data") or "")[:7] or "sem-data"
+        por_mes.setdefault(mes, []).append(p)
+    for mes, novos in por_mes.items():
+        caminho = arquivo_mes(mes)
+        with trava(caminho):
+            arquivados = ler_json(caminho, [])
+            ids = {str(p.get("id")) for p in arquivados}
+            arquivados.extend(p for p in novos if str(p.get("id")) not in ids)
+            gravar_json(caminho, arquivados)
+
+
+def arquivar_pedidos(config=None, agora=None):
+    """Move os pedidos vencidos de pedidos.json para o arquivo mensal; devolve quantos."""
+    config = config or carregar_config()
+    agora = agora or time.time()
+    retirados = pedidos_db.retirar_pedidos(lambda p: _vencido(p, config, agora), _guardar)
+    for p in retirados:
+        if p.get("status") != "Entregue":
+            eta.remover_pedido(p["id"])
+    return len(retirados)
+
+
+def meses_arquivados():
+    if not os.path.isdir(ARQUIVO_DIR):
+        return []
+    return sorted(n[len("pedidos_"):-len(".json")] for n in os.listdir(ARQUIVO_DIR)
+                  if n.startswith("pedidos_") and n.endswith(".json"))
+
+
+def carregar_historico(inicio, fim):
+    """Pedidos entre as datas `inicio` e `fim` (date), arquivados e ativos.
+
+    Só abre os arquivos dos meses do período.
+    """
+    meses = set()
+    dia = inicio.replace(day=1)
+    while dia <= fim:
+        meses.add(dia.strftime("%Y-%m"))
+        dia = (dia + timedelta(days=32)).replace(day=1)
+    pedidos = []
+    for mes in sorted(meses):
+        pedidos.extend(ler_json(arquivo_mes(mes), []))
+    arquivados = {str(p.get("id")) for p in pedidos}
+    pedidos.extend(p for p in pedidos_db.carregar_pedidos() if str(p.get("id")) not in arquivados)
+    de, ate = inicio.isoformat(), fim.isoformat()
+    return [p for p in pedidos if de <= (p.get("data") or "")[:10] <= ate]
+
+
+# ----------------------------
+# Arquivos vencidos
+# ----------------------------
+def _apagar_antigos(pasta, dias, agora):
+    """Apaga os arquivos (não as subpastas) de `pasta` mais velhos que `dias`."""
+    if not os.path.isdir(pasta):
+        return 0
+    apagados = 0
+    for nome in os.listdir(pasta):
+        caminho = os.path.join(pasta, nome)
+        if os.path.isfile(caminho) and agora - os.path.getmtime(caminho) > dias * 86400:
+            os.remove(caminho)
+            apagados += 1
+    return apagados
+
+
+# ----------------------------
+# Execução e agendamento
+# ----------------------------
+def executar(config=None):
+    """Roda a política completa e registra o resultado em retencao_estado.json."""
+    config = config or carregar_config()
+    agora = time.time()
+    resultado = {
+        "pedidos_arquivados": arquivar_pedidos(config, agora),
+        # uploads/produtos é uma subpasta: imagens do cardápio não são apagadas
+        "comprovantes_apagados": _apagar_antigos(UPLOADS_DIR, config["dias_comprovantes"], agora),
+        "relatorios_apagados": _apagar_antigos(RELATORIOS_DIR, config["dias_relatorios"], agora),
+        "pedidos_quentes": len(pedidos_db.carregar_pedidos()),
+    }
+    with trava(RETENCAO_ESTADO_FILE):
+        estado = carregar_estado()
+        estado.update(ultima_execucao=agora, ultima_data=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                      ultimo_resultado=resultado)
+        gravar_json(RETENCAO_ESTADO_FILE, estado)
+    return resultado
+
+
+@tarefas.executor("retencao")
+def _tarefa_retencao(dados, anexo):
+    return executar()
+
+
+def agendar(forcar=False):
+    """Enfileira a limpeza se o intervalo venceu; barato para chamar a cada página.
+
+    Devolve a tarefa enfileirada ou None.
+    """
+    intervalo = carregar_config()["intervalo_minutos"] * 60
+    agora = time.time()
+    if not forcar and agora - carregar_estado().get("agendado_em", 0) < intervalo:
+        return None
+    with trava(RETENCAO_ESTADO_FILE):
+        estado = carregar_estado()
+        if not forcar and agora - estado.get("agendado_em", 0) < intervalo:
+            return None  # outro processo agendou enquanto esperávamos a trava
+        estado["agendado_em"] = agora
+        gravar_json(RETENCAO_ESTADO_FILE, estado)
+    return tarefas.enfileirar("retencao", descricao="Retenção de dados")
+
+
+if __name__ == "__main__":
+    print(executar())
@@ -0,0 +1,182 @@
+# sla.py — Tempo de cada etapa do pedido (p50/p95) e metas de SLA
+import math
+import time
+
+from armazenamento import ler_json, gravar_json, mtime, trava
+
+SLA_METRICAS_FILE = "sla_metricas.json"
+SLA_CONFIG_FILE = "sla_config.json"
+
+# Etapa -> (status que iniciam a etapa, status que encerram a etapa)
+ETAPAS = {
+    "aceite": (("Aguardando aceite",), ("Em preparo",)),
+    "preparo": (("Em preparo",), ("Pronto", "Em rota de entrega")),
+    "entrega": (("Pronto", "Em rota de entrega"), ("Entregue",)),
+}
+NOMES_ETAPAS = {
+    "aceite": "Pedido → Aceite",
+    "preparo": "Aceite → Pronto",
+    "entrega": "Pronto → Entregue",
+}
+
+# Meta (minutos) de permanência em cada status
+SLA_PADRAO = {
+    "Aguardando aceite": 5,
+    "Em preparo": 20,
+    "Pronto": 15,
+    "Em rota de entrega": 40,
+}
+
+# Precisão relativa do sketch de quantis (2%)
+_PRECISAO = 0.02
+_GAMMA = (1 + _PRECISAO) / (1 - _PRECISAO)
+_LOG_GAMMA = math.log(_GAMMA)
+
+_cache = {"assinatura": None, "metricas": {}}
+
+
+# ----------------------------
+# Sketch de quantis (buckets logarítmicos)
+# ----------------------------
+def sketch_novo():
+    return {"n": 0, "soma": 0.0, "min": None, "max": None, "buckets": {}}
+
+
+def sketch_adicionar(sk, valor):
+    """Registra um valor (segundos) no sketch sem guardar as amostras."""
+    valor = max(float(valor), 0.001)
+    idx = str(math.ceil(math.log(valor) / _LOG_GAMMA))
+    sk["buckets"][idx] = sk["buckets"].get(idx, 0) + 1
+    sk["n"] += 1
+    sk["soma"] += valor
+    sk["min"] = valor if sk["min"] is None else min(sk["min"], valor)
+    sk["max"] = valor if sk["max"] is None else max(sk["max"], valor)
+
+
+def sketch_quantil(sk, q):
+    """Quantil aproximado (erro relativo <= 2%) percorrendo só os buckets."""
+    if not sk or not sk.get("n"):
+        return None
+    alvo = q * (sk["n"] - 1)
+    acumulado = 0
+    for idx in sorted(sk["buckets"], key=int):
+        acumulado += sk["buckets"][idx]
+        if acumulado > alvo:
+            valor = 2 * _GAMMA ** int(idx) / (_GAMMA + 1)
+            return min(max(valor, sk["min"]), sk["max"])
+    return sk["max"]
+
+
+# ----------------------------
+# Histórico de status
+# ----------------------------
+def novo_evento(status, historico=None):
+    """Evento de transição; o timestamp nunca volta no tempo dentro do pedido."""
+    agora = time.time()
+    if historico:
+        agora = max(agora, historico[-1]["ts"])
+    return {
+        "status": status,
+        "ts": agora,
+        "data": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(agora)),
+    }
+
+
+def inicio_status_atual(pedido):
+    """Timestamp em que o pedido entrou no status atual (None se desconhecido)."""
+    historico = pedido.get("historico") or []
+    if historico and historico[-1]["status"] == pedido.get("status"):
+        return historico[-1]["ts"]
+    return None
+
+
+def duracoes_concluidas(pedido):
+    """Etapas encerradas pelo último evento do pedido -> duração em segundos."""
+    historico = pedido.get("historico") or []
+    if len(historico) < 2:
+        return {}
+    ultimo = historico[-1]
+    anteriores = historico[:-1]
+    duracoes = {}
+    for etapa, (inicio, fim) in ETAPAS.items():
+        if ultimo["status"] not in fim:
+            continue
+        # Só conta a primeira vez que a etapa termina
+        if any(ev["status"] in fim for ev in anteriores):
+            continue
+        comeco = next((ev for ev in anteriores if ev["status"] in inicio), None)
+        if comeco is not None:
+            duracoes[etapa] = ultimo["ts"] - comeco["ts"]
+    return duracoes
+
+
+# ----------------------------
+# Métricas persistidas
+# ----------------------------
+def registrar_transicao(pedido):
+    """Alimenta os sketches com as etapas concluídas pela última transição."""
+    duracoes = duracoes_concluidas(pedido)
+    if not duracoes:
+        return {}
+    with trava(SLA_METRICAS_FILE):
+        metricas = ler_json(SLA_METRICAS_FILE, {})
+        for etapa, segundos in duracoes.items():
+            sketch_adicionar(metricas.setdefault(etapa, sketch_novo()), segundos)
+        gravar_json(SLA_METRICAS_FILE, metricas)
+    return duracoes
+
+
+def limpar():
+    with trava(SLA_METRICAS_FILE):
+        gravar_json(SLA_METRICAS_FILE, {})
+
+
+def carregar_metricas():
+    assinatura = mtime(SLA_METRICAS_FILE)
+    if assinatura != _cache["assinatura"]:
+        _cache["metricas"] = ler_json(SLA_METRICAS_FILE, {})
+        _cache["assinatura"] = assinatura
+    return _cache["metricas"]
+
+
+def percentis(etapa, qs=(0.5, 0.95)):
+    """Percentis (segundos) de uma etapa; None quando ainda não há amostras."""
+    sk = carregar_metricas().get(etapa)
+    return {q: sketch_quantil(sk, q) for q in qs}
+
+
+def amostras(etapa):
+    sk = carregar_metricas().get(etapa)
+    return sk["n"] if sk else 0
+
+
+# ----------------------------
+# Metas de SLA
+# ----------------------------
+def carregar_config():
+    config = dict(SLA_PADRAO)
+    config.update(ler_json(SLA_CONFIG_FILE, {}))
+    return config
+
+
+def salvar_config(config):
+    gravar_json(SLA_CONFIG_FILE, config)
+
+
+def tempo_no_status(pedido, agora=None):
+    """Segundos desde a última transição, ou None para pedidos sem histórico."""
+    inicio = inicio_status_atual(pedido)
+    if inicio is None:
+        return None
+    return (agora or time.time()) - inicio
+
+
+def estourou_sla(pedido, config=None, agora=None):
+    """(estourou?, minutos no status, meta em minutos)."""
+    config = config or carregar_config()
+    meta = config.get(pedido.get("status"))
+    decorrido = tempo_no_status(pedido, agora)
+    if meta is None or decorrido is None:
+        return False, None, meta
+    minutos = decorrido / 60
+    return minutos > meta, minutos, meta
@@ -0,0 +1,231 @@
+# tarefas.py — Execução em segundo plano dos efeitos lentos (impressão, arquivos, imagens)
+#
+# A interface só enfileira: a tarefa é registrada em tarefas.json (status
+# visível no painel do caixa) e roda num pool de threads do próprio processo.
+# Tarefas abandonadas por um processo que caiu são retomadas pelo próximo
+# processo que usar o módulo; a tarefa guarda o pid do dono, e as de um
+# processo vivo ficam com ele (anexos só existem na memória do dono).
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import impressao
+from armazenamento import ler_json, gravar_json, trava
+from cardapio_estatico import gerar_cardapio_estatico
+
+TAREFAS_FILE = "tarefas.json"
+TAREFAS_MAX = 200           # tarefas encerradas mantidas no histórico
+TRABALHADORES = 2
+PRAZO_PENDENTE = 60         # segundos sem ninguém pegar -> outro processo assume
+PRAZO_EXECUCAO = 10 * 60    # segundos "executando" -> considera que o processo caiu
+
+STATUS_TAREFA = ["pendente", "executando", "concluida", "erro"]
+
+_executores = {}
+_anexos = {}                # tarefa_id -> bytes (ficam só em memória, não vão para o JSON)
+_pool = None
+
+
+def executor(tipo):
+    """Registra a função que executa as tarefas de `tipo`: funcao(dados, anexo)."""
+    def registrar(funcao):
+        _executores[tipo] = funcao
+        return funcao
+    return registrar
+
+
+def _agora():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _processo_vivo(pid):
+    """O processo `pid` ainda existe? (sem psutil; no Windows via OpenProcess)"""
+    if os.name == "nt":
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        codigo = ctypes.c_ulong()
+        ok = kernel32.GetExitCodeProcess(handle, ctypes.byref(codigo))
+        kernel32.CloseHandle(handle)
+        return bool(ok) and codigo.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _orfa(tarefa):
+    """Tarefa que este processo pode assumir: é dele, sem dono registrado ou de um processo morto."""
+    dono = tarefa.get("dono")
+    return not dono or dono == os.getpid() or not _processo_vivo(dono)
+
+
+def _iniciar():
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=TRABALHADORES, thread_name_prefix="tarefa")
+        _retomar()
+
+
+def _podar(tarefas):
+    """Descarta as tarefas encerradas mais antigas além de TAREFAS_MAX."""
+    encerradas = [t for t in tarefas if t["status"] in ("concluida", "erro")]
+    excesso = len(encerradas) - TAREFAS_MAX
+    if excesso <= 0:
+        return tarefas
+    descartar = {t["id"] for t in encerradas[:excesso]}
+    return [t for t in tarefas if t["id"] not in descartar]
+
+
+def _alterar(tarefa_id, de_status=None, **campos):
+    """Atualiza a tarefa no arquivo; com `de_status`, só se ela ainda estiver nele."""
+    with trava(TAREFAS_FILE):
+        tarefas = ler_json(TAREFAS_FILE, [])
+        tarefa = next((t for t in tarefas if t["id"] == tarefa_id), None)
+        if tarefa is None or (de_status and tarefa["status"] != de_status):
+            return None
+        tarefa.update(campos)
+        gravar_json(TAREFAS_FILE, _podar(tarefas))
+        return dict(tarefa)
+
+
+# ----------------------------
+# Fila
+# ----------------------------
+def enfileirar(tipo, dados=None, anexo=None, descricao=""):
+    """Registra a tarefa e a agenda no pool; devolve a tarefa (status 'pendente')."""
+    if tipo not in _executores:
+        raise ValueError(f"Tipo de tarefa desconhecido: {tipo}")
+    tarefa = {
+        "id": uuid.uuid4().hex[:12],
+        "tipo": tipo,
+        "descricao": descricao or tipo,
+        "dados": dados or {},
+        "anexo": anexo is not None,
+        "status": "pendente",
+        "criada_em": _agora(),
+        "ts": time.time(),
+        "tentativas": 0,
+        "dono": os.getpid(),
+        "resultado": None,
+        "erro": None,
+    }
+    if anexo is not None:
+        _anexos[tarefa["id"]] = anexo
+    with trava(TAREFAS_FILE):
+        tarefas = ler_json(TAREFAS_FILE, [])
+        tarefas.append(tarefa)
+        gravar_json(TAREFAS_FILE, _podar(tarefas))
+    _iniciar()
+    _pool.submit(_executar, tarefa["id"])
+    return tarefa
+
+
+def _executar(tarefa_id):
+    # Só um processo/thread consegue passar a tarefa de pendente para executando
+    tarefa = _alterar(tarefa_id, de_status="pendente", status="executando",
+                      iniciada_em=_agora(), ts_inicio=time.time(), dono=os.getpid())
+    if tarefa is None:
+        return
+    anexo = _anexos.pop(tarefa_id, None)
+    try:
+        if tarefa["anexo"] and anexo is None:
+            raise RuntimeError("Anexo perdido: o processo que criou a tarefa foi encerrado.")
+        resultado = _executores[tarefa["tipo"]](tarefa["dados"], anexo)
+    except Exception as e:
+        _alterar(tarefa_id, status="erro", erro=str(e) or type(e).__name__,
+                 concluida_em=_agora(), tentativas=tarefa["tentativas"] + 1)
+    else:
+        _alterar(tarefa_id, status="concluida", resultado=resultado,
+                 concluida_em=_agora(), tentativas=tarefa["tentativas"] + 1)
+
+
+def retomar_pendentes():
+    """Agenda tarefas esquecidas (pendentes há muito tempo ou presas em execução)."""
+    if _pool is None:
+        _iniciar()
+        return
+    _retomar()
+
+
+def _retomar():
+    agora = time.time()
+    retomar = []
+    with trava(TAREFAS_FILE):
+        tarefas = ler_json(TAREFAS_FILE, [])
+        mudou = False
+        for t in tarefas:
+            if t["status"] not in ("pendente", "executando") or not _orfa(t):
+                continue
+            if t["status"] == "executando" and agora - t.get("ts_inicio", 0) > PRAZO_EXECUCAO:
+                t["status"] = "pendente"
+                mudou = True
+            if t["status"] == "pendente" and agora - t["ts"] > PRAZO_PENDENTE and t["tipo"] in _executores:
+                retomar.append(t["id"])
+        if mudou:
+            gravar_json(TAREFAS_FILE, tarefas)
+    for tarefa_id in retomar:
+        _pool.submit(_executar, tarefa_id)
+
+
+def listar(limite=20, tipo=None):
+    """Tarefas mais recentes primeiro."""
+    tarefas = [t for t in ler_json(TAREFAS_FILE, []) if tipo is None or t["tipo"] == tipo]
+    return list(reversed(tarefas))[:limite]
+
+
+def buscar(tarefa_id):
+    return next((t for t in ler_json(TAREFAS_FILE, []) if t["id"] == tarefa_id), None)
+
+
+def aguardar(tarefa_id, timeout=10):
+    """Espera a tarefa encerrar (útil em scripts); devolve a tarefa ou None no timeout."""
+    limite = time.time() + timeout
+    while time.time() < limite:
+        tarefa = buscar(tarefa_id)
+        if tarefa and tarefa["status"] in ("concluida", "erro"):
+            return tarefa
+        time.sleep(0.05)
+    return None
+
+
+# ----------------------------
+# Tarefas do sistema
+# ----------------------------
+def _gravar_arquivo(caminho, conteudo):
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    tmp = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"  # um por gravador, como em gravar_json
+    with open(tmp, "wb") as f:
+        f.write(conteudo)
+    os.replace(tmp, caminho)
+    return caminho
+
+
+@executor("imprimir")
+def _imprimir(dados, anexo):
+    impressora = impressao.imprimir_local(dados["texto"], dados.get("titulo", "PEDIDO THE RUA"))
+    return f"Impresso em {impressora}"
+
+
+@executor("gravar_relatorio")
+def _gravar_relatorio(dados, anexo):
+    return _gravar_arquivo(dados["caminho"], dados["texto"].encode("utf-8"))
+
+
+@executor("gravar_comprovante")
+def _gravar_comprovante(dados, anexo):
+    return _gravar_arquivo(dados["caminho"], anexo)
+
+
+@executor("gerar_cardapio")
+def _gerar_cardapio(dados, anexo):
+    # Copia as imagens com hash no nome e regrava static/cardapio/index.html
+    return gerar_cardapio_estatico()
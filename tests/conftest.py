@@ -0,0 +1,15 @@
+# conftest.py — Cada teste roda numa pasta vazia: os módulos gravam seus JSON
+# com caminhos relativos, então a pasta temporária isola os dados do teste.
+import os
+import sys
+
+os.environ["THE_RUA_INSTRUMENTACAO"] = "0"  # sem desempenho.json nem thread de descarga
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def pasta_dados(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
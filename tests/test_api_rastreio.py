@@ -0,0 +1,81 @@
+import asyncio
+import json
+from email.utils import formatdate
+
+import pytest
+
+import api
+import pedidos_db
+
+
+def chamar(caminho, headers=None):
+    """GET direto na aplicação ASGI; devolve (status, cabeçalhos, corpo)."""
+    saida = {"corpo": b""}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(msg):
+        if msg["type"] == "http.response.start":
+            saida["status"] = msg["status"]
+            saida["headers"] = {k.decode(): v.decode() for k, v in msg["headers"]}
+        else:
+            saida["corpo"] += msg.get("body", b"")
+
+    scope = {"type": "http", "method": "GET", "path": caminho, "query_string": b"",
+             "headers": [(k.encode(), v.encode()) for k, v in (headers or {}).items()], "client": ("10.0.0.1", 1)}
+    asyncio.run(api.app(scope, receive, send))
+    return saida["status"], saida["headers"], saida["corpo"]
+
+
+@pytest.fixture(autouse=True)
+def sem_limite(monkeypatch):
+    monkeypatch.setattr(api, "_baldes", {})
+
+
+@pytest.fixture
+def pedido():
+    return pedidos_db.adicionar_pedido({"id": "100", "codigo_rastreio": "4321", "tipo_pedido": "Retirada",
+                                        "data": "2026-01-01 12:00:00", "total": 20.0,
+                                        "produtos": [{"id": "1", "nome": "X", "quantidade": 1, "preco": 20.0}]})[0]
+
+
+def test_rastreio_responde_com_etag_e_previsao(pedido):
+    status, headers, corpo = chamar("/rastreio/4321")
+    assert status == 200
+    assert json.loads(corpo)["previsao"]["minutos"] >= 0
+    assert headers["etag"].startswith('W/"100-1-')
+
+
+def test_mesma_etag_devolve_304(pedido):
+    _, headers, _ = chamar("/rastreio/4321")
+    status, _, corpo = chamar("/rastreio/4321", {"if-none-match": headers["etag"]})
+    assert status == 304
+    assert corpo == b""
+
+
+def test_mudanca_de_status_troca_a_etag(pedido):
+    _, headers, _ = chamar("/rastreio/4321")
+    pedidos_db.atualizar_status(pedido["id"], "Em preparo")
+    status, novos, _ = chamar("/rastreio/4321", {"if-none-match": headers["etag"]})
+    assert status == 200
+    assert novos["etag"] != headers["etag"]
+
+
+def test_if_modified_since_nao_vale_enquanto_ha_previsao(pedido):
+    futuro = formatdate(pedido["historico"][-1]["ts"] + 3600, usegmt=True)
+    status, headers, _ = chamar("/rastreio/4321", {"if-modified-since": futuro})
+    assert status == 200
+    assert "last-modified" not in headers
+
+
+def test_if_modified_since_vale_para_pedido_entregue(pedido):
+    for novo in ("Em preparo", "Pronto", "Entregue"):
+        pedidos_db.atualizar_status(pedido["id"], novo)
+    _, headers, _ = chamar("/rastreio/4321")
+    status, _, _ = chamar("/rastreio/4321", {"if-modified-since": headers["last-modified"]})
+    assert status == 304
+
+
+def test_codigo_desconhecido_e_404():
+    assert chamar("/rastreio/9999")[0] == 404
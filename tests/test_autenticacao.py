@@ -0,0 +1,116 @@
+import base64
+
+import pytest
+
+import autenticacao
+from armazenamento import gravar_json, ler_json
+
+
+@pytest.fixture(autouse=True)
+def hash_barato():
+    """scrypt com custo baixo: o teste confere o formato, não a lentidão."""
+    autenticacao.salvar_config({"scrypt_n": 2 ** 10})
+
+
+@pytest.fixture
+def ana():
+    return autenticacao.salvar_usuario("ana", "Ana", "caixa", "segredo")
+
+
+def test_hash_confere_so_a_senha_certa():
+    h = autenticacao.gerar_hash("1234")
+    assert h.startswith("scrypt$1024$8$1$")
+    assert autenticacao.conferir_senha("1234", h)
+    assert not autenticacao.conferir_senha("12345", h)
+
+
+def test_hash_usa_sal_aleatorio():
+    assert autenticacao.gerar_hash("1234") != autenticacao.gerar_hash("1234")
+
+
+@pytest.mark.parametrize("hash_ruim", [None, "", "md5$abc", "scrypt$x$8$1$sal$hash"])
+def test_hash_malformado_nao_confere(hash_ruim):
+    assert autenticacao.conferir_senha("1234", hash_ruim) is False
+
+
+def test_usuarios_padrao_criados_com_hash():
+    usuarios = {u["usuario"]: u["papel"] for u in autenticacao.listar_usuarios()}
+    assert usuarios == {u: papel for u, _, papel in autenticacao.USUARIOS_PADRAO}
+    assert autenticacao.autenticar("entregador", "1234")["papel"] == "entregador"
+    assert autenticacao.autenticar("entregador", "errada") is None
+
+
+def test_token_assinado_devolve_o_usuario(ana):
+    token = autenticacao.emitir_token("ana")
+    assert autenticacao.verificar_token(token) == {"usuario": "ana", "nome": "Ana", "papel": "caixa"}
+
+
+def test_token_adulterado_e_recusado(ana):
+    corpo, _, assinatura = autenticacao.emitir_token("ana").partition(".")
+    falso = base64.urlsafe_b64encode(
+        base64.urlsafe_b64decode(corpo + "=" * (-len(corpo) % 4)).replace(b"caixa", b"admin")).rstrip(b"=").decode()
+    assert autenticacao.verificar_token(f"{falso}.{assinatura}") is None
+    assert autenticacao.verificar_token(f"{corpo}.{assinatura[:-2]}xx") is None
+    assert autenticacao.verificar_token("lixo") is None
+
+
+def test_token_vencido_e_recusado(ana, monkeypatch):
+    token = autenticacao.emitir_token("ana")
+    agora = autenticacao.time.time()
+    monkeypatch.setattr(autenticacao.time, "time", lambda: agora + 13 * 3600)
+    assert autenticacao.verificar_token(token) is None
+
+
+def test_trocar_senha_ou_papel_derruba_o_token(ana):
+    token = autenticacao.emitir_token("ana")
+    autenticacao.salvar_usuario("ana", "Ana", "cozinha")
+    assert autenticacao.verificar_token(token) is None
+    token = autenticacao.emitir_token("ana")
+    autenticacao.salvar_usuario("ana", "Ana", "cozinha", "outra")
+    assert autenticacao.verificar_token(token) is None
+
+
+def test_sessao_valida_confere_o_acesso_a_pagina(ana):
+    estado = {}
+    autenticacao.iniciar_sessao(estado, autenticacao.autenticar("ana", "segredo"))
+    assert autenticacao.sessao_valida(estado, "caixa")["usuario"] == "ana"
+    assert autenticacao.sessao_valida(estado, "gerenciar_usuarios") is None
+
+
+def test_ultimo_admin_nao_sai_nem_perde_o_papel():
+    with pytest.raises(autenticacao.UsuarioInvalido):
+        autenticacao.salvar_usuario("admin", "Admin", "caixa")
+    with pytest.raises(autenticacao.UsuarioInvalido):
+        autenticacao.remover_usuario("admin")
+    autenticacao.salvar_usuario("chefe", "Chefe", "admin", "s3nha")
+    assert autenticacao.remover_usuario("admin") is True
+    assert autenticacao.remover_usuario("admin") is False
+
+
+@pytest.mark.parametrize("usuario, papel, senha", [("", "caixa", "x"), ("bia", "gerente", "x"), ("bia", "caixa", None)])
+def test_cadastro_invalido_e_recusado(usuario, papel, senha):
+    with pytest.raises(autenticacao.UsuarioInvalido):
+        autenticacao.salvar_usuario(usuario, "Bia", papel, senha)
+    assert autenticacao.buscar_usuario("bia") is None
+
+
+def test_lista_antiga_com_senha_em_texto_e_migrada():
+    gravar_json(autenticacao.USUARIOS_FILE, [{"usuario": "cozinha", "senha": "fogao"},
+                                             {"usuario": "joao", "nome": "João", "senha": "abc"}])
+    assert autenticacao.autenticar("cozinha", "fogao")["papel"] == "cozinha"
+    assert autenticacao.autenticar("joao", "abc")["papel"] == "caixa"
+    assert all("senha" not in u for u in ler_json(autenticacao.USUARIOS_FILE, []))
+
+
+def test_login_refaz_o_hash_com_o_custo_novo(ana):
+    autenticacao.salvar_config({"scrypt_n": 2 ** 11})
+    assert autenticacao.autenticar("ana", "segredo")
+    registro = {u["usuario"]: u for u in ler_json(autenticacao.USUARIOS_FILE, [])}["ana"]
+    assert registro["senha_hash"].startswith("scrypt$2048$")
+    assert autenticacao.autenticar("desconhecido", "segredo") is None
+
+
+def test_calibrar_grava_o_custo_escolhido():
+    n, _ = autenticacao.calibrar(alvo_ms=0)
+    assert n == 2 ** 12
+    assert autenticacao.carregar_config()["scrypt_n"] == n
@@ -0,0 +1,111 @@
+import shutil
+
+import pytest
+
+import caixas
+from armazenamento import gravar_json
+
+
+@pytest.fixture(autouse=True)
+def pasta_caixas():
+    """Como a tela do caixa: a listagem cria o caixa principal na pasta nova."""
+    caixas._cache.clear()
+    caixas.listar_caixas()
+
+
+def _pedido(turno, total, pagamento="Pix", caixa_id=caixas.CAIXA_PADRAO):
+    return {"id": "1", "turno_id": turno["id"], "caixa_id": caixa_id, "total": total, "pagamento": pagamento}
+
+
+def test_turno_acumula_pedidos_e_estornos():
+    turno = caixas.abrir_turno(caixas.CAIXA_PADRAO, 100)
+    caixas.registrar_pedido(_pedido(turno, 30.0))
+    caixas.registrar_pedido(_pedido(turno, 12.5, "Dinheiro"))
+    caixas.estornar_pedido(_pedido(turno, 30.0))
+    atual = caixas.turno_atual(caixas.CAIXA_PADRAO)
+    assert atual["valor_inicial"] == 100.0
+    assert atual["qtd_pedidos"] == 1
+    assert atual["total"] == 12.5
+    assert atual["por_pagamento"] == {"Pix": 0.0, "Dinheiro": 12.5}
+
+
+def test_pedido_sem_turno_nao_entra_no_caixa():
+    caixas.abrir_turno(caixas.CAIXA_PADRAO, 0)
+    caixas.registrar_pedido({"id": "1", "total": 10.0, "pagamento": "Pix"})
+    assert caixas.turno_atual(caixas.CAIXA_PADRAO)["total"] == 0.0
+
+
+def test_estorno_de_turno_fechado_sai_do_turno_aberto():
+    antigo = caixas.abrir_turno(caixas.CAIXA_PADRAO, 0)
+    caixas.registrar_pedido(_pedido(antigo, 40.0))
+    fechado = caixas.fechar_turno(caixas.CAIXA_PADRAO)
+    novo = caixas.abrir_turno(caixas.CAIXA_PADRAO, 0)
+    caixas.estornar_pedido(_pedido(antigo, 40.0))
+
+    turnos = {t["id"]: t for t in caixas.listar_turnos(caixas.CAIXA_PADRAO)}
+    assert turnos[fechado["id"]]["total"] == 40.0
+    assert turnos[fechado["id"]]["qtd_pedidos"] == 1
+    assert turnos[novo["id"]]["total"] == -40.0
+    assert turnos[novo["id"]]["estornos"] == 40.0
+    assert turnos[novo["id"]]["qtd_pedidos"] == 0
+
+
+def test_estorno_de_turno_fechado_com_caixa_fechado_e_ignorado():
+    antigo = caixas.abrir_turno(caixas.CAIXA_PADRAO, 0)
+    caixas.registrar_pedido(_pedido(antigo, 40.0))
+    caixas.fechar_turno(caixas.CAIXA_PADRAO)
+    caixas.estornar_pedido(_pedido(antigo, 40.0))
+    caixas.registrar_pedido(_pedido(antigo, 5.0))
+    turno = caixas.listar_turnos(caixas.CAIXA_PADRAO)[0]
+    assert turno["total"] == 40.0
+    assert "estornos" not in turno
+
+
+def test_caixas_tem_livros_separados():
+    balcao = caixas.criar_caixa("Balcão 2")
+    assert balcao == "balcao-2"
+    assert caixas.criar_caixa("Balcão 2") == balcao
+    t1 = caixas.abrir_turno(caixas.CAIXA_PADRAO, 50)
+    t2 = caixas.abrir_turno(balcao, 80)
+    assert t2["id"] == "balcao-2-1"
+    caixas.registrar_pedido(_pedido(t1, 10.0))
+    caixas.registrar_pedido(_pedido(t2, 25.0, caixa_id=balcao))
+    assert caixas.turno_atual(caixas.CAIXA_PADRAO)["total"] == 10.0
+    assert caixas.turno_atual(balcao)["total"] == 25.0
+    assert caixas.caixa_padrao() == balcao
+    caixas.fechar_turno(balcao)
+    assert caixas.caixa_padrao() == caixas.CAIXA_PADRAO
+    assert [c["id"] for c in caixas.listar_caixas()] == [balcao, caixas.CAIXA_PADRAO]
+
+
+def test_abrir_duas_vezes_devolve_o_mesmo_turno():
+    primeiro = caixas.abrir_turno(caixas.CAIXA_PADRAO, 50)
+    assert caixas.abrir_turno(caixas.CAIXA_PADRAO, 999)["id"] == primeiro["id"]
+
+
+def test_segundo_fechamento_devolve_none():
+    caixas.abrir_turno(caixas.CAIXA_PADRAO, 0)
+    assert caixas.fechar_turno(caixas.CAIXA_PADRAO)["fechado_em"]
+    assert caixas.fechar_turno(caixas.CAIXA_PADRAO) is None
+    assert caixas.caixa_padrao() is None
+
+
+def test_migra_o_caixa_global_antigo():
+    shutil.rmtree(caixas.CAIXAS_DIR)
+    caixas._cache.clear()
+    gravar_json(caixas.LEGADO_TURNOS_FILE, {
+        "proximo_id": 3, "atual": 2,
+        "turnos": {"1": {"id": "1", "fechado_em": "2026-01-01 18:00:00", "qtd_pedidos": 1,
+                         "total": 10.0, "por_pagamento": {"Pix": 10.0}},
+                   "2": {"id": "2", "fechado_em": None, "qtd_pedidos": 1,
+                         "total": 5.0, "por_pagamento": {"Pix": 5.0}}},
+    })
+    gravar_json(caixas.LEGADO_CAIXA_FILE, {"aberto": True, "valor_inicial": 70.0})
+    caixa = caixas.listar_caixas()[0]
+    assert caixa["id"] == caixas.CAIXA_PADRAO
+    assert caixa["aberto"] and caixa["valor_inicial"] == 70.0
+    assert caixa["turno_atual"] == "principal-2"
+    assert caixa["proximo_turno"] == 3
+    # pedidos antigos guardam só o número do turno
+    caixas.registrar_pedido({"turno_id": 2, "total": 4.0, "pagamento": "Pix"})
+    assert caixas.turno_atual(caixas.CAIXA_PADRAO)["total"] == 9.0
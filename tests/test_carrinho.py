@@ -0,0 +1,68 @@
+import carrinho
+import catalogo
+
+
+def _produto(pid, nome, preco):
+    return {"id": pid, "nome": nome, "descricao": "", "preco": preco, "categoria": "Lanches", "esgotado": False}
+
+
+def _cardapio():
+    catalogo.adicionar_produto(_produto("1", "X-Burguer", 20.0))
+    catalogo.adicionar_produto(_produto("2", "Batata", 12.5))
+    catalogo.adicionar_produto(_produto("3", "Refri", 6.0))
+
+
+def test_mesmo_produto_soma_na_mesma_linha():
+    _cardapio()
+    c = carrinho.novo_carrinho()
+    carrinho.adicionar(c, catalogo.buscar_produto("1"), 1)
+    carrinho.adicionar(c, catalogo.buscar_produto("1"), 2)
+    carrinho.adicionar(c, catalogo.buscar_produto("2"), 0)
+    assert carrinho.itens(c) == [{"id": "1", "nome": "X-Burguer", "quantidade": 3, "preco": 20.0}]
+    assert c["total"] == 60.0
+
+
+def test_total_acompanha_alteracoes_e_remocoes():
+    _cardapio()
+    c = carrinho.novo_carrinho()
+    carrinho.adicionar(c, catalogo.buscar_produto("1"), 2)
+    carrinho.adicionar(c, catalogo.buscar_produto("2"), 1)
+    carrinho.alterar_quantidade(c, "2", 3)
+    assert c["total"] == 77.5
+    carrinho.alterar_quantidade(c, "1", 0)
+    assert [i["id"] for i in carrinho.itens(c)] == ["2"]
+    carrinho.remover(c, "2")
+    assert carrinho.vazio(c) and c["total"] == 0.0
+
+
+def test_reprecificar_so_quando_o_cardapio_muda():
+    _cardapio()
+    c = carrinho.novo_carrinho()
+    carrinho.adicionar(c, catalogo.buscar_produto("1"), 2)
+    carrinho.adicionar(c, catalogo.buscar_produto("2"), 1)
+    carrinho.adicionar(c, catalogo.buscar_produto("3"), 1)
+    assert carrinho.reprecificar(c) == []
+
+    catalogo.atualizar_produto("1", {"preco": 22.0})
+    catalogo.remover_produto("2")
+    catalogo.definir_esgotado("3")
+    avisos = carrinho.reprecificar(c)
+    assert len(avisos) == 3
+    assert carrinho.itens(c) == [{"id": "1", "nome": "X-Burguer", "quantidade": 2, "preco": 22.0}]
+    assert c["total"] == 44.0
+    assert carrinho.reprecificar(c) == []
+
+
+def test_repetir_usa_o_preco_de_hoje_e_avisa_o_que_faltou():
+    _cardapio()
+    catalogo.atualizar_produto("1", {"preco": 21.0})
+    catalogo.definir_esgotado("3")
+    anteriores = [
+        {"id": "1", "nome": "X-Burguer", "quantidade": 2, "preco": 20.0},
+        {"id": "3", "nome": "Refri", "quantidade": 1, "preco": 6.0},
+        {"id": "9", "nome": "Milkshake", "quantidade": 1, "preco": 15.0},
+    ]
+    c = carrinho.novo_carrinho()
+    avisos = carrinho.repetir(c, anteriores)
+    assert avisos == ["Refri está esgotado.", "Milkshake saiu do cardápio."]
+    assert c["total"] == 42.0
@@ -0,0 +1,41 @@
+import catalogo
+
+
+def _produto(pid, nome="X-Burguer"):
+    return {"id": pid, "nome": nome, "descricao": "", "preco": 20.0, "categoria": "Lanches", "esgotado": False}
+
+
+def test_adicionar_atualizar_e_remover():
+    catalogo.adicionar_produto(_produto("1"))
+    catalogo.adicionar_produto(_produto("2", "Batata"))
+    assert catalogo.atualizar_produto("1", {"preco": 25.0}) is True
+    assert catalogo.buscar_produto("1")["preco"] == 25.0
+    assert catalogo.remover_produto("2") is True
+    assert catalogo.remover_produto("2") is False
+    assert catalogo.atualizar_produto("2", {"preco": 1.0}) is False
+    assert [p["id"] for p in catalogo.carregar_produtos()] == ["1"]
+
+
+def test_edicao_nao_desfaz_esgotado_automatico():
+    catalogo.adicionar_produto(_produto("1"))
+    visto = dict(catalogo.buscar_produto("1"))  # página aberta antes da baixa de estoque
+    catalogo.sincronizar_esgotados({"1"})
+    catalogo.atualizar_produto("1", {"nome": "X-Bacon", "preco": visto["preco"]})
+    produto = catalogo.buscar_produto("1")
+    assert produto["nome"] == "X-Bacon"
+    assert produto["esgotado"] and produto["esgotado_auto"]
+
+
+def test_marcacao_manual_nao_e_liberada_pelo_estoque():
+    catalogo.adicionar_produto(_produto("1"))
+    catalogo.definir_esgotado("1")
+    assert catalogo.sincronizar_esgotados(set()) is False
+    assert not catalogo.disponivel(catalogo.buscar_produto("1"))
+
+
+def test_busca_por_prefixo_sem_acento():
+    catalogo.adicionar_produto(_produto("1", "Pão de Alho"))
+    catalogo.adicionar_produto(_produto("2", "Batata"))
+    assert [p["id"] for p in catalogo.buscar("pao al")] == ["1"]
+    catalogo.limpar()
+    assert catalogo.carregar_produtos() == []
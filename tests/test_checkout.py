@@ -0,0 +1,71 @@
+import threading
+
+import pytest
+
+import catalogo
+import checkout
+import estoque
+import pedidos_db
+from armazenamento import gravar_json
+
+DADOS = {"nome": "Ana", "telefone": "(11) 98765-4321", "tipo_pedido": "Retirada", "pagamento": "Pix"}
+
+
+@pytest.fixture(autouse=True)
+def cardapio():
+    estoque._estado["assinatura"] = None  # saldos em memória do teste anterior
+    catalogo.adicionar_produto({"id": "1", "nome": "X-Burguer", "descricao": "", "preco": 20.0,
+                                "categoria": "Lanches", "esgotado": False})
+    gravar_json(estoque.RECEITAS_FILE, {"ingredientes": {"pao": {"minimo": 0}}, "produtos": {"1": {"pao": 1}}})
+    estoque.entrada("pao", 10)
+
+
+def test_preco_vem_do_cardapio():
+    pedido, criado = checkout.criar_pedido(DADOS, [{"id": "1", "quantidade": 2, "preco": 0.01}])
+    assert criado
+    assert pedido["produtos"][0]["preco"] == 20.0
+    assert pedido["total"] == 40.0
+    assert len(pedido["codigo_rastreio"]) == 4
+
+
+def test_dados_invalidos_juntam_todas_as_mensagens():
+    with pytest.raises(checkout.PedidoInvalido) as erro:
+        checkout.criar_pedido({"nome": "", "tipo_pedido": "Entrega", "pagamento": "Fiado"},
+                              [{"id": "9", "quantidade": 1}, {"id": "1", "quantidade": "x"}])
+    assert len(erro.value.erros) == 5
+    assert pedidos_db.carregar_pedidos() == []
+    assert estoque.saldos()["pao"] == 10
+
+
+def test_mesma_chave_devolve_o_pedido_ja_criado():
+    primeiro, criado = checkout.criar_pedido(DADOS, [{"id": "1", "quantidade": 2}], "token-1")
+    repetido, criado_de_novo = checkout.criar_pedido(DADOS, [{"id": "1", "quantidade": 2}], "token-1")
+    assert criado and not criado_de_novo
+    assert repetido["id"] == primeiro["id"]
+    assert len(pedidos_db.carregar_pedidos()) == 1
+    assert estoque.saldos()["pao"] == 8
+
+
+def test_envios_simultaneos_com_a_mesma_chave_criam_um_pedido():
+    resultados = []
+
+    def enviar():
+        resultados.append(checkout.criar_pedido(DADOS, [{"id": "1", "quantidade": 1}], "token-2"))
+
+    threads = [threading.Thread(target=enviar) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sum(criado for _, criado in resultados) == 1
+    assert len({p["id"] for p, _ in resultados}) == 1
+    assert len(pedidos_db.carregar_pedidos()) == 1
+    assert estoque.saldos()["pao"] == 9  # as baixas repetidas foram estornadas
+
+
+def test_ingrediente_em_falta_recusa_sem_gravar():
+    estoque.ajustar("pao", 1)
+    with pytest.raises(checkout.PedidoInvalido) as erro:
+        checkout.criar_pedido(DADOS, [{"id": "1", "quantidade": 2}])
+    assert erro.value.erros == ["X-Burguer acabou de esgotar."]
+    assert pedidos_db.carregar_pedidos() == []
@@ -0,0 +1,86 @@
+import pytest
+
+import clientes
+import pedidos_db
+import retencao
+from armazenamento import gravar_json
+from clientes import id_cliente, normalizar_telefone
+
+
+@pytest.mark.parametrize("texto", [
+    "11987654321",
+    "(11) 98765-4321",
+    "+55 (11) 98765-4321",
+    "0055 11 98765 4321",
+    "011 98765 4321",
+])
+def test_normalizar_telefone_formatos_equivalentes(texto):
+    assert normalizar_telefone(texto) == "11987654321"
+
+
+@pytest.mark.parametrize("texto", ["", None, "abc", "1234567", "123456789012345"])
+def test_normalizar_telefone_recusa_o_que_nao_e_telefone(texto):
+    assert normalizar_telefone(texto) is None
+
+
+def test_fixo_sem_ddd_e_aceito():
+    assert normalizar_telefone("3333-4444") == "33334444"
+
+
+def test_id_cliente_e_o_mesmo_para_o_mesmo_telefone():
+    assert id_cliente("+55 11 98765-4321") == id_cliente("(11) 98765-4321")
+    assert id_cliente("(11) 98765-4321") != id_cliente("(11) 98765-4322")
+    assert id_cliente("abc") is None
+
+
+def _pedido(pid, data, total=20.0, telefone="(11) 98765-4321", **extra):
+    return {"id": pid, "cliente_id": id_cliente(telefone), "telefone": telefone, "nome": "Ana",
+            "data": data, "total": total, "pagamento": "Pix", "tipo_pedido": "Retirada",
+            "produtos": [{"id": "1", "nome": "X-Burguer", "quantidade": 1, "preco": total}], **extra}
+
+
+def test_registro_acumula_e_o_historico_fica_do_mais_novo():
+    clientes.registrar_pedido(_pedido("1", "2026-01-01 12:00:00"))
+    clientes.registrar_pedido(_pedido("2", "2026-01-03 12:00:00", 30.0, endereco="Rua A, 1"))
+    clientes.registrar_pedido(_pedido("2", "2026-01-03 12:00:00", 30.0))  # repetido: não conta de novo
+    registro = clientes.buscar_por_telefone("11 98765-4321")
+    assert registro["pedidos"] == 2
+    assert registro["total_gasto"] == 50.0
+    assert registro["endereco"] == "Rua A, 1"
+    assert (registro["primeiro_pedido"], registro["ultimo_pedido"]) == ("2026-01-01 12:00:00", "2026-01-03 12:00:00")
+    assert [h["id"] for h in clientes.historico(registro["id"])] == ["2", "1"]
+    assert clientes.ultimo_pedido("+55 11 98765-4321")["itens"][0]["nome"] == "X-Burguer"
+
+
+def test_sem_telefone_valido_nao_cria_cliente():
+    assert clientes.registrar_pedido(_pedido("1", "2026-01-01 12:00:00", telefone="abc")) is None
+    assert clientes.ultimo_pedido("abc") is None
+
+
+def test_historico_guarda_so_os_mais_recentes():
+    for i in range(clientes.HISTORICO_MAX + 5):
+        clientes.registrar_pedido(_pedido(str(i), f"2026-01-01 12:{i:02d}:00"))
+    registro = clientes.buscar_por_telefone("11987654321")
+    assert registro["pedidos"] == clientes.HISTORICO_MAX + 5
+    assert len(registro["historico"]) == clientes.HISTORICO_MAX
+    assert registro["historico"][0]["id"] == str(clientes.HISTORICO_MAX + 4)
+
+
+def test_pedido_excluido_sai_do_historico_e_dos_totais():
+    clientes.registrar_pedido(_pedido("1", "2026-01-01 12:00:00"))
+    clientes.registrar_pedido(_pedido("2", "2026-01-02 12:00:00", 30.0))
+    clientes.remover_pedido(_pedido("2", "2026-01-02 12:00:00", 30.0))
+    clientes.remover_pedido(_pedido("2", "2026-01-02 12:00:00", 30.0))
+    registro = clientes.buscar_por_telefone("11987654321")
+    assert (registro["pedidos"], registro["total_gasto"]) == (1, 20.0)
+    assert clientes.ultimo_pedido("11987654321")["id"] == "1"
+
+
+def test_reconstruir_junta_arquivados_e_ativos():
+    gravar_json(retencao.arquivo_mes("2025-12"), [_pedido("1", "2025-12-20 12:00:00")])
+    pedidos_db.adicionar_pedido(_pedido("2", "2026-01-02 12:00:00", 30.0))
+    pedidos_db.adicionar_pedido(_pedido("3", "2026-01-02 13:00:00", telefone="21 99999-0000"))
+    assert clientes.reconstruir() == 2
+    registro = clientes.buscar_por_telefone("11987654321")
+    assert [h["id"] for h in registro["historico"]] == ["2", "1"]
+    assert registro["primeiro_pedido"] == "2025-12-20 12:00:00"
@@ -0,0 +1,130 @@
+import pytest
+
+import despacho
+import enderecos
+import pedidos_db
+
+LOJA = [-23.5505, -46.6333]
+
+
+def _ponto(norte_km, leste_km=0.0):
+    return [LOJA[0] + norte_km / 111.0, LOJA[1] + leste_km / 102.0]
+
+
+def _novo(pid="100", tipo="Retirada", endereco="", data="2026-01-01 12:00:00"):
+    pedido = {"id": pid, "codigo_rastreio": f"{int(pid) % 10000:04d}", "nome": "Ana", "telefone": "11987654321",
+              "tipo_pedido": tipo, "endereco": endereco, "pagamento": "Pix", "total": 20.0,
+              "produtos": [{"id": "1", "nome": "X", "quantidade": 1, "preco": 20.0}], "data": data}
+    return pedidos_db.adicionar_pedido(pedido)[0]
+
+
+def _pronto(pid, endereco="", data="2026-01-01 12:00:00"):
+    p = _novo(pid, "Entrega", endereco, data)
+    for status in ("Em preparo", "Pronto"):
+        pedidos_db.atualizar_status(p["id"], status)
+    return pedidos_db.buscar_pedido(p["id"])
+
+
+def _status(pid):
+    return pedidos_db.buscar_pedido(pid)["status"]
+
+
+@pytest.fixture
+def ruas():
+    despacho.salvar_config({"loja": LOJA, "max_pedidos": 2, "raio_km": 1.0})
+    for nome, norte in (("Rua A", 1.0), ("Rua B", 1.5), ("Rua C", 5.0)):
+        enderecos.fixar_rua(nome, *_ponto(norte))
+
+
+def test_lote_com_versoes_deixa_de_fora_quem_mudou():
+    a, b = _novo("100"), _novo("200")
+    versoes = {a["id"]: a["versao"], b["id"]: b["versao"]}
+    pedidos_db.atualizar_status(b["id"], "Em preparo")  # b mudou depois de exibido
+    pedidos_db.atualizar_status(b["id"], "Pronto")
+    pedidos_db.atualizar_status(a["id"], "Em preparo")
+    pedidos_db.atualizar_status(a["id"], "Pronto")
+    versoes[a["id"]] = pedidos_db.buscar_pedido(a["id"])["versao"]
+    mudados = pedidos_db.atualizar_status_lote([a["id"], b["id"]], "Em rota de entrega",
+                                               campos={a["id"]: {"entregador": "joao"}}, versoes=versoes)
+    assert mudados == [a["id"]]
+    assert _status(a["id"]) == "Em rota de entrega"
+    assert pedidos_db.buscar_pedido(a["id"])["entregador"] == "joao"
+    assert _status(b["id"]) == "Pronto"
+
+
+def test_lote_ignora_transicoes_invalidas():
+    a, b = _novo("100"), _novo("200")
+    pedidos_db.atualizar_status(a["id"], "Em preparo")
+    assert pedidos_db.atualizar_status_lote([a["id"], b["id"], "999"], "Pronto") == [a["id"]]
+    assert _status(b["id"]) == "Aguardando aceite"
+
+
+def test_rota_visita_o_mais_perto_primeiro():
+    pontos = [_ponto(3), _ponto(1), _ponto(2)]
+    assert despacho.ordenar_rota(LOJA, pontos) == [1, 2, 0]
+    assert despacho.comprimento(LOJA, [pontos[1], pontos[2], pontos[0]]) == pytest.approx(3.0, rel=0.01)
+
+
+def test_lotes_juntam_vizinhos_ate_a_capacidade(ruas):
+    a = _pronto("100", "Rua B, 1", "2026-01-01 12:00:00")
+    b = _pronto("200", "Rua A, 1", "2026-01-01 12:01:00")
+    c = _pronto("300", "Rua C, 1", "2026-01-01 12:02:00")
+    d = _pronto("400", "Rua Sem Cadastro, 1", "2026-01-01 12:03:00")
+    lotes = despacho.montar_lotes([d, c, b, a])
+    assert [[p["id"] for p in lote["pedidos"]] for lote in lotes] == [["200", "100"], ["300"], ["400"]]
+    assert lotes[0]["km"] == pytest.approx(1.5, rel=0.01)
+    assert lotes[2]["km"] is None
+
+
+def test_despachar_leva_o_lote_numa_gravacao(ruas):
+    a, b = _pronto("100", "Rua A, 1"), _pronto("200", "Rua B, 1")
+    lote_id, saidos = despacho.despachar([a, b], "joao", "João")
+    assert saidos == ["100", "200"]
+    for parada, pid in enumerate(saidos, 1):
+        p = pedidos_db.buscar_pedido(pid)
+        assert (p["status"], p["lote_id"], p["parada"]) == ("Em rota de entrega", lote_id, parada)
+    assert despacho.despachar([a, b], "maria")[1] == []  # versões exibidas já não valem
+
+
+def test_assumir_entregas_so_um_entregador_ganha():
+    p = _novo(tipo="Entrega")
+    for status in ("Em preparo", "Pronto", "Em rota de entrega"):
+        pedidos_db.atualizar_status(p["id"], status)
+    versao = pedidos_db.buscar_pedido(p["id"])["versao"]
+    assert pedidos_db.assumir_entregas({p["id"]: versao}, {"entregador": "ana"}) == [p["id"]]
+    assert pedidos_db.assumir_entregas({p["id"]: versao}, {"entregador": "bia"}) == []
+    atual = pedidos_db.buscar_pedido(p["id"])
+    assert atual["entregador"] == "ana"
+    assert atual["status"] == "Em rota de entrega"
+
+
+def test_filas_por_entregador_seguem_a_ordem_da_rota(ruas):
+    a, b, c = _pronto("100", "Rua A, 1"), _pronto("200", "Rua B, 1"), _pronto("300", "Rua C, 1")
+    assert {p["id"] for p in pedidos_db.entregas_prontas()} == {"100", "200", "300"}
+    despacho.despachar([b, a], "joao")
+    despacho.despachar([c], "maria")
+    assert [p["id"] for p in pedidos_db.entregas_do_entregador("joao")] == ["200", "100"]
+    assert pedidos_db.entregas_em_rota() == {"joao": 2, "maria": 1}
+    assert pedidos_db.entregas_prontas() == []
+
+
+def test_assumir_pega_so_as_sem_dono():
+    semdono = _pronto("100")
+    pedidos_db.atualizar_status(semdono["id"], "Em rota de entrega")  # saída antiga, sem entregador
+    fila = pedidos_db.entregas_do_entregador("")
+    assert [p["id"] for p in fila] == ["100"]
+    assert despacho.assumir(fila, "bia", "Bia") == ["100"]
+    assert pedidos_db.buscar_pedido("100")["entregador_nome"] == "Bia"
+    assert pedidos_db.entregas_do_entregador("") == []
+
+
+def test_confirmar_so_as_entregas_do_proprio_entregador(ruas):
+    a, b = _pronto("100", "Rua A, 1"), _pronto("200", "Rua B, 1")
+    semdono = _pronto("300")
+    despacho.despachar([a], "joao")
+    despacho.despachar([b], "maria")
+    pedidos_db.atualizar_status(semdono["id"], "Em rota de entrega")
+    em_rota = [pedidos_db.buscar_pedido(pid) for pid in ("100", "200", "300")]
+    assert despacho.confirmar_entregas(em_rota, "joao") == ["100"]
+    assert despacho.confirmar_entregas(em_rota, "") == []
+    assert [_status(pid) for pid in ("100", "200", "300")] == ["Entregue", "Em rota de entrega", "Em rota de entrega"]
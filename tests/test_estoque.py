@@ -0,0 +1,68 @@
+import pytest
+
+import catalogo
+import estoque
+import tarefas
+from armazenamento import gravar_json
+
+RECEITAS = {
+    "ingredientes": {"pao": {"minimo": 2}, "carne": {"minimo": 0}},
+    "produtos": {"1": {"pao": 1, "carne": 1}, "2": {"pao": 2}},
+}
+
+
+@pytest.fixture(autouse=True)
+def receitas(monkeypatch):
+    estoque._estado.update(assinatura=None, sem_estoque=None)  # saldos em memória do teste anterior
+    monkeypatch.setattr(tarefas, "enfileirar", lambda *a, **kw: None)
+    for pid, nome in (("1", "X-Burguer"), ("2", "Pão de Alho")):
+        catalogo.adicionar_produto({"id": pid, "nome": nome, "descricao": "", "preco": 10.0,
+                                    "categoria": "Lanches", "esgotado": False})
+    gravar_json(estoque.RECEITAS_FILE, RECEITAS)
+    estoque.entrada("pao", 5)
+    estoque.entrada("carne", 2)
+
+
+def test_baixa_e_estorno():
+    deltas = estoque.baixar([{"id": "1", "quantidade": 2}, {"id": "9", "quantidade": 1}], "p1")
+    assert deltas == {"pao": -2, "carne": -2}
+    assert estoque.saldos() == {"pao": 3, "carne": 0}
+    estoque.estornar(deltas, "p1")
+    assert estoque.saldos() == {"pao": 5, "carne": 2}
+
+
+def test_baixa_e_tudo_ou_nada():
+    with pytest.raises(estoque.EstoqueInsuficiente) as erro:
+        estoque.baixar([{"id": "2", "nome": "Pão de Alho", "quantidade": 1},
+                        {"id": "1", "nome": "X-Burguer", "quantidade": 3}])
+    assert erro.value.produtos == ["X-Burguer"]  # o pão dava; só a carne faltou
+    assert estoque.saldos() == {"pao": 5, "carne": 2}  # nem o pão saiu
+
+
+def test_falta_marca_esgotado_e_reposicao_libera():
+    estoque.baixar([{"id": "1", "quantidade": 2}])
+    assert catalogo.buscar_produto("1")["esgotado"]
+    assert not catalogo.buscar_produto("2")["esgotado"]
+    estoque.entrada("carne", 1)
+    assert not catalogo.buscar_produto("1")["esgotado"]
+
+
+def test_ajuste_e_minimo():
+    estoque.ajustar("pao", 2)
+    assert estoque.saldos()["pao"] == 2
+    assert estoque.abaixo_do_minimo() == [("pao", 2, 2)]
+
+
+def test_checkpoint_zera_o_diario_sem_perder_saldo(monkeypatch):
+    monkeypatch.setattr(estoque, "CHECKPOINT_MOVIMENTOS", 3)
+    for _ in range(4):
+        estoque.entrada("pao", 1)
+    assert estoque._estado["movimentos"] < 3
+    estoque._estado["assinatura"] = None  # outro processo: relê checkpoint + diário
+    assert estoque.saldos() == {"pao": 9, "carne": 2}
+
+
+def test_repor_pedido_devolve_os_ingredientes():
+    estoque.baixar([{"id": "2", "quantidade": 2}], "p1")
+    estoque.repor_pedido({"id": "p1", "produtos": [{"id": "2", "quantidade": 2}]})
+    assert estoque.saldos()["pao"] == 5
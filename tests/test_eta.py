@@ -0,0 +1,82 @@
+import pytest
+
+import eta
+from armazenamento import gravar_json
+
+
+def _pedido(pid, status, produtos=("1",), tipo="Retirada"):
+    return {"id": pid, "status": status, "tipo_pedido": tipo,
+            "produtos": [{"id": p, "quantidade": 1} for p in produtos]}
+
+
+def test_ewma_primeira_amostra_vira_a_media():
+    assert eta._ewma(None, 600, 0.2) == {"media": 600, "n": 1}
+
+
+def test_ewma_anda_so_o_peso_na_direcao_da_amostra():
+    atual = {"media": 600, "n": 3}
+    assert eta._ewma(atual, 1100, 0.2) == {"media": pytest.approx(700), "n": 4}
+
+
+def test_preparo_atualiza_a_media_de_cada_produto():
+    p = _pedido("1", "Pronto", produtos=("a", "b"))
+    eta.registrar_transicao(p, "Em preparo", {"preparo": 600})
+    eta.registrar_transicao(p, "Em preparo", {"preparo": 1100})
+    produtos = eta.carregar_modelo()["produtos"]
+    assert produtos["a"] == {"media": pytest.approx(700), "n": 2}
+    assert produtos["b"] == produtos["a"]
+
+
+def test_fila_entra_em_preparo_e_sai_ao_ficar_pronto():
+    gravar_json(eta.ETA_CONFIG_FILE, {"preparo_padrao_min": 10})
+    eta.registrar_transicao(_pedido("1", "Em preparo"), "Aguardando aceite", {})
+    eta.registrar_transicao(_pedido("2", "Em preparo"), "Aguardando aceite", {})
+    modelo = eta.carregar_modelo()
+    assert [f[0] for f in modelo["fila"]] == ["1", "2"]
+    assert modelo["carga"] == pytest.approx(1200)
+    eta.registrar_transicao(_pedido("1", "Pronto"), "Em preparo", {})
+    modelo = eta.carregar_modelo()
+    assert [f[0] for f in modelo["fila"]] == ["2"]
+    assert modelo["carga"] == pytest.approx(600)
+
+
+def test_estimar_conta_a_fila_a_frente_pela_capacidade():
+    gravar_json(eta.ETA_CONFIG_FILE, {"preparo_padrao_min": 10, "capacidade_cozinha": 2})
+    for pid in ("1", "2", "3"):
+        eta.registrar_transicao(_pedido(pid, "Em preparo"), "Aguardando aceite", {})
+    # Dois pedidos de 10 min a frente dividem a cozinha: 10 min de espera + 10 de preparo
+    assert eta.estimar(_pedido("3", "Em preparo"))["minutos"] == 20
+    assert eta.estimar(_pedido("1", "Em preparo"))["minutos"] == 10
+    assert eta.estimar(_pedido("3", "Em preparo"))["fila"] == 3
+
+
+def test_estimar_soma_a_entrega_e_zera_quando_entregue():
+    gravar_json(eta.ETA_CONFIG_FILE, {"entrega_padrao_min": 25})
+    assert eta.estimar(_pedido("1", "Pronto", tipo="Entrega"))["minutos"] == 25
+    assert eta.estimar(_pedido("1", "Pronto"))["minutos"] == 0
+    assert eta.estimar(_pedido("1", "Entregue", tipo="Entrega"))["minutos"] == 0
+
+
+def test_excluir_tira_o_pedido_da_fila():
+    eta.registrar_transicao(_pedido("1", "Em preparo"), "Aguardando aceite", {})
+    eta.remover_pedido("1")
+    assert eta.fila_preparo() == 0
+    assert eta.carregar_modelo()["carga"] == 0.0
+
+
+def test_configuracao_relida_so_quando_o_arquivo_muda():
+    assert eta.carregar_config() is eta.carregar_config()
+    gravar_json(eta.ETA_CONFIG_FILE, {"capacidade_cozinha": 4})
+    assert eta.carregar_config()["capacidade_cozinha"] == 4
+
+
+def test_limpeza_geral_esvazia_a_fila_da_previsao():
+    import pedidos_db
+
+    p = pedidos_db.adicionar_pedido({"id": "100", "codigo_rastreio": "0100", "data": "2026-01-01 12:00:00",
+                                     "produtos": [{"id": "1", "quantidade": 1}]})[0]
+    pedidos_db.atualizar_status(p["id"], "Em preparo")
+    assert eta.fila_preparo() == 1
+    pedidos_db.limpar()
+    assert eta.fila_preparo() == 0
+    assert eta.carregar_modelo()["carga"] == 0.0
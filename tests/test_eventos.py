@@ -0,0 +1,121 @@
+import asyncio
+from collections import deque
+
+import pytest
+
+import api
+import eventos
+import pedidos_db
+
+
+def _publicar(n, status="Em preparo", anterior="Aguardando aceite"):
+    return [eventos.publicar("status_alterado", {"id": str(i), "codigo_rastreio": f"{1000 + i}", "status": status},
+                             anterior) for i in range(n)]
+
+
+@pytest.fixture(autouse=True)
+def hub_novo(monkeypatch):
+    monkeypatch.setattr(api, "_hub", {"assinantes": {}, "buffer": deque(maxlen=api.HUB_BUFFER),
+                                      "posicao": None, "seq": 0, "tarefa": None})
+    monkeypatch.setattr(api, "HUB_INTERVALO", 0.01)
+
+
+def test_publicar_numera_e_ler_novos_continua_de_onde_parou():
+    _publicar(2)
+    lidos, posicao = eventos.ler_novos(0)
+    assert [e["seq"] for e in lidos] == [1, 2]
+    _publicar(1)
+    novos, _ = eventos.ler_novos(posicao)
+    assert [e["seq"] for e in novos] == [3]
+
+
+def test_linha_incompleta_fica_para_a_proxima_leitura():
+    _publicar(1)
+    with open(eventos.EVENTOS_FILE, "a", encoding="utf-8") as f:
+        f.write('{"seq": 2')
+    lidos, posicao = eventos.ler_novos(0)
+    assert [e["seq"] for e in lidos] == [1]
+    assert eventos.ler_novos(posicao) == ([], posicao)
+
+
+def test_rotacao_mantem_a_sequencia(monkeypatch):
+    monkeypatch.setattr(eventos, "EVENTOS_MAX_BYTES", 2000)
+    _publicar(40)
+    lidos, posicao = eventos.ler_novos(0)
+    assert posicao <= 2000
+    assert lidos[0]["seq"] > 1
+    assert [e["seq"] for e in lidos] == list(range(lidos[0]["seq"], 41))
+
+
+def test_pedidos_publicam_criacao_e_mudanca_de_status():
+    p = pedidos_db.adicionar_pedido({"id": "100", "codigo_rastreio": "4321", "tipo_pedido": "Retirada"})[0]
+    pedidos_db.atualizar_status(p["id"], "Em preparo")
+    lidos, _ = eventos.ler_novos(0)
+    assert [(e["tipo"], e["status"], e["anterior"]) for e in lidos] == [
+        ("pedido_criado", "Aguardando aceite", None),
+        ("status_alterado", "Em preparo", "Aguardando aceite"),
+    ]
+
+
+def test_filtro_por_status_ve_quem_sai_da_fila():
+    filtro = {"status": {"Aguardando aceite"}, "codigo": ""}
+    assert api._combina({"status": "Em preparo", "anterior": "Aguardando aceite"}, filtro)
+    assert not api._combina({"status": "Pronto", "anterior": "Em preparo"}, filtro)
+    assert api._combina({"status": "Pronto", "codigo_rastreio": "1"}, {"status": set(), "codigo": "1"})
+    assert not api._combina({"status": "Pronto", "codigo_rastreio": "2"}, {"status": set(), "codigo": "1"})
+
+
+def test_hub_nao_repete_eventos_depois_da_rotacao(monkeypatch):
+    monkeypatch.setattr(eventos, "EVENTOS_MAX_BYTES", 3000)
+
+    async def cenario():
+        _publicar(5)
+        await api._garantir_hub()
+        fila = asyncio.Queue()
+        api._hub["assinantes"]["teste"] = (fila, {"status": set(), "codigo": ""})
+        for _ in range(30):
+            _publicar(1)
+            await asyncio.sleep(0.03)
+        api._hub["tarefa"].cancel()
+        return [fila.get_nowait()["seq"] for _ in range(fila.qsize())]
+
+    recebidos = asyncio.run(cenario())
+    assert recebidos == list(range(6, 36))
+
+
+def _assinar(query, headers=None):
+    """Abre /eventos, deixa o reenvio acontecer e desconecta; devolve o corpo transmitido."""
+    corpo = []
+
+    async def receive():
+        await asyncio.sleep(0.2)
+        return {"type": "http.disconnect"}
+
+    async def send(msg):
+        if msg["type"] == "http.response.body":
+            corpo.append(msg.get("body", b""))
+
+    scope = {"type": "http", "method": "GET", "path": "/eventos", "query_string": query.encode(),
+             "headers": [(k.encode(), v.encode()) for k, v in (headers or {}).items()], "client": ("10.0.0.1", 1)}
+
+    async def rodar():
+        await api.app(scope, receive, send)
+        api._hub["tarefa"].cancel()
+
+    asyncio.run(rodar())
+    return b"".join(corpo).decode()
+
+
+def test_sse_reenvia_a_partir_do_last_event_id():
+    _publicar(3)
+    corpo = _assinar("", {"last-event-id": "1"})
+    assert "id: 1\n" not in corpo
+    assert "id: 2\n" in corpo and "id: 3\n" in corpo
+    assert "event: status_alterado" in corpo
+
+
+def test_sse_filtra_pelo_codigo():
+    _publicar(3)
+    corpo = _assinar("codigo=1001&desde=0")
+    assert corpo.count("id: ") == 1
+    assert '"codigo_rastreio": "1001"' in corpo
@@ -0,0 +1,95 @@
+import pytest
+
+import instrumentacao
+from instrumentacao import LIMITES_MS, quantil
+
+
+@pytest.fixture
+def medicoes(monkeypatch):
+    """registrar() ligado, sem a thread que descarrega em desempenho.json."""
+    monkeypatch.setattr(instrumentacao, "ATIVO", True)
+    monkeypatch.setattr(instrumentacao, "_pendentes", {})
+    monkeypatch.setitem(instrumentacao._descarga, "thread", object())
+
+    def histograma(valores_ms, operacao="op"):
+        for ms in valores_ms:
+            instrumentacao.registrar(operacao, ms / 1000)
+        return instrumentacao._pendentes[operacao]
+    return histograma
+
+
+def test_quantil_de_histograma_vazio_e_zero():
+    assert quantil(instrumentacao._novo_histograma(), 0.99) == 0.0
+
+
+def test_quantil_fica_no_balde_do_valor_real(medicoes):
+    h = medicoes(range(1, 101))
+    assert h["contagem"] == 100
+    assert 25 <= quantil(h, 0.5) <= 50  # mediana real 50: balde (25, 50]
+    assert 50 <= quantil(h, 0.95) <= 100
+    assert quantil(h, 0.5) <= quantil(h, 0.9) <= quantil(h, 0.99) <= h["max_ms"]
+
+
+def test_quantil_nao_passa_do_maximo_observado(medicoes):
+    h = medicoes([3.0, 3.0, 3.0])
+    assert quantil(h, 0.99) <= 3.0
+
+
+def test_quantil_no_balde_infinito_devolve_o_maximo(medicoes):
+    h = medicoes([LIMITES_MS[-1] * 2, LIMITES_MS[-1] * 3])
+    assert quantil(h, 0.5) == pytest.approx(LIMITES_MS[-1] * 3)
+
+
+def test_somar_junta_histogramas(medicoes):
+    a = medicoes([1, 10], "a")
+    b = medicoes([100, 1000], "b")
+    total = instrumentacao._novo_histograma()
+    instrumentacao._somar(total, a)
+    instrumentacao._somar(total, b)
+    assert total["contagem"] == 4
+    assert sum(total["baldes"]) == 4
+    assert total["max_ms"] == pytest.approx(1000)
+
+
+def test_prometheus_acumula_os_baldes(medicoes):
+    h = medicoes([1, 10, 100])
+    linhas = instrumentacao.prometheus({"op": h}).splitlines()
+    assert 'the_rua_operacao_segundos_bucket{operacao="op",le="+Inf"} 3' in linhas
+    assert 'the_rua_operacao_segundos_bucket{operacao="op",le="0.01"} 2' in linhas
+    assert 'the_rua_operacao_segundos_count{operacao="op"} 3' in linhas
+
+
+def test_medir_registra_mesmo_quando_a_funcao_falha(medicoes):
+    @instrumentacao.medir("falha")
+    def falhar():
+        raise RuntimeError("x")
+
+    with pytest.raises(RuntimeError):
+        falhar()
+    assert instrumentacao._pendentes["falha"]["contagem"] == 1
+
+
+def test_cronometro_e_iniciar_registram_uma_vez(medicoes):
+    with instrumentacao.cronometro("bloco"):
+        pass
+    encerrar = instrumentacao.iniciar("script")
+    encerrar()
+    assert instrumentacao._pendentes["bloco"]["contagem"] == 1
+    assert instrumentacao._pendentes["script"]["contagem"] == 1
+
+
+def test_desligado_nao_registra(medicoes, monkeypatch):
+    monkeypatch.setattr(instrumentacao, "ATIVO", False)
+    instrumentacao.registrar("op", 0.001)
+    assert instrumentacao._pendentes == {}
+
+
+def test_descargas_somam_no_arquivo(medicoes):
+    medicoes([1, 2])
+    instrumentacao.descarregar()
+    medicoes([3])  # outra descarga (outro processo ou mais tarde) soma ao que já está lá
+    dados = instrumentacao.carregar()
+    assert dados["op"]["contagem"] == 3
+    assert instrumentacao._pendentes == {}
+    instrumentacao.limpar()
+    assert instrumentacao.carregar() == {}
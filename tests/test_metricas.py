@@ -0,0 +1,67 @@
+import clientes
+import metricas
+import pedidos_db
+import sla
+
+
+def _pedido(pid, total=20.0, pagamento="Pix", data="2026-01-01 12:00:00"):
+    return {"id": pid, "codigo_rastreio": f"0{pid}", "telefone": "11987654321", "total": total,
+            "pagamento": pagamento, "data": data}
+
+
+def test_contadores_acompanham_criacao_status_e_exclusao():
+    metricas.reconstruir([])
+    a = pedidos_db.adicionar_pedido(_pedido("100"))[0]
+    pedidos_db.adicionar_pedido(_pedido("200", total=30.0, pagamento="Dinheiro"))
+    pedidos_db.atualizar_status(a["id"], "Em preparo")
+    m = metricas.carregar()
+    assert m["total_pedidos"] == 2
+    assert m["por_status"] == {"Aguardando aceite": 1, "Em preparo": 1}
+    assert m["receita_dia"]["2026-01-01"] == 50.0
+    assert m["por_pagamento"]["Dinheiro"] == {"qtd": 1, "total": 30.0}
+    assert m["recentes"][0]["id"] == "200"
+
+    pedidos_db.excluir_pedido("200")
+    m = metricas.carregar()
+    assert m["total_pedidos"] == 1
+    assert m["receita_dia"]["2026-01-01"] == 20.0
+    assert [r["id"] for r in m["recentes"]] == ["100"]
+
+
+def test_incremental_bate_com_a_reconstrucao():
+    metricas.reconstruir([])
+    for i in range(5):
+        p = pedidos_db.adicionar_pedido(_pedido(str(100 + i), total=10.0 + i))[0]
+        if i % 2:
+            pedidos_db.atualizar_status(p["id"], "Em preparo")
+    incremental = metricas.carregar()
+    assert metricas.reconstruir(pedidos_db.carregar_pedidos()) == incremental
+
+
+def test_arquivamento_desconta_os_retirados():
+    metricas.reconstruir([])
+    pedidos_db.adicionar_pedido(_pedido("100"))
+    pedidos_db.adicionar_pedido(_pedido("200"))
+    pedidos_db.retirar_pedidos(lambda p: p["id"] == "100", lambda retirados: None)
+    m = metricas.carregar()
+    assert m["total_pedidos"] == 1
+    assert m["por_status"]["Aguardando aceite"] == 1
+
+
+def test_sem_base_persistida_nada_e_gravado():
+    metricas.registrar("criado", _pedido("100"))
+    assert metricas.carregar() is None
+
+
+def test_limpar_zera_os_derivados_dos_pedidos():
+    metricas.reconstruir([])
+    p = pedidos_db.adicionar_pedido(_pedido("100"), "chave")[0]
+    clientes.registrar_pedido(p)
+    pedidos_db.atualizar_status(p["id"], "Em preparo")
+    assert metricas.carregar()["total_pedidos"] == 1
+    pedidos_db.limpar()
+    assert pedidos_db.carregar_pedidos() == []
+    assert pedidos_db.pedido_por_chave("chave") is None
+    assert metricas.carregar()["total_pedidos"] == 0
+    assert sla.amostras("aceite") == 0
+    assert clientes.buscar_por_telefone("11987654321") is None
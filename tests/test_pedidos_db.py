@@ -0,0 +1,79 @@
+import threading
+
+import pytest
+
+import pedidos_db
+from pedidos_db import TRANSICOES, transicao_valida
+
+
+def _novo(pid="100", tipo="Retirada"):
+    pedido = {"id": pid, "codigo_rastreio": f"{int(pid) % 10000:04d}", "nome": "Ana", "telefone": "11987654321",
+              "tipo_pedido": tipo, "pagamento": "Pix", "total": 20.0,
+              "produtos": [{"id": "1", "nome": "X", "quantidade": 1, "preco": 20.0}],
+              "data": "2026-01-01 12:00:00"}
+    return pedidos_db.adicionar_pedido(pedido)[0]
+
+
+def _status(pid):
+    return pedidos_db.buscar_pedido(pid)["status"]
+
+
+@pytest.mark.parametrize("atual,novo", [
+    ("Aguardando aceite", "Em preparo"),
+    ("Em preparo", "Pronto"),
+    ("Pronto", "Em rota de entrega"),
+    ("Pronto", "Entregue"),
+    ("Em rota de entrega", "Entregue"),
+])
+def test_transicoes_validas(atual, novo):
+    assert transicao_valida(atual, novo)
+
+
+@pytest.mark.parametrize("atual,novo", [
+    ("Aguardando aceite", "Pronto"),
+    ("Em preparo", "Em rota de entrega"),  # entregas saem só pelo despacho
+    ("Em preparo", "Aguardando aceite"),
+    ("Entregue", "Em preparo"),
+    ("Inexistente", "Em preparo"),
+])
+def test_transicoes_invalidas(atual, novo):
+    assert not transicao_valida(atual, novo)
+
+
+def test_entregue_e_estado_final():
+    assert TRANSICOES["Entregue"] == []
+
+
+def test_atualizar_status_segue_a_maquina_de_estados():
+    p = _novo()
+    assert p["versao"] == 1
+    assert pedidos_db.atualizar_status(p["id"], "Pronto") is False
+    assert pedidos_db.atualizar_status(p["id"], "Em preparo") is True
+    assert pedidos_db.atualizar_status(p["id"], "Em preparo") is False
+    atual = pedidos_db.buscar_pedido(p["id"])
+    assert atual["status"] == "Em preparo"
+    assert atual["versao"] == 2
+    assert [e["status"] for e in atual["historico"]] == ["Aguardando aceite", "Em preparo"]
+
+
+def test_atualizar_status_de_pedido_inexistente():
+    assert pedidos_db.atualizar_status("999", "Em preparo") is False
+
+
+def test_cliques_simultaneos_aplicam_uma_vez():
+    p = _novo()
+    resultados = []
+    threads = [threading.Thread(target=lambda: resultados.append(pedidos_db.atualizar_status(p["id"], "Em preparo")))
+               for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(resultados) == [False] * 4 + [True]
+    assert len(pedidos_db.buscar_pedido(p["id"])["historico"]) == 2
+
+
+def test_buscar_por_codigo_usa_o_indice():
+    p = _novo("1234")
+    assert pedidos_db.buscar_por_codigo(" 1234 ")["id"] == p["id"]
+    assert pedidos_db.buscar_por_codigo("0000") is None
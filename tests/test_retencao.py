@@ -0,0 +1,74 @@
+import os
+import time
+from datetime import date, datetime
+
+import metricas
+import pedidos_db
+import retencao
+import tarefas
+from armazenamento import ler_json
+
+DIA = 86400
+
+
+def _pedido(pid, data=None):
+    data = data or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return pedidos_db.adicionar_pedido({"id": pid, "codigo_rastreio": pid[-4:], "telefone": "",
+                                        "total": 10.0, "pagamento": "Pix", "data": data})[0]
+
+
+def _entregar(pid):
+    for status in ("Em preparo", "Pronto", "Entregue"):
+        assert pedidos_db.atualizar_status(pid, status)
+
+
+def test_arquiva_entregues_antigos_e_abandonados():
+    metricas.reconstruir([])
+    _entregar(_pedido("100")["id"])
+    _pedido("200")
+    _pedido("300", "2020-01-05 12:00:00")
+
+    depois = time.time() + 49 * 3600
+    assert retencao.arquivar_pedidos(agora=depois) == 2
+    assert [p["id"] for p in pedidos_db.carregar_pedidos()] == ["200"]
+    assert [p["id"] for p in ler_json(retencao.arquivo_mes("2020-01"), [])] == ["300"]
+    assert "2020-01" in retencao.meses_arquivados()
+    assert metricas.carregar()["total_pedidos"] == 1
+    assert retencao.arquivar_pedidos(agora=depois) == 0
+
+
+def test_entregue_recente_continua_quente():
+    _entregar(_pedido("100")["id"])
+    assert retencao.arquivar_pedidos(agora=time.time() + 3600) == 0
+
+
+def test_historico_junta_arquivo_e_ativos_sem_repetir():
+    _pedido("300", "2020-01-05 12:00:00")
+    _pedido("400", "2020-02-10 12:00:00")
+    retencao.arquivar_pedidos(agora=time.time())
+    _pedido("500", "2020-01-20 12:00:00")
+    ids = [p["id"] for p in retencao.carregar_historico(date(2020, 1, 1), date(2020, 1, 31))]
+    assert sorted(ids) == ["300", "500"]
+
+
+def test_executar_apaga_comprovantes_vencidos_mas_nao_as_imagens():
+    os.makedirs(os.path.join(retencao.UPLOADS_DIR, "produtos"))
+    velho = time.time() - 100 * DIA
+    for caminho in ("comprovante.png", "produtos/foto.png"):
+        caminho = os.path.join(retencao.UPLOADS_DIR, caminho)
+        with open(caminho, "wb"):
+            pass
+        os.utime(caminho, (velho, velho))
+    resultado = retencao.executar()
+    assert resultado["comprovantes_apagados"] == 1
+    assert os.path.exists(os.path.join(retencao.UPLOADS_DIR, "produtos", "foto.png"))
+    assert retencao.carregar_estado()["ultimo_resultado"] == resultado
+
+
+def test_agendar_respeita_o_intervalo(monkeypatch):
+    enfileiradas = []
+    monkeypatch.setattr(tarefas, "enfileirar", lambda tipo, **kw: enfileiradas.append(tipo) or {"tipo": tipo})
+    assert retencao.agendar() == {"tipo": "retencao"}
+    assert retencao.agendar() is None
+    assert retencao.agendar(forcar=True) is not None
+    assert enfileiradas == ["retencao", "retencao"]
@@ -0,0 +1,112 @@
+import random
+
+import pytest
+
+import sla
+
+
+def _historico(*passos, inicio=1_000_000.0):
+    """[(status, segundos depois do anterior), ...] -> histórico com timestamps."""
+    ts = inicio
+    historico = []
+    for status, depois in passos:
+        ts += depois
+        historico.append({"status": status, "ts": ts, "data": ""})
+    return historico
+
+
+def _pedido(*passos):
+    historico = _historico(*passos)
+    return {"id": "1", "status": historico[-1]["status"], "historico": historico}
+
+
+# ----------------------------
+# Sketch de quantis
+# ----------------------------
+def test_sketch_vazio_nao_tem_quantil():
+    assert sla.sketch_quantil(sla.sketch_novo(), 0.5) is None
+    assert sla.sketch_quantil(None, 0.5) is None
+
+
+@pytest.mark.parametrize("q", [0.5, 0.9, 0.95, 0.99])
+def test_sketch_erro_relativo_dentro_da_precisao(q):
+    rnd = random.Random(7)
+    valores = [rnd.lognormvariate(6, 1) for _ in range(5000)]
+    sk = sla.sketch_novo()
+    for v in valores:
+        sla.sketch_adicionar(sk, v)
+    exato = sorted(valores)[int(q * (len(valores) - 1))]
+    assert sla.sketch_quantil(sk, q) == pytest.approx(exato, rel=sla._PRECISAO * 1.5)
+
+
+def test_sketch_guarda_contagem_e_extremos_sem_as_amostras():
+    sk = sla.sketch_novo()
+    for v in (30, 60, 600):
+        sla.sketch_adicionar(sk, v)
+    assert (sk["n"], sk["min"], sk["max"], sk["soma"]) == (3, 30, 600, 690)
+    assert sum(sk["buckets"].values()) == 3
+    assert sla.sketch_quantil(sk, 0.0) == pytest.approx(30, rel=sla._PRECISAO)
+    assert sla.sketch_quantil(sk, 1.0) == pytest.approx(600, rel=sla._PRECISAO)
+    assert sla.sketch_quantil(sk, 1.0) <= 600  # nunca passa do máximo observado
+
+
+def test_sketch_de_um_valor_devolve_o_proprio_valor():
+    sk = sla.sketch_novo()
+    sla.sketch_adicionar(sk, 123.0)
+    assert sla.sketch_quantil(sk, 0.5) == 123.0
+
+
+# ----------------------------
+# Duração das etapas
+# ----------------------------
+def test_aceite_termina_ao_entrar_em_preparo():
+    p = _pedido(("Aguardando aceite", 0), ("Em preparo", 90))
+    assert sla.duracoes_concluidas(p) == {"aceite": 90}
+
+
+def test_preparo_termina_em_pronto_ou_direto_em_rota():
+    pronto = _pedido(("Aguardando aceite", 0), ("Em preparo", 60), ("Pronto", 600))
+    em_rota = _pedido(("Aguardando aceite", 0), ("Em preparo", 60), ("Em rota de entrega", 900))
+    assert sla.duracoes_concluidas(pronto) == {"preparo": 600}
+    assert sla.duracoes_concluidas(em_rota) == {"preparo": 900}
+
+
+def test_entrega_conta_desde_o_primeiro_pronto():
+    p = _pedido(("Aguardando aceite", 0), ("Em preparo", 60), ("Pronto", 600),
+                ("Em rota de entrega", 120), ("Entregue", 1200))
+    assert sla.duracoes_concluidas(p) == {"entrega": 1320}
+
+
+def test_etapa_so_conta_na_primeira_vez_que_termina():
+    p = _pedido(("Aguardando aceite", 0), ("Em preparo", 60), ("Pronto", 600), ("Em rota de entrega", 30))
+    assert sla.duracoes_concluidas(p) == {}
+
+
+def test_registrar_transicao_alimenta_o_sketch_da_etapa():
+    sla.registrar_transicao(_pedido(("Aguardando aceite", 0), ("Em preparo", 120)))
+    sla.registrar_transicao(_pedido(("Aguardando aceite", 0), ("Em preparo", 240)))
+    assert sla.amostras("aceite") == 2
+    assert sla.amostras("preparo") == 0
+    p50 = sla.percentis("aceite", qs=(0.5,))[0.5]
+    assert 120 <= p50 <= 240
+
+
+def test_novo_evento_nao_volta_no_tempo():
+    futuro = _historico(("Aguardando aceite", 0), inicio=4_000_000_000.0)
+    assert sla.novo_evento("Em preparo", futuro)["ts"] == futuro[-1]["ts"]
+
+
+# ----------------------------
+# Metas
+# ----------------------------
+def test_estourou_sla_compara_com_a_meta_do_status():
+    p = _pedido(("Aguardando aceite", 0))
+    inicio = p["historico"][-1]["ts"]
+    assert sla.estourou_sla(p, agora=inicio + 4 * 60) == (False, 4.0, 5)
+    assert sla.estourou_sla(p, agora=inicio + 6 * 60)[0] is True
+    sla.salvar_config({**sla.SLA_PADRAO, "Aguardando aceite": 10})
+    assert sla.estourou_sla(p, agora=inicio + 6 * 60)[0] is False
+
+
+def test_pedido_sem_historico_nao_estoura():
+    assert sla.estourou_sla({"status": "Em preparo"}) == (False, None, 20)
@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import tarefas
+from armazenamento import gravar_json
+
+
+@pytest.fixture(autouse=True)
+def pool_proprio(monkeypatch):
+    """Cada teste com pool e registro de executores limpos."""
+    monkeypatch.setattr(tarefas, "_pool", None)
+    monkeypatch.setattr(tarefas, "_anexos", {})
+    yield
+    if tarefas._pool is not None:
+        tarefas._pool.shutdown(wait=True)
+
+
+def _pid_morto():
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+def _pendente_antiga(tarefa_id, dono, anexo=False):
+    return {"id": tarefa_id, "tipo": "gravar_relatorio", "descricao": "", "anexo": anexo,
+            "dados": {"caminho": f"{tarefa_id}.txt", "texto": "ok"}, "status": "pendente",
+            "criada_em": "", "ts": time.time() - 2 * tarefas.PRAZO_PENDENTE, "tentativas": 0,
+            "dono": dono, "resultado": None, "erro": None}
+
+
+def test_enfileirar_executa_e_grava_o_arquivo():
+    tarefa = tarefas.enfileirar("gravar_comprovante", {"caminho": "uploads/c.bin"}, anexo=b"abc")
+    assert tarefa["dono"] == os.getpid()
+    feita = tarefas.aguardar(tarefa["id"])
+    assert feita["status"] == "concluida"
+    with open("uploads/c.bin", "rb") as f:
+        assert f.read() == b"abc"
+    assert [n for n in os.listdir("uploads") if n.endswith(".tmp")] == []
+
+
+def test_tipo_desconhecido_e_recusado():
+    with pytest.raises(ValueError):
+        tarefas.enfileirar("nao_existe")
+
+
+def test_tarefa_de_processo_vivo_nao_e_retomada():
+    gravar_json(tarefas.TAREFAS_FILE, [_pendente_antiga("vivo", os.getppid(), anexo=True)])
+    tarefas.retomar_pendentes()
+    tarefas._pool.shutdown(wait=True)
+    assert tarefas.buscar("vivo")["status"] == "pendente"
+
+
+def test_tarefa_de_processo_morto_e_retomada():
+    gravar_json(tarefas.TAREFAS_FILE, [_pendente_antiga("orfa", _pid_morto())])
+    tarefas.retomar_pendentes()
+    feita = tarefas.aguardar("orfa")
+    assert feita["status"] == "concluida"
+    assert feita["dono"] == os.getpid()
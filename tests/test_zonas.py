@@ -0,0 +1,93 @@
+import pytest
+
+import catalogo
+import checkout
+import despacho
+import enderecos
+import zonas
+
+LOJA = [-23.5505, -46.6333]
+
+
+def _ponto(norte_km, leste_km=0.0):
+    """Ponto a tantos km ao norte/leste da loja."""
+    return [LOJA[0] + norte_km / 111.0, LOJA[1] + leste_km / 102.0]
+
+
+@pytest.fixture
+def aneis():
+    despacho.salvar_config({"loja": LOJA})
+    zonas.salvar_config({"zonas": [
+        {"nome": "Longe", "taxa": 12.0, "raio_km": 5},
+        {"nome": "Perto", "taxa": 5.0, "raio_km": 2},
+    ]})
+
+
+def test_sem_zonas_entrega_gratis():
+    assert zonas.cotar(_ponto(50)) == {"zona": None, "taxa": 0.0, "atende": True, "motivo": ""}
+
+
+def test_anel_de_dentro_vale(aneis):
+    assert zonas.zona_do_ponto(_ponto(1))["nome"] == "Perto"
+    assert zonas.zona_do_ponto(_ponto(-3, 2))["nome"] == "Longe"
+    assert zonas.cotar(_ponto(1))["taxa"] == 5.0
+
+
+def test_fora_das_zonas_e_recusado(aneis):
+    assert zonas.zona_do_ponto(_ponto(8)) is None
+    assert zonas.cotar(_ponto(8))["atende"] is False
+
+
+def test_atender_fora_cobra_a_taxa_fora(aneis):
+    zonas.salvar_config({**zonas.carregar_config(), "atender_fora": True, "taxa_fora": 20.0})
+    cotacao = zonas.cotar(_ponto(8))
+    assert cotacao["atende"] is True
+    assert cotacao["taxa"] == 20.0
+
+
+def test_sem_localizacao_cobra_a_maior_taxa(aneis):
+    assert zonas.cotar(None)["taxa"] == 12.0
+
+
+def test_poligono_tem_prioridade_sobre_raio(aneis):
+    quadrado = [_ponto(0.5, 0.5), _ponto(0.5, 1.5), _ponto(1.5, 1.5), _ponto(1.5, 0.5)]
+    zonas.salvar_config({**zonas.carregar_config(),
+                         "zonas": zonas.carregar_config()["zonas"] + [{"nome": "Bairro", "taxa": 3.0, "pontos": quadrado}]})
+    assert zonas.zona_do_ponto(_ponto(1, 1))["nome"] == "Bairro"
+    assert zonas.zona_do_ponto(_ponto(1, -1))["nome"] == "Perto"
+
+
+def test_grade_refeita_quando_a_loja_muda(aneis):
+    assert zonas.zona_do_ponto(_ponto(1))["nome"] == "Perto"
+    despacho.salvar_config({"loja": _ponto(20)})
+    assert zonas.zona_do_ponto(_ponto(1)) is None
+    assert zonas.zona_do_ponto(_ponto(20.5))["nome"] == "Perto"
+
+
+def test_grade_so_testa_as_candidatas_da_celula(aneis):
+    indice = zonas._carregar_indice()
+    longe = zonas._celula(*_ponto(30))
+    assert longe not in indice["grade"]
+    perto = zonas._celula(*LOJA)
+    assert [indice["zonas"][i]["nome"] for i in indice["grade"][perto]] == ["Perto", "Longe"]
+
+
+def test_cotacao_pelo_endereco_digitado(aneis):
+    enderecos.fixar_rua("Rua das Flores", *_ponto(1))
+    enderecos.fixar_rua("Avenida Longe", *_ponto(9))
+    assert zonas.cotar_endereco("R. das Flores, 120")["zona"] == "Perto"
+    assert zonas.cotar_endereco("Avenida Longe, 5")["atende"] is False
+    assert zonas.cotar_endereco("Travessa Desconhecida, 1")["motivo"] == "endereço sem localização"
+
+
+def test_checkout_soma_a_taxa_e_recusa_fora_da_area(aneis):
+    enderecos.fixar_rua("Rua das Flores", *_ponto(3))
+    enderecos.fixar_rua("Avenida Longe", *_ponto(9))
+    catalogo.adicionar_produto({"id": "1", "nome": "X-Burguer", "descricao": "", "preco": 20.0,
+                                "categoria": "Lanches", "esgotado": False})
+    dados = {"nome": "Ana", "telefone": "11987654321", "tipo_pedido": "Entrega", "pagamento": "Pix",
+             "endereco": "Rua das Flores, 120"}
+    pedido, _ = checkout.criar_pedido(dados, [{"id": "1", "quantidade": 1}])
+    assert (pedido["zona_entrega"], pedido["taxa_entrega"], pedido["total"]) == ("Longe", 12.0, 32.0)
+    with pytest.raises(checkout.PedidoInvalido, match="fora da área"):
+        checkout.criar_pedido({**dados, "endereco": "Avenida Longe, 5"}, [{"id": "1", "quantidade": 1}])
@@ -0,0 +1,138 @@
+# zonas.py — Zonas de entrega (raio ao redor da loja ou polígono) e taxa por zona
+#
+# zonas.json guarda as zonas; o índice é uma grade de células de ~500 m com
+# as zonas candidatas de cada célula, refeito só quando zonas.json ou a
+# posição da loja (despacho_config.json) mudam. Uma consulta olha uma
+# célula e testa só as candidatas. Polígonos têm prioridade sobre raios, e
+# raios menores sobre maiores (anéis concêntricos: o de dentro vale).
+import math
+
+import enderecos
+from armazenamento import gravar_json, ler_json, mtime
+from despacho import DESPACHO_CONFIG_FILE, distancia_km
+from despacho import carregar_config as carregar_despacho
+
+ZONAS_FILE = "zonas.json"
+ZONAS_PADRAO = {
+    "zonas": [],                    # {"nome", "taxa", "raio_km"} ou {"nome", "taxa", "pontos": [[lat, lon], ...]}
+    "taxa_sem_localizacao": None,   # None = cobra a maior taxa das zonas
+    "atender_fora": False,          # False recusa endereços fora de todas as zonas
+    "taxa_fora": 0.0,
+}
+CELULA_GRAUS = 0.005  # ~550 m de latitude
+
+_indice = {"assinatura": None, "config": dict(ZONAS_PADRAO), "zonas": [], "grade": {}}
+
+
+def carregar_config():
+    return {**ZONAS_PADRAO, **ler_json(ZONAS_FILE, {})}
+
+
+def salvar_config(config):
+    gravar_json(ZONAS_FILE, {**ZONAS_PADRAO, **config})
+
+
+# ----------------------------
+# Índice em grade
+# ----------------------------
+def _celula(lat, lon):
+    return (math.floor(lat / CELULA_GRAUS), math.floor(lon / CELULA_GRAUS))
+
+
+def _limites(zona, loja):
+    """(lat_min, lat_max, lon_min, lon_max) da zona, ou None se não der para situar."""
+    if zona.get("pontos"):
+        lats = [p[0] for p in zona["pontos"]]
+        lons = [p[1] for p in zona["pontos"]]
+        return min(lats), max(lats), min(lons), max(lons)
+    centro = zona.get("centro") or loja
+    if not centro:
+        return None
+    dlat = zona["raio_km"] / 111.0
+    dlon = zona["raio_km"] / (111.0 * max(math.cos(math.radians(centro[0])), 0.01))
+    return centro[0] - dlat, centro[0] + dlat, centro[1] - dlon, centro[1] + dlon
+
+
+def _carregar_indice():
+    assinatura = (mtime(ZONAS_FILE), mtime(DESPACHO_CONFIG_FILE))
+    if assinatura == _indice["assinatura"]:
+        return _indice
+    config = carregar_config()
+    loja = carregar_despacho()["loja"]
+    poligonos = [z for z in config["zonas"] if len(z.get("pontos") or []) >= 3]
+    raios = sorted((z for z in config["zonas"] if not z.get("pontos") and z.get("raio_km")), key=lambda z: z["raio_km"])
+    zonas = []
+    grade = {}
+    for zona in poligonos + raios:
+        limites = _limites(zona, loja)
+        if limites is None:
+            continue
+        zona = {**zona, "centro": zona.get("centro") or loja}
+        zonas.append(zona)
+        lat_min, lat_max, lon_min, lon_max = limites
+        (c0, l0), (c1, l1) = _celula(lat_min, lon_min), _celula(lat_max, lon_max)
+        for c in range(c0, c1 + 1):
+            for l in range(l0, l1 + 1):
+                grade.setdefault((c, l), []).append(len(zonas) - 1)
+    _indice.update(assinatura=assinatura, config=config, zonas=zonas, grade=grade)
+    return _indice
+
+
+def _no_poligono(ponto, pontos):
+    """Ray casting (lat/lon tratados como plano — zonas de bairro, não continentes)."""
+    y, x = ponto
+    dentro = False
+    j = len(pontos) - 1
+    for i in range(len(pontos)):
+        yi, xi = pontos[i]
+        yj, xj = pontos[j]
+        if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+            dentro = not dentro
+        j = i
+    return dentro
+
+
+def _contem(zona, ponto):
+    if zona.get("pontos"):
+        return _no_poligono(ponto, zona["pontos"])
+    return distancia_km(zona["centro"], ponto) <= zona["raio_km"]
+
+
+def zona_do_ponto(ponto):
+    """Zona que atende o ponto [lat, lon], ou None."""
+    indice = _carregar_indice()
+    for i in indice["grade"].get(_celula(ponto[0], ponto[1]), ()):
+        if _contem(indice["zonas"][i], ponto):
+            return indice["zonas"][i]
+    return None
+
+
+# ----------------------------
+# Taxa
+# ----------------------------
+def cotar(posicao):
+    """Taxa de entrega para a posição: {"zona", "taxa", "atende", "motivo"}.
+
+    Sem zonas cadastradas a entrega é grátis (como antes). Sem posição
+    conhecida cobra `taxa_sem_localizacao`.
+    """
+    indice = _carregar_indice()
+    config = indice["config"]
+    if not indice["zonas"]:
+        return {"zona": None, "taxa": 0.0, "atende": True, "motivo": ""}
+    if posicao is None:
+        taxa = config["taxa_sem_localizacao"]
+        if taxa is None:
+            taxa = max(float(z["taxa"]) for z in indice["zonas"])
+        return {"zona": None, "taxa": float(taxa), "atende": True, "motivo": "endereço sem localização"}
+    zona = zona_do_ponto(posicao)
+    if zona is not None:
+        return {"zona": zona["nome"], "taxa": float(zona["taxa"]), "atende": True, "motivo": ""}
+    if config["atender_fora"]:
+        return {"zona": None, "taxa": float(config["taxa_fora"]), "atende": True, "motivo": "fora das zonas"}
+    return {"zona": None, "taxa": 0.0, "atende": False, "motivo": "Endereço fora da área de entrega."}
+
+
+def cotar_endereco(texto):
+    """Cotação para o endereço digitado (antes do pedido existir)."""
+    return cotar(enderecos.posicao_do_texto(texto))